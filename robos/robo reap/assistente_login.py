@@ -1,23 +1,102 @@
+import base64
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ctypes
 
+# Pendências que o operador pode informar no lugar do login
+OPCOES_PENDENCIA = [
+    ("Senha Inválida", "PENDENTE_SENHA"),
+    ("Conta Bronze (Gov.br)", "PENDENTE_NIVEL"),
+    ("Autenticação 2FA", "PENDENTE_2FA"),
+    ("Não Autorizado", "NÃO AUTORIZADO")
+]
+
+CORES = {
+    "bg": "#0c0d10",      # Navy Profundo
+    "card": "#1e293b",    # Slate Dark
+    "accent": "#d4af37",  # Ouro (Gold)
+    "text": "#f8fafc",    # Gelo
+    "subtext": "#94a3b8", # Slate Light
+    "success": "#10b981", # Emerald
+    "warning": "#f59e0b", # Amber
+    "danger": "#ef4444"   # Rose
+}
+
+def arredondar_janela(janela):
+    """Bordas arredondadas (Windows 11). Ignorado em outros sistemas."""
+    try:
+        janela.update()
+        hwnd = ctypes.windll.user32.GetParent(janela.winfo_id())
+        if not hwnd: hwnd = janela.winfo_id()
+        ctypes.windll.dwmapi.DwmSetWindowAttribute(hwnd, 33, ctypes.byref(ctypes.c_int(2)), 4)
+    except: pass
+
+class VisualizadorTela:
+    """
+    Visão sob demanda do navegador em modo headless/Xvfb: mostra a captura da
+    página e repassa cliques e texto para ela, o suficiente para o operador
+    concluir o login gov.br sem uma janela visível do Chrome.
+    `tela` precisa de capturar() -> PNG, clicar(x, y), digitar(texto) e enter().
+    """
+    def __init__(self, parent, tela, titulo="TELA DO NAVEGADOR", reducao=2):
+        self.tela = tela
+        self.reducao = reducao # Captura exibida a 1/reducao do tamanho real
+        self.colors = CORES
+        self.janela = tk.Toplevel(parent)
+        self.janela.title(titulo)
+        self.janela.configure(bg=self.colors["bg"])
+        self.janela.attributes("-topmost", True)
+
+        self.lbl_imagem = tk.Label(self.janela, bg=self.colors["bg"], cursor="crosshair")
+        self.lbl_imagem.pack(padx=5, pady=5)
+        self.lbl_imagem.bind("<Button-1>", self.ao_clicar)
+
+        barra = tk.Frame(self.janela, bg=self.colors["bg"])
+        barra.pack(fill="x", padx=5, pady=(0, 5))
+        self.entrada = tk.Entry(barra, font=("Consolas", 10), bg=self.colors["card"], fg=self.colors["text"],
+                                insertbackground=self.colors["text"], relief="flat")
+        self.entrada.pack(side="left", fill="x", expand=True, ipady=4)
+        self.entrada.bind("<Return>", lambda e: self.enviar_texto())
+        tk.Button(barra, text="DIGITAR", font=("Segoe UI Black", 7), bg=self.colors["accent"], fg=self.colors["bg"],
+                  relief="flat", padx=8, command=self.enviar_texto).pack(side="left", padx=2)
+        tk.Button(barra, text="ENTER", font=("Segoe UI Black", 7), bg=self.colors["card"], fg=self.colors["text"],
+                  relief="flat", padx=8, command=lambda: self.executar(self.tela.enter)).pack(side="left", padx=2)
+        tk.Button(barra, text="ATUALIZAR", font=("Segoe UI Black", 7), bg=self.colors["card"], fg=self.colors["text"],
+                  relief="flat", padx=8, command=self.atualizar).pack(side="left", padx=2)
+        self.atualizar()
+
+    def atualizar(self):
+        try:
+            png = self.tela.capturar()
+            imagem = tk.PhotoImage(data=base64.b64encode(png).decode("ascii"))
+            if self.reducao > 1: imagem = imagem.subsample(self.reducao)
+            self.lbl_imagem.configure(image=imagem)
+            self.lbl_imagem.image = imagem # Mantém a referência (senão o Tk descarta a imagem)
+        except Exception as e:
+            self.lbl_imagem.configure(text=f"Falha ao capturar a tela: {e}", fg=self.colors["danger"], image="")
+
+    def executar(self, acao, *args):
+        try: acao(*args)
+        except Exception as e: print(f"[VISUALIZADOR] Falha ao repassar ação: {e}")
+        self.janela.after(800, self.atualizar) # Dá tempo da página reagir antes de recapturar
+
+    def ao_clicar(self, event):
+        self.executar(self.tela.clicar, event.x * self.reducao, event.y * self.reducao)
+
+    def enviar_texto(self):
+        texto = self.entrada.get()
+        if not texto: return
+        self.entrada.delete(0, "end")
+        self.executar(self.tela.digitar, texto)
+
 class AssistenteLogin:
-    def __init__(self, root, nome, cpf, senha, x=None, y=None, cor="#d4af37"):
+    def __init__(self, root, nome, cpf, senha, x=None, y=None, cor="#d4af37", tela=None):
         self.root = root
+        self.tela = tela
         self.root.title(f"CONHEÇA SEU CLIENTE - {nome}")
         
         # Cores Premium (Escritório)
-        self.colors = {
-            "bg": "#0c0d10",      # Navy Profundo
-            "card": "#1e293b",    # Slate Dark
-            "accent": "#d4af37",  # Ouro (Gold)
-            "text": "#f8fafc",    # Gelo
-            "subtext": "#94a3b8", # Slate Light
-            "success": "#10b981", # Emerald
-            "warning": "#f59e0b", # Amber
-            "danger": "#ef4444"   # Rose
-        }
+        self.colors = CORES
         
         # Configuração da Janela (Ainda mais compacta)
         self.root.configure(bg=self.colors["bg"])
@@ -83,13 +162,20 @@ class AssistenteLogin:
                                   pady=5)
         self.btn_issue.pack(fill="x")
 
+        # Modo headless: sem janela do Chrome, o operador trabalha pela captura
+        if tela is not None:
+            tk.Button(btn_frame, text="VER TELA DO NAVEGADOR", font=("Segoe UI", 8, "bold"),
+                      bg=self.colors["card"], fg=self.colors["text"], activebackground="#334155",
+                      relief="flat", cursor="hand2", pady=5,
+                      command=lambda: VisualizadorTela(self.root, tela, f"TELA - {nome}")).pack(fill="x", pady=(2, 0))
+            height += 32
+            if x is not None and y is not None:
+                self.root.geometry(f"{width}x{height}+{x}+{y}")
+            else:
+                self.root.geometry(f"{width}x{height}")
+
         # Configuração para bordas arredondadas (Windows 11)
-        try:
-            self.root.update()
-            hwnd = ctypes.windll.user32.GetParent(self.root.winfo_id())
-            if not hwnd: hwnd = self.root.winfo_id()
-            ctypes.windll.dwmapi.DwmSetWindowAttribute(hwnd, 33, ctypes.byref(ctypes.c_int(2)), 4)
-        except: pass
+        arredondar_janela(self.root)
 
     def criar_campo(self, parent, label, valor):
         wrapper = tk.Frame(parent, bg=self.colors["bg"])
@@ -150,14 +236,7 @@ class AssistenteLogin:
         tk.Label(m_frame, text="QUAL O PROBLEMA?", font=("Segoe UI Black", 9), 
                  bg=self.colors["bg"], fg=self.colors["accent"], pady=20).pack()
         
-        options = [
-            ("Senha Inválida", "PENDENTE_SENHA"),
-            ("Conta Bronze (Gov.br)", "PENDENTE_NIVEL"),
-            ("Autenticação 2FA", "PENDENTE_2FA"),
-            ("Não Autorizado", "NÃO AUTORIZADO")
-        ]
-        
-        for label, code in options:
+        for label, code in OPCOES_PENDENCIA:
             btn = tk.Button(m_frame, text=label, bg=self.colors["card"], fg="white",
                             relief="flat", font=("Segoe UI", 9), pady=12, cursor="hand2",
                             activebackground=self.colors["accent"], activeforeground=self.colors["bg"],
@@ -169,20 +248,119 @@ class AssistenteLogin:
                   pady=10, command=menu.destroy).pack(pady=10)
 
         # Arredondado no Menu
-        try:
-            menu.update()
-            hwnd = ctypes.windll.user32.GetParent(menu.winfo_id())
-            if not hwnd: hwnd = menu.winfo_id()
-            ctypes.windll.dwmapi.DwmSetWindowAttribute(hwnd, 33, ctypes.byref(ctypes.c_int(2)), 4)
-        except: pass
+        arredondar_janela(menu)
 
     def set_pendencia(self, codigo):
         self.resultado = codigo
         self.root.destroy()
 
-def invocar_assistente(nome, cpf, senha, x=None, y=None, cor="#d4af37"):
+class PainelFilaLogin:
+    """
+    Painel único com todas as sessões aguardando login humano.
+    O operador atende qualquer uma, em qualquer ordem; as demais sessões
+    seguem preenchendo enquanto isso. Alimentado por fila_login.FilaLogin.
+    """
+    def __init__(self, root, fila, x=None, y=None, cor="#d4af37"):
+        self.root = root
+        self.fila = fila
+        self.colors = CORES
+        self.root.title("FILA DE LOGIN")
+        self.root.configure(bg=self.colors["bg"])
+        self.root.overrideredirect(True)
+        self.root.attributes("-topmost", True)
+        self.root.attributes("-alpha", 0.98)
+        if x is not None and y is not None:
+            self.root.geometry(f"300x120+{x}+{y}")
+
+        main_frame = tk.Frame(self.root, bg=self.colors["bg"], highlightbackground=cor,
+                              highlightthickness=1, borderwidth=0)
+        main_frame.pack(fill="both", expand=True)
+
+        header = tk.Frame(main_frame, bg=self.colors["bg"], height=35)
+        header.pack(fill="x")
+        header.bind("<Button-1>", self.start_move)
+        header.bind("<B1-Motion>", self.do_move)
+        self.lbl_titulo = tk.Label(header, text="🔑 FILA DE LOGIN", font=("Segoe UI Black", 7),
+                                   bg=self.colors["bg"], fg=self.colors["accent"])
+        self.lbl_titulo.pack(side="left", padx=15, pady=8)
+
+        self.lista = tk.Frame(main_frame, bg=self.colors["bg"], padx=10, pady=5)
+        self.lista.pack(fill="both", expand=True)
+        self.versao = -1
+        arredondar_janela(self.root)
+        self.atualizar()
+
+    def atualizar(self):
+        """Redesenha a lista quando a fila muda (polling no próprio loop do Tk)."""
+        versao, pedidos = self.fila.instantaneo()
+        if versao != self.versao:
+            self.versao = versao
+            for w in self.lista.winfo_children(): w.destroy()
+            self.lbl_titulo.config(text=f"🔑 FILA DE LOGIN ({len(pedidos)})")
+            if not pedidos:
+                tk.Label(self.lista, text="Nenhuma sessão aguardando login.", font=("Segoe UI", 8),
+                         bg=self.colors["bg"], fg=self.colors["subtext"]).pack(pady=10)
+            for pedido in pedidos:
+                self.criar_cartao(pedido)
+            self.root.geometry(f"300x{60 + max(1, len(pedidos)) * 130}")
+        self.root.after(300, self.atualizar)
+
+    def criar_cartao(self, pedido):
+        card = tk.Frame(self.lista, bg=self.colors["card"], padx=10, pady=6)
+        card.pack(fill="x", pady=4)
+        tk.Label(card, text=f"[S{pedido.sessao}] {pedido.nome.upper()}", font=("Segoe UI", 8, "bold"),
+                 bg=self.colors["card"], fg=self.colors["text"], wraplength=260, anchor="w").pack(fill="x")
+
+        for rotulo, valor in (("CPF", pedido.cpf), ("SENHA", pedido.senha)):
+            linha = tk.Frame(card, bg=self.colors["card"])
+            linha.pack(fill="x", pady=1)
+            tk.Label(linha, text=f"{rotulo}: {valor}", font=("Consolas", 10),
+                     bg=self.colors["card"], fg=self.colors["text"]).pack(side="left")
+            tk.Button(linha, text="COPIAR", font=("Segoe UI Black", 7), bg=self.colors["accent"],
+                      fg=self.colors["bg"], relief="flat", padx=8, cursor="hand2",
+                      command=lambda v=valor: self.copiar(v)).pack(side="right")
+
+        botoes = tk.Frame(card, bg=self.colors["card"])
+        botoes.pack(fill="x", pady=(4, 0))
+        if pedido.tela is not None:
+            tk.Button(botoes, text="VER TELA", font=("Segoe UI", 7, "bold"), bg=self.colors["bg"],
+                      fg=self.colors["subtext"], relief="flat", cursor="hand2",
+                      command=lambda: VisualizadorTela(self.root, pedido.tela, f"S{pedido.sessao} - {pedido.nome}")
+                      ).pack(side="left", expand=True, fill="x", padx=1)
+        else:
+            tk.Button(botoes, text="FOCAR", font=("Segoe UI", 7, "bold"), bg=self.colors["bg"],
+                      fg=self.colors["subtext"], relief="flat", cursor="hand2",
+                      command=lambda: self.fila.focar(pedido.id)).pack(side="left", expand=True, fill="x", padx=1)
+        tk.Button(botoes, text="LOGADO", font=("Segoe UI Black", 7), bg=self.colors["accent"],
+                  fg=self.colors["bg"], relief="flat", cursor="hand2",
+                  command=lambda: self.fila.resolver(pedido.id, "OK")).pack(side="left", expand=True, fill="x", padx=1)
+        tk.Button(botoes, text="PENDÊNCIA", font=("Segoe UI", 7, "bold"), bg=self.colors["bg"],
+                  fg=self.colors["warning"], relief="flat", cursor="hand2",
+                  command=lambda: self.abrir_menu_pendencia(pedido.id)).pack(side="left", expand=True, fill="x", padx=1)
+
+    def abrir_menu_pendencia(self, id_pedido):
+        menu = tk.Menu(self.root, tearoff=0)
+        for label, code in OPCOES_PENDENCIA:
+            menu.add_command(label=label, command=lambda c=code: self.fila.resolver(id_pedido, c))
+        menu.tk_popup(self.root.winfo_pointerx(), self.root.winfo_pointery())
+
+    def copiar(self, texto):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(texto)
+        print(f"[Copiado] {texto[:3]}...")
+
+    def start_move(self, event):
+        self.x = event.x
+        self.y = event.y
+
+    def do_move(self, event):
+        x = self.root.winfo_x() + event.x - self.x
+        y = self.root.winfo_y() + event.y - self.y
+        self.root.geometry(f"+{x}+{y}")
+
+def invocar_assistente(nome, cpf, senha, x=None, y=None, cor="#d4af37", tela=None):
     root = tk.Tk()
-    app = AssistenteLogin(root, nome, cpf, senha, x, y, cor)
+    app = AssistenteLogin(root, nome, cpf, senha, x, y, cor, tela)
     root.mainloop()
     return app.resultado
 
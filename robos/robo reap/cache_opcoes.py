@@ -0,0 +1,89 @@
+import os
+import json
+import threading
+
+from normalizacao import texto_canonico
+
+# ==============================================================================
+# CACHE DE OPÇÕES DOS AUTOCOMPLETES DO PORTAL
+# ==============================================================================
+# Municípios, espécies, petrechos e tipos de local são listas fixas do portal.
+# Aqui fica o mapeamento aprendido "valor da planilha" -> rótulo exato (e o id
+# do input da opção) visto na tela, por campo. Com ele o preenchimento clica a
+# opção por id ou por rótulo exato, sem varrer labels com contains() a cada mês.
+#
+# Arquivo: temp_results/cache_opcoes.json
+#   {"municipio": {"SAO LUIS": {"rotulo": "São Luís", "id": "municipio-123"}}, ...}
+# Só se aprende opção cujo rótulo é o próprio valor (igualdade canônica): o que o
+# contains() do fallback acertou por acaso ("São Luís" -> "São Luís Gonzaga do
+# Maranhão") não vira regra. Nada sai do cache por não aparecer a tempo (o
+# autocomplete pode só ter demorado): quando o fallback acha outro id/rótulo exato
+# para o mesmo valor, ele substitui o antigo.
+
+CACHE_ARQUIVO = os.path.join("temp_results", "cache_opcoes.json")
+
+class CacheOpcoes:
+    def __init__(self, caminho=CACHE_ARQUIVO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self._dados = self._ler()
+
+    def _ler(self):
+        if not os.path.exists(self.caminho): return {}
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except Exception:
+            return {}
+        # Descarta opções aprendidas por casamento parcial (versões antigas do cache)
+        return {campo: {chave: op for chave, op in opcoes.items() if texto_canonico(op.get("rotulo")) == chave}
+                for campo, opcoes in dados.items()}
+
+    def _gravar(self):
+        # Junta com o que outras instâncias já gravaram antes de substituir o arquivo
+        dados = self._ler()
+        for campo, opcoes in self._dados.items():
+            dados.setdefault(campo, {}).update(opcoes)
+        self._dados = dados
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        tmp = f"{self.caminho}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.caminho)
+        except Exception as e:
+            print(f"[WARN] Falha ao salvar o cache de opções: {e}")
+
+    def consultar(self, campo, valor):
+        """{"rotulo", "id"} aprendido para o valor, ou None."""
+        with self._lock:
+            opcao = self._dados.get(campo, {}).get(texto_canonico(valor))
+            if opcao: self.acertos += 1
+            else: self.falhas += 1
+            return opcao
+
+    def rotulo(self, campo, valor):
+        """Rótulo aprendido para o valor (sem contar acerto/falha), ou None."""
+        with self._lock:
+            return (self._dados.get(campo, {}).get(texto_canonico(valor)) or {}).get("rotulo")
+
+    def opcoes(self, campo):
+        """Cópia das opções aprendidas de um campo (valor canônico -> {"rotulo", "id"})."""
+        with self._lock:
+            return dict(self._dados.get(campo, {}))
+
+    def aprender(self, campo, valor, rotulo, id_opcao=None):
+        """
+        Registra a opção clicada no fallback se o rótulo for exatamente o valor
+        (sem acento/caixa). Retorna True se a opção ficou no cache; só grava se mudou.
+        """
+        chave = texto_canonico(valor)
+        if not rotulo or not chave or texto_canonico(rotulo) != chave: return False
+        novo = {"rotulo": rotulo.strip(), "id": id_opcao or None}
+        with self._lock:
+            if self._dados.get(campo, {}).get(chave) == novo: return True
+            self._dados.setdefault(campo, {})[chave] = novo
+            self._gravar()
+        return True
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# ==============================================================================
+# CANAL DE RESULTADOS (NDJSON EM DESCRITOR DEDICADO)
+# ==============================================================================
+# Resultados e eventos de progresso saem por um descritor separado do stdout
+# (ex: fd 3 aberto pelo Node.js), um JSON por linha. Assim o Node não precisa
+# garimpar RESULT_START...RESULT_END no meio dos prints de debug.
+#
+# Sem canal configurado, o resultado continua saindo no formato antigo pelo stdout.
+
+_fd = None
+_lock = threading.Lock()
+_ouvintes = []
+
+def adicionar_ouvinte(fn):
+    """Registra fn(evento) para receber todos os eventos, mesmo sem canal (ex: API de controle)."""
+    _ouvintes.append(fn)
+
+def configurar(fd=None):
+    """Ativa o canal no descritor informado (ex: 3). None = modo legado (stdout)."""
+    global _fd
+    if fd is None:
+        _fd = None
+        return False
+    try:
+        os.fstat(fd)
+        _fd = fd
+        return True
+    except OSError as e:
+        print(f"[WARN] Descritor de resultados {fd} indisponível ({e}). Usando stdout.")
+        _fd = None
+        return False
+
+def ativo():
+    return _fd is not None
+
+def _escrever(evento):
+    linha = (json.dumps(evento, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    with _lock:
+        # Escreve a linha inteira (write parcial é retomado sem intercalar com outra thread)
+        enviado = 0
+        while enviado < len(linha):
+            enviado += os.write(_fd, linha[enviado:])
+
+def emitir(tipo, **dados):
+    """Emite um evento genérico {"type": tipo, "ts": ..., ...}. Sem canal, só avisa os ouvintes."""
+    evento = {"type": tipo, "ts": time.time(), **dados}
+    for fn in _ouvintes:
+        try: fn(evento)
+        except: pass
+    if _fd is None: return
+    try:
+        _escrever(evento)
+    except Exception as e:
+        print(f"[WARN] Falha ao emitir evento '{tipo}': {e}")
+
+def emitir_resultado(resultado):
+    """Resultado final de um cliente (pelo canal ou, sem canal, RESULT_START...RESULT_END)."""
+    if _fd is None:
+        print(f"RESULT_START{json.dumps(resultado)}RESULT_END")
+        sys.stdout.flush()
+    emitir("result", data=resultado)
+
+def emitir_progresso(cpf, etapa, estado, **extra):
+    """Evento de etapa: estado = "start" | "end" | "skip" | "fail"."""
+    emitir("progress", cpf=cpf, step=etapa, state=estado, **extra)
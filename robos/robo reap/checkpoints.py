@@ -0,0 +1,75 @@
+import os
+import json
+import time
+from datetime import datetime
+
+# ==============================================================================
+# CHECKPOINTS POR CLIENTE (RETOMADA APÓS CRASH)
+# ==============================================================================
+# Cada cliente tem um arquivo temp_results/checkpoints/<cpf>.json com as etapas
+# já concluídas. Um retry (ou uma nova execução) pula direto para a primeira
+# etapa pendente em vez de refazer Tela 1, Tela 2 e a varredura dos 12 meses.
+#
+# Etapas: LOGADO, TELA1, TELA2, MESES (lista), TELA3, ENVIADO, PDF (+ ARQUIVO_PDF, ANO_BASE)
+
+CHECKPOINT_DIR = os.path.join("temp_results", "checkpoints")
+VALIDADE_HORAS = 48 # Checkpoints mais antigos que isso são ignorados
+
+def _caminho(cpf):
+    cpf_limpo = "".join(ch for ch in str(cpf) if ch.isdigit()) or "sem_cpf"
+    return os.path.join(CHECKPOINT_DIR, f"{cpf_limpo}.json")
+
+def carregar(cpf):
+    """Retorna o dict de checkpoints do cliente ({} se não houver ou estiver vencido)."""
+    caminho = _caminho(cpf)
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except:
+        return {}
+
+    # REAP é anual: checkpoint de outro ano ou muito antigo não vale
+    if dados.get("ANO") != datetime.now().year:
+        return {}
+    if time.time() - dados.get("ATUALIZADO_EM", 0) > VALIDADE_HORAS * 3600:
+        return {}
+    return dados
+
+def _salvar(cpf, dados):
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    dados["ANO"] = datetime.now().year
+    dados["ATUALIZADO_EM"] = time.time()
+    caminho = _caminho(cpf)
+    tmp = f"{caminho}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+        os.replace(tmp, caminho) # Escrita atômica: crash no meio não corrompe o checkpoint
+    except Exception as e:
+        print(f"[WARN] Falha ao salvar checkpoint de {cpf}: {e}")
+
+def marcar(cpf, etapa, **extra):
+    """Marca uma etapa como concluída (ex: marcar(cpf, "TELA1"))."""
+    dados = carregar(cpf)
+    dados[etapa] = True
+    dados.update(extra)
+    _salvar(cpf, dados)
+    return dados
+
+def marcar_mes(cpf, mes):
+    """Registra um mês da Tela 3 como validado (check verde)."""
+    dados = carregar(cpf)
+    meses = dados.get("MESES", [])
+    if mes not in meses:
+        meses.append(mes)
+        dados["MESES"] = meses
+        _salvar(cpf, dados)
+    return dados
+
+def limpar(cpf):
+    try:
+        os.remove(_caminho(cpf))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,180 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==============================================================================
+# API LOCAL DE CONTROLE DO ROBÔ
+# ==============================================================================
+# Servidor HTTP em 127.0.0.1 para o ERP (ou o operador) controlar o robô sem
+# a janela Tk de STOP:
+#   GET  /stats            -> fila, cliente em andamento, vazão e ETA
+#   POST /stop             -> para no próximo ponto de checagem (entre etapas)
+#   POST /pause, /resume   -> pausa/retoma entre etapas
+#   POST /clients          -> adiciona cliente(s) à fila (JSON ou lista)
+#   POST /priority         -> {"cpf": "..."} move o cliente para o início da fila
+
+class EstadoRobo:
+    """Estado compartilhado entre o loop principal e a API de controle."""
+    def __init__(self, instancia=1, ao_parar=None):
+        self.instancia = instancia
+        self.ao_parar = ao_parar
+        self.fila = None
+        self.aceita_clientes = True
+        self.parado = False
+        self._liberado = threading.Event()
+        self._liberado.set()
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+        self.em_andamento = {}
+        self.processados = 0
+        self.sucessos = 0
+        self.falhas = 0
+        self._tempo_total_clientes = 0.0
+        self.eta = None # eta(em_andamento) -> segundos restantes pelo modelo de duração (senão média x fila)
+        self.limitador = None # Função que devolve a situação do limitador do portal (utils/limitador_portal)
+        self.memoria = {} # Última amostra de RSS por sessão (navegadores.GerenciadorNavegador)
+        self.pipeline = {} # Espera/economia do pipeline de navegadores prontos por sessão
+
+    # --- Comandos ---
+    def parar(self):
+        self.parado = True
+        self._liberado.set() # Destrava quem estiver pausado para poder sair
+        if self.ao_parar: self.ao_parar()
+
+    def pausar(self):
+        self._liberado.clear()
+
+    def retomar(self):
+        self._liberado.set()
+
+    @property
+    def pausado(self):
+        return not self._liberado.is_set()
+
+    def aguardar_se_pausado(self):
+        """Ponto de checagem entre etapas: bloqueia enquanto pausado. Retorna False se parado."""
+        if self.pausado:
+            print(f"[{self.instancia}] [CONTROLE] Pausado. Aguardando /resume...")
+            self._liberado.wait()
+            print(f"[{self.instancia}] [CONTROLE] Retomado.")
+        return not self.parado
+
+    # --- Telemetria ---
+    def ao_evento(self, evento):
+        """Ouvinte do canal_resultados: acompanha etapas e resultados."""
+        tipo = evento.get("type")
+        with self._lock:
+            if tipo == "progress":
+                cpf = evento.get("cpf")
+                atual = self.em_andamento.setdefault(cpf, {"cpf": cpf, "inicio": evento["ts"]})
+                if evento.get("nome"): atual["nome"] = evento["nome"]
+                atual["etapa"] = evento.get("step")
+                atual["estado"] = evento.get("state")
+                if evento.get("mes"): atual["mes"] = evento["mes"]
+            elif tipo == "resources":
+                self.memoria[evento.get("sessao")] = {k: v for k, v in evento.items() if k not in ("type", "sessao")}
+            elif tipo == "pipeline":
+                self.pipeline[evento.get("sessao")] = {k: v for k, v in evento.items() if k not in ("type", "sessao", "cpf")}
+            elif tipo == "retry":
+                self.em_andamento.pop(evento.get("cpf"), None) # Voltou para a fila (backoff)
+            elif tipo == "result":
+                dados = evento.get("data") or {}
+                atual = self.em_andamento.pop(dados.get("cpf"), None)
+                if atual:
+                    self._tempo_total_clientes += evento["ts"] - atual["inicio"]
+                self.processados += 1
+                if dados.get("success"): self.sucessos += 1
+                else: self.falhas += 1
+
+    def estatisticas(self):
+        limitador = None
+        if self.limitador:
+            try: limitador = self.limitador()
+            except Exception: pass
+        with self._lock:
+            decorrido = time.time() - self.inicio
+            na_fila = len(self.fila) if self.fila is not None else 0
+            media = (self._tempo_total_clientes / self.processados) if self.processados else None
+            dados = {
+                "instancia": self.instancia,
+                "pausado": self.pausado,
+                "parado": self.parado,
+                "fila": na_fila,
+                "em_andamento": list(self.em_andamento.values()),
+                "processados": self.processados,
+                "sucessos": self.sucessos,
+                "falhas": self.falhas,
+                "decorrido_s": round(decorrido, 1),
+                "vazao_clientes_hora": round(self.processados / decorrido * 3600, 2) if decorrido > 0 else 0,
+                "media_s_por_cliente": round(media, 1) if media else None,
+                "eta_s": round(media * (na_fila + len(self.em_andamento)), 1) if media else None,
+                "memoria": self.memoria,
+                "limitador": limitador,
+                "pipeline": self.pipeline,
+            }
+        if self.eta:
+            try: dados["eta_s"] = round(self.eta(dados["em_andamento"]), 1)
+            except Exception: pass
+        return dados
+
+def _criar_handler(estado):
+    class ControleHandler(BaseHTTPRequestHandler):
+        def _responder(self, codigo, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _ler_json(self):
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            if not tamanho: return None
+            return json.loads(self.rfile.read(tamanho).decode("utf-8"))
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                return self._responder(200, estado.estatisticas())
+            if self.path.rstrip("/") == "/queue":
+                fila = estado.fila.listar() if estado.fila is not None else []
+                return self._responder(200, {"fila": fila})
+            self._responder(404, {"erro": "rota inexistente"})
+
+        def do_POST(self):
+            rota = self.path.rstrip("/")
+            try:
+                if rota == "/stop":
+                    estado.parar()
+                    return self._responder(200, {"ok": True})
+                if rota == "/pause":
+                    estado.pausar()
+                    return self._responder(200, {"ok": True})
+                if rota == "/resume":
+                    estado.retomar()
+                    return self._responder(200, {"ok": True})
+                if rota == "/clients":
+                    if estado.fila is None or not estado.aceita_clientes or estado.fila.fechada:
+                        return self._responder(409, {"erro": "fila não aceita novos clientes neste modo"})
+                    corpo = self._ler_json()
+                    clientes = corpo.get("clients", [corpo]) if isinstance(corpo, dict) else (corpo or [])
+                    for c in clientes: estado.fila.adicionar(c)
+                    return self._responder(200, {"ok": True, "adicionados": len(clientes)})
+                if rota == "/priority":
+                    corpo = self._ler_json() or {}
+                    achou = estado.fila is not None and estado.fila.priorizar(corpo.get("cpf", ""))
+                    return self._responder(200 if achou else 404, {"ok": bool(achou)})
+            except Exception as e:
+                return self._responder(400, {"erro": str(e)})
+            self._responder(404, {"erro": "rota inexistente"})
+
+        def log_message(self, format, *args):
+            pass # Silencia o log padrão do http.server
+
+    return ControleHandler
+
+def iniciar_servidor(estado, porta=0):
+    """Sobe a API em 127.0.0.1 numa thread daemon. porta=0 escolhe uma porta livre. Retorna a porta."""
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), _criar_handler(estado))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor.server_address[1]
@@ -0,0 +1,537 @@
+import os
+import hmac
+import json
+import time
+import base64
+import socket
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fila_tarefas import cpf_do_item, iniciar_leitura
+
+# ==============================================================================
+# COORDENADOR DE TRABALHO ENTRE MÁQUINAS
+# ==============================================================================
+# Um servidor HTTP pequeno guarda a fila de clientes, os empréstimos (leases) e
+# os resultados. Robôs em qualquer PC da rede entram como workers com
+# `robo_reap.py --coordinator http://IP:8765` e pegam um cliente por vez, então
+# a vazão cresce com o número de máquinas/sessões.
+#
+#   POST /clients  {"clients": [...]}        -> enfileira (CPF na fila ou já com sucesso é ignorado)
+#   POST /lease    {"worker": "pc-1"}        -> empresta o próximo cliente pronto
+#   POST /renew    {"worker", "leases": []}  -> heartbeat: estende os empréstimos
+#   POST /release  {"lease", "atraso", "tentativa"} -> retry: volta à fila com backoff
+#   POST /result   {"lease", "result": {...}, "pdf_base64"} -> resultado (dedup por CPF)
+#   POST /priority {"cpf"}  |  POST /close   -> fim da entrada: workers saem ao esvaziar
+#   GET  /stats    |  GET /results
+#
+# Empréstimo não renovado em LEASE_TTL_S (worker caiu) volta para a fila.
+# O estado é gravado em temp_results/coordenador_estado.json a cada mudança e
+# recarregado ao reiniciar. Com ADV_COORDENADOR_TOKEN definido (nos dois lados),
+# toda requisição precisa do cabeçalho X-Token. A fila leva senhas gov.br: fora do
+# loopback o coordenador só sobe com token.
+
+PORTA_PADRAO = 8765
+LEASE_TTL_S = 15 * 60
+HEARTBEAT_S = 60
+ESTADO_ARQUIVO = os.path.join("temp_results", "coordenador_estado.json")
+PASTA_PDFS = os.path.join("temp_results", "coordenador_pdfs")
+
+def _token():
+    return os.environ.get("ADV_COORDENADOR_TOKEN", "")
+
+def _loopback(host):
+    return host in ("localhost", "::1") or host.startswith("127.")
+
+class Coordenador:
+    """Fila, empréstimos e resultados consolidados (thread-safe)."""
+    def __init__(self, caminho=ESTADO_ARQUIVO, progresso=None):
+        self.caminho = caminho
+        self.progresso = progresso # progresso_final.json do modo Excel (para o planejador pular os concluídos)
+        self._lock = threading.Lock()
+        self.pendentes = [] # Itens na ordem de atendimento
+        self.leases = {} # id -> {"item", "worker", "expira", "desde"}
+        self.resultados = {} # cpf -> resultado consolidado
+        self.workers = {} # worker -> {"visto", "atendidos", "sucessos"}
+        self.duplicados = 0
+        self.fechada = False
+        self.inicio = time.time()
+        self._seq = 0
+        self._carregar()
+
+    # --- Persistência ---
+    def _carregar(self):
+        if not os.path.exists(self.caminho): return
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except Exception as e:
+            print(f"[COORDENADOR] [WARN] Estado anterior ilegível ({e}); começando do zero.")
+            return
+        self.resultados = dados.get("resultados", {})
+        # Empréstimos de antes do reinício voltam para a fila
+        self.pendentes = [l["item"] for l in dados.get("leases", {}).values()] + dados.get("pendentes", [])
+        print(f"[COORDENADOR] Estado restaurado: {len(self.pendentes)} pendentes, {len(self.resultados)} resultados.")
+
+    def _gravar(self):
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        tmp = f"{self.caminho}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pendentes": self.pendentes, "leases": self.leases, "resultados": self.resultados},
+                          f, ensure_ascii=False, default=str)
+            os.replace(tmp, self.caminho)
+        except Exception as e:
+            print(f"[COORDENADOR] [WARN] Falha ao gravar o estado: {e}")
+
+    def _gravar_progresso(self, cpf, resultado):
+        """Modo Excel: mesmo formato do progresso_final.json dos robôs."""
+        if not self.progresso: return
+        try:
+            dados = {}
+            if os.path.exists(self.progresso):
+                with open(self.progresso, "r", encoding="utf-8") as f: dados = json.load(f)
+            mot = str(resultado.get("message", ""))
+            dados[cpf] = {"NOME": resultado.get("nome", ""), "STATUS": mot.upper(), "MOTIVO": mot,
+                          "DATA": resultado.get("timestamp") or datetime.now().isoformat()}
+            tmp = f"{self.progresso}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f: json.dump(dados, f, indent=4)
+            os.replace(tmp, self.progresso)
+        except Exception as e:
+            print(f"[COORDENADOR] [WARN] Falha ao atualizar {self.progresso}: {e}")
+
+    # --- Entrada (mesma interface de FilaTarefas para reaproveitar iniciar_leitura) ---
+    def adicionar(self, cliente):
+        return self.adicionar_varios([cliente])
+
+    def adicionar_varios(self, clientes):
+        """
+        Enfileira clientes novos. CPF pendente, emprestado ou já concluído com sucesso é
+        ignorado; cliente cuja última tentativa falhou volta à fila e a falha antiga sai
+        dos resultados (senão o resultado novo seria tratado como duplicado).
+        """
+        adicionados = 0
+        with self._lock:
+            conhecidos = {cpf for cpf, r in self.resultados.items() if r.get("success")}
+            conhecidos.update(cpf_do_item(i) for i in self.pendentes)
+            conhecidos.update(cpf_do_item(l["item"]) for l in self.leases.values())
+            for c in clientes:
+                cpf = cpf_do_item(c)
+                if not cpf or cpf in conhecidos: continue
+                conhecidos.add(cpf)
+                self.resultados.pop(cpf, None)
+                self.pendentes.append(c)
+                adicionados += 1
+            if adicionados: self._gravar()
+        return adicionados
+
+    def fechar(self):
+        with self._lock:
+            self.fechada = True
+
+    # --- Empréstimos ---
+    def _recolher_expirados(self):
+        agora = time.time()
+        for id_lease, lease in list(self.leases.items()):
+            if lease["expira"] < agora:
+                print(f"[COORDENADOR] Empréstimo de {cpf_do_item(lease['item'])} expirou ({lease['worker']}); voltando à fila.")
+                del self.leases[id_lease]
+                self.pendentes.insert(0, lease["item"])
+
+    def _visto(self, worker):
+        info = self.workers.setdefault(worker, {"visto": 0, "atendidos": 0, "sucessos": 0})
+        info["visto"] = time.time()
+        return info
+
+    def emprestar(self, worker):
+        """Próximo cliente pronto para o worker: {"lease", "item"} | {"aguarde": s} | {"fim": True}."""
+        with self._lock:
+            self._visto(worker)
+            self._recolher_expirados()
+            agora = time.time()
+            for item in self.pendentes:
+                if item.get("_nao_antes_de", 0) <= agora:
+                    self.pendentes.remove(item)
+                    self._seq += 1
+                    id_lease = f"{int(agora)}-{self._seq}"
+                    self.leases[id_lease] = {"item": item, "worker": worker, "expira": agora + LEASE_TTL_S, "desde": agora}
+                    self._gravar()
+                    return {"lease": id_lease, "item": item, "pendentes": len(self.pendentes)}
+            if self.fechada and not self.pendentes and not self.leases:
+                return {"fim": True}
+            # Nada pronto agora (backoff, empréstimos de outros que podem expirar ou fila aberta)
+            espera = min((i["_nao_antes_de"] - agora for i in self.pendentes), default=5)
+            return {"aguarde": max(1.0, min(espera, 10.0)), "pendentes": len(self.pendentes)}
+
+    def renovar(self, worker, leases):
+        with self._lock:
+            self._visto(worker)
+            validos = [l for l in leases if l in self.leases]
+            for l in validos: self.leases[l]["expira"] = time.time() + LEASE_TTL_S
+        return validos
+
+    def devolver(self, id_lease, atraso=0, tentativa=None):
+        """Retry: o cliente volta ao fim da fila e qualquer worker pode pegá-lo depois do backoff."""
+        with self._lock:
+            lease = self.leases.pop(id_lease, None)
+            if lease is None: return False
+            item = lease["item"]
+            item["_nao_antes_de"] = time.time() + float(atraso or 0)
+            if tentativa is not None: item["_tentativa"] = tentativa
+            self.pendentes.append(item)
+            self._gravar()
+        return True
+
+    def registrar_resultado(self, id_lease, resultado, worker="", pdf_base64=None):
+        """Consolida o resultado. Duplicado (lease expirado e atendido duas vezes) não sobrescreve um sucesso."""
+        with self._lock:
+            lease = self.leases.pop(id_lease, None)
+            item = lease["item"] if lease else {}
+            cpf = cpf_do_item(resultado) or cpf_do_item(item)
+            info = self._visto(worker or (lease or {}).get("worker", "?"))
+            info["atendidos"] += 1
+            if resultado.get("success"): info["sucessos"] += 1
+            anterior = self.resultados.get(cpf)
+            if anterior is not None:
+                self.duplicados += 1
+                if anterior.get("success") or not resultado.get("success"):
+                    self._gravar()
+                    return {"ok": True, "duplicado": True}
+            # Mesmo CPF ainda esperando na fila (devolvido por expiração): não atende de novo
+            self.pendentes = [i for i in self.pendentes if cpf_do_item(i) != cpf]
+            for outro, l in list(self.leases.items()):
+                if cpf_do_item(l["item"]) == cpf: del self.leases[outro]
+
+            consolidado = dict(resultado)
+            consolidado["worker"] = worker
+            consolidado["recebido_em"] = datetime.now().isoformat()
+            if pdf_base64:
+                try:
+                    os.makedirs(PASTA_PDFS, exist_ok=True)
+                    nome = os.path.basename(resultado.get("pdf") or f"{cpf}.pdf")
+                    destino = os.path.join(PASTA_PDFS, nome)
+                    with open(destino, "wb") as f: f.write(base64.b64decode(pdf_base64))
+                    consolidado["pdf_worker"] = resultado.get("pdf", "")
+                    consolidado["pdf"] = os.path.abspath(destino)
+                except Exception as e:
+                    print(f"[COORDENADOR] [WARN] Falha ao salvar o PDF de {cpf}: {e}")
+            self.resultados[cpf] = consolidado
+            self._gravar()
+        self._gravar_progresso(cpf, consolidado)
+        status = "OK" if consolidado.get("success") else "FALHA"
+        print(f"[COORDENADOR] [{status}] {consolidado.get('nome', cpf)} ({worker}): {consolidado.get('message', '')}")
+        return {"ok": True, "duplicado": anterior is not None}
+
+    def priorizar(self, cpf):
+        alvo = cpf_do_item({"cpf": cpf})
+        with self._lock:
+            for item in self.pendentes:
+                if cpf_do_item(item) == alvo:
+                    self.pendentes.remove(item)
+                    self.pendentes.insert(0, item)
+                    return True
+        return False
+
+    def estatisticas(self):
+        with self._lock:
+            self._recolher_expirados()
+            decorrido = time.time() - self.inicio
+            sucessos = sum(1 for r in self.resultados.values() if r.get("success"))
+            em_lease = {}
+            for l in self.leases.values():
+                em_lease.setdefault(l["worker"], []).append(cpf_do_item(l["item"]))
+            return {
+                "pendentes": len(self.pendentes),
+                "emprestados": len(self.leases),
+                "concluidos": len(self.resultados),
+                "sucessos": sucessos,
+                "falhas": len(self.resultados) - sucessos,
+                "duplicados": self.duplicados,
+                "fechada": self.fechada,
+                "decorrido_s": round(decorrido, 1),
+                "workers": {w: dict(info, em_andamento=em_lease.get(w, []), visto_ha_s=round(time.time() - info["visto"], 1))
+                            for w, info in self.workers.items()},
+            }
+
+def _criar_handler(coord):
+    class CoordenadorHandler(BaseHTTPRequestHandler):
+        def _responder(self, codigo, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _ler_json(self):
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            if not tamanho: return {}
+            return json.loads(self.rfile.read(tamanho).decode("utf-8"))
+
+        def _autorizado(self):
+            recebido = self.headers.get("X-Token") or ""
+            if _token() and not hmac.compare_digest(recebido.encode("utf-8"), _token().encode("utf-8")):
+                self._responder(401, {"erro": "token inválido"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._autorizado(): return
+            rota = self.path.rstrip("/")
+            if rota == "/stats": return self._responder(200, coord.estatisticas())
+            if rota == "/results":
+                with coord._lock: return self._responder(200, {"resultados": list(coord.resultados.values())})
+            self._responder(404, {"erro": "rota inexistente"})
+
+        def do_POST(self):
+            if not self._autorizado(): return
+            rota = self.path.rstrip("/")
+            try:
+                corpo = self._ler_json()
+                if rota == "/lease":
+                    return self._responder(200, coord.emprestar(corpo.get("worker", self.client_address[0])))
+                if rota == "/renew":
+                    return self._responder(200, {"validos": coord.renovar(corpo.get("worker", ""), corpo.get("leases", []))})
+                if rota == "/release":
+                    ok = coord.devolver(corpo.get("lease"), corpo.get("atraso", 0), corpo.get("tentativa"))
+                    return self._responder(200 if ok else 404, {"ok": ok})
+                if rota == "/result":
+                    return self._responder(200, coord.registrar_resultado(corpo.get("lease"), corpo.get("result") or {},
+                                                                          corpo.get("worker", ""), corpo.get("pdf_base64")))
+                if rota == "/clients":
+                    clientes = corpo.get("clients", [corpo]) if isinstance(corpo, dict) else (corpo or [])
+                    return self._responder(200, {"ok": True, "adicionados": coord.adicionar_varios(clientes)})
+                if rota == "/priority":
+                    achou = coord.priorizar(corpo.get("cpf", ""))
+                    return self._responder(200 if achou else 404, {"ok": achou})
+                if rota == "/close":
+                    coord.fechar()
+                    return self._responder(200, {"ok": True})
+            except Exception as e:
+                return self._responder(400, {"erro": str(e)})
+            self._responder(404, {"erro": "rota inexistente"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return CoordenadorHandler
+
+def iniciar_servidor(coord, host="0.0.0.0", porta=PORTA_PADRAO):
+    """
+    Sobe o coordenador numa thread daemon (0.0.0.0 = visível na rede local). Retorna o servidor.
+    Fora do loopback exige ADV_COORDENADOR_TOKEN (RuntimeError sem ele).
+    """
+    if not _token() and not _loopback(host):
+        raise RuntimeError(f"ADV_COORDENADOR_TOKEN não definido: sem token o coordenador só ouve em 127.0.0.1 (pedido: {host}).")
+    servidor = ThreadingHTTPServer((host, porta), _criar_handler(coord))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+# ==============================================================================
+# LADO DO WORKER: FILA REMOTA
+# ==============================================================================
+class FilaCoordenador:
+    """
+    Mesma interface da FilaTarefas, mas os clientes vêm do coordenador.
+    Cada obter() pega um empréstimo; o resultado vai de volta pelo canal_resultados
+    (ouvinte ao_evento) e reagendar() devolve o cliente para qualquer worker retentar.
+    """
+    def __init__(self, url, worker=None, instancia=1, intervalo_heartbeat=HEARTBEAT_S):
+        self.url = url.rstrip("/")
+        self.worker = worker or f"{socket.gethostname()}-{instancia}"
+        self.instancia = instancia
+        self.recebidos = 0
+        self._pendentes_remotos = 0
+        self._emprestados = {} # cpf -> (lease, item)
+        self._saida = [] # Resultados que ainda não chegaram ao coordenador
+        self._lock = threading.Lock()
+        self._cancelada = threading.Event()
+        self._fechada = False
+        import requests # Só o worker precisa; o servidor/Coordenador roda sem
+        self._sessao = requests.Session()
+        if _token(): self._sessao.headers["X-Token"] = _token()
+        self.intervalo_heartbeat = intervalo_heartbeat
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+
+    def _post(self, rota, corpo, timeout=30):
+        r = self._sessao.post(self.url + rota, json=corpo, timeout=timeout)
+        if r.status_code == 401: raise RuntimeError("coordenador recusou o token (ADV_COORDENADOR_TOKEN)")
+        return r.json()
+
+    def _heartbeat(self):
+        while not self._cancelada.wait(self.intervalo_heartbeat):
+            self._enviar_saida()
+            with self._lock: leases = [l for l, _ in self._emprestados.values()]
+            if not leases: continue
+            try: self._post("/renew", {"worker": self.worker, "leases": leases})
+            except Exception as e: print(f"[{self.instancia}] [COORDENADOR] Falha no heartbeat: {e}")
+
+    def _enviar_saida(self):
+        with self._lock: fila, self._saida = self._saida, []
+        for i, corpo in enumerate(fila):
+            try:
+                self._post("/result", corpo, timeout=120)
+            except Exception as e:
+                print(f"[{self.instancia}] [COORDENADOR] Resultado não enviado ({e}); tentando de novo depois.")
+                with self._lock: self._saida = fila[i:] + self._saida
+                return False
+        return True
+
+    # --- Interface da FilaTarefas ---
+    def obter(self, timeout=None):
+        limite = None if timeout is None else time.time() + timeout
+        falhas = 0
+        while not self._cancelada.is_set():
+            try:
+                resp = self._post("/lease", {"worker": self.worker})
+                falhas = 0
+            except Exception as e:
+                falhas += 1
+                resp = {"aguarde": min(60, 5 * falhas)}
+                print(f"[{self.instancia}] [COORDENADOR] Sem contato com {self.url} ({e}); nova tentativa em {resp['aguarde']}s.")
+            if resp.get("fim"): return None
+            if resp.get("lease"):
+                item = resp["item"]
+                with self._lock: self._emprestados[cpf_do_item(item)] = (resp["lease"], item)
+                self._pendentes_remotos = resp.get("pendentes", 0)
+                self.recebidos += 1
+                return item
+            self._pendentes_remotos = resp.get("pendentes", self._pendentes_remotos)
+            espera = resp.get("aguarde", 5)
+            if limite is not None:
+                if time.time() >= limite: return None
+                espera = min(espera, limite - time.time())
+            self._cancelada.wait(max(0.1, espera))
+        return None
+
+    def reagendar(self, cliente, atraso):
+        with self._lock: lease, _ = self._emprestados.pop(cpf_do_item(cliente), (None, None))
+        if lease is None: return
+        try: self._post("/release", {"lease": lease, "atraso": atraso, "tentativa": cliente.get("_tentativa")})
+        except Exception as e: print(f"[{self.instancia}] [COORDENADOR] Falha ao devolver cliente (volta quando o empréstimo expirar): {e}")
+
+    def ao_evento(self, evento):
+        """Ouvinte do canal_resultados: resultado final de um cliente emprestado vai para o coordenador."""
+        if evento.get("type") != "result": return
+        resultado = dict(evento.get("data") or {})
+        with self._lock: lease, _ = self._emprestados.pop(cpf_do_item(resultado), (None, None))
+        if lease is None: return
+        corpo = {"lease": lease, "worker": self.worker, "result": resultado}
+        pdf = resultado.get("pdf")
+        if pdf and os.path.exists(pdf):
+            try:
+                with open(pdf, "rb") as f: corpo["pdf_base64"] = base64.b64encode(f.read()).decode("ascii")
+            except Exception: pass
+        with self._lock: self._saida.append(corpo)
+        self._enviar_saida()
+
+    def adicionar(self, cliente):
+        self._post("/clients", {"clients": [cliente]})
+
+    def priorizar(self, cpf):
+        try: return bool(self._post("/priority", {"cpf": cpf}).get("ok"))
+        except Exception: return False
+
+    def fechar(self):
+        self._fechada = True
+
+    @property
+    def fechada(self):
+        return self._fechada
+
+    def cancelar(self):
+        """Parada do worker: devolve na hora o que estava emprestado e não foi atendido."""
+        self._cancelada.set()
+        self._fechada = True
+        with self._lock: emprestados, self._emprestados = list(self._emprestados.values()), {}
+        for lease, _ in emprestados:
+            try: self._post("/release", {"lease": lease, "atraso": 0}, timeout=5)
+            except Exception: pass
+
+    def encerrar(self):
+        """Fim normal: garante que os resultados pendentes foram entregues."""
+        for _ in range(5):
+            if self._enviar_saida(): return
+            time.sleep(5)
+
+    def listar(self):
+        with self._lock: return [item for _, item in self._emprestados.values()]
+
+    def __len__(self):
+        return self._pendentes_remotos # Último valor informado pelo coordenador (sem rede aqui)
+
+    def __iter__(self):
+        while True:
+            item = self.obter()
+            if item is None: return
+            yield item
+
+# ==============================================================================
+# EXECUÇÃO DO COORDENADOR
+# ==============================================================================
+def clientes_do_excel(pasta="."):
+    """Plano do modo Excel inteiro (sem fatias) convertido para clientes no formato JSON."""
+    import pandas as pd
+    import planejador
+    df_c = pd.read_excel(os.path.join(pasta, "base_clientes.xlsx"))
+    df_d = pd.read_excel(os.path.join(pasta, "dados.xlsx"))
+    progresso = planejador.carregar_progresso(os.path.join(pasta, "temp_results", "progresso_final.json"))
+    plano = planejador.montar_plano(df_c, df_d, progresso)
+    dados_por_nome = planejador.agrupar_dados_por_nome(df_d)
+    clientes = []
+    for it in planejador.itens_pendentes(plano):
+        dados = dados_por_nome.get(it["NOME"])
+        registros = dados.astype(object).where(dados.notna(), None).to_dict("records") if dados is not None else []
+        senha = it["SENHA_GOV"] if isinstance(it["SENHA_GOV"], str) else ""
+        clientes.append({"cpf": cpf_do_item(it), "nome": it["NOME"], "senha": senha, "fishing_data": registros})
+    return clientes
+
+def main():
+    parser = argparse.ArgumentParser(description="Coordenador de workers do robô REAP")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface (0.0.0.0 = rede local, exige ADV_COORDENADOR_TOKEN; 127.0.0.1 = só esta máquina)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--json_task", help="Arquivo JSON com {\"clients\": [...]}")
+    parser.add_argument("--task_stream", help="Clientes em NDJSON: '-' para stdin ou caminho (fecha a fila no EOF)")
+    parser.add_argument("--excel", action="store_true", help="Enfileira os pendentes de base_clientes.xlsx/dados.xlsx e grava o progresso_final.json")
+    parser.add_argument("--manter_aberto", action="store_true", help="Não fecha a fila após carregar a entrada (aceita POST /clients até POST /close)")
+    args = parser.parse_args()
+
+    coord = Coordenador(progresso=os.path.join("temp_results", "progresso_final.json") if args.excel else None)
+    try:
+        servidor = iniciar_servidor(coord, args.host, args.porta)
+    except RuntimeError as e:
+        print(f"[COORDENADOR] [ERRO] {e} Defina o token (nos workers também) ou use --host 127.0.0.1.")
+        return
+    # Workers que chegarem antes da entrada carregada recebem {"aguarde"}
+    if args.json_task:
+        with open(args.json_task, "r", encoding="utf-8") as f: tarefa = json.load(f)
+        n = coord.adicionar_varios(tarefa.get("clients", []) if isinstance(tarefa, dict) else tarefa)
+        print(f"[COORDENADOR] {n} clientes enfileirados de {args.json_task}.")
+    if args.excel:
+        n = coord.adicionar_varios(clientes_do_excel())
+        print(f"[COORDENADOR] {n} clientes pendentes enfileirados das planilhas.")
+    if args.task_stream:
+        iniciar_leitura(args.task_stream, coord) # fechar() no EOF
+    elif not args.manter_aberto and (args.json_task or args.excel):
+        coord.fechar()
+
+    print(f"[COORDENADOR] Ouvindo em http://{socket.gethostname()}:{servidor.server_address[1]} "
+          f"({'com' if _token() else 'sem'} token). Workers: robo_reap.py --coordinator URL")
+    try:
+        while True:
+            time.sleep(30)
+            est = coord.estatisticas()
+            print(f"[COORDENADOR] pendentes={est['pendentes']} emprestados={est['emprestados']} "
+                  f"concluídos={est['concluidos']} (ok={est['sucessos']}) workers={len(est['workers'])}")
+            if est["fechada"] and not est["pendentes"] and not est["emprestados"]:
+                print("[COORDENADOR] Fila concluída. Resultados em GET /results e temp_results/coordenador_estado.json.")
+                time.sleep(HEARTBEAT_S) # Dá tempo dos workers ouvirem {"fim": true}
+                break
+    except KeyboardInterrupt:
+        pass
+    servidor.shutdown()
+
+if __name__ == "__main__":
+    main()
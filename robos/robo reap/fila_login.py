@@ -0,0 +1,93 @@
+import itertools
+import threading
+
+# ==============================================================================
+# FILA DE LOGIN HUMANO
+# ==============================================================================
+# O login no gov.br vira uma etapa própria do pipeline: cada sessão (navegador)
+# que chega na tela de login entra nesta fila e espera o operador, enquanto as
+# sessões já logadas seguem preenchendo em paralelo (--sessoes N).
+# Um único painel Tk (assistente_login.PainelFilaLogin) mostra todas as sessões
+# pendentes; o gargalo passa a ser só o ritmo de logins do operador.
+
+class PedidoLogin:
+    def __init__(self, id_pedido, sessao, nome, cpf, senha, focar=None, tela=None):
+        self.id = id_pedido
+        self.sessao = sessao
+        self.nome = nome
+        self.cpf = cpf
+        self.senha = senha
+        self.focar = focar
+        self.tela = tela # Headless: captura/cliques em vez de focar a janela
+        self.resultado = None
+        self.evento = threading.Event()
+
+class FilaLogin:
+    """Fila thread-safe de sessões aguardando login, com o painel rodando numa thread própria."""
+    def __init__(self, x=None, y=None, cor="#d4af37"):
+        self._pedidos = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._versao = 0
+        self.x, self.y, self.cor = x, y, cor
+        self._thread = None
+
+    def iniciar_painel(self):
+        """Abre o painel (Tk fica inteiro na thread dele, como a janela de STOP)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        import tkinter as tk
+        from assistente_login import PainelFilaLogin
+        root = tk.Tk()
+        PainelFilaLogin(root, self, self.x, self.y, self.cor)
+        root.mainloop()
+
+    def solicitar(self, sessao, nome, cpf, senha, focar=None, tela=None):
+        """
+        Chamado pela thread da sessão: entra na fila e bloqueia até o operador
+        responder. Retorna "OK", um código de pendência ou None (cancelado).
+        """
+        with self._lock:
+            pedido = PedidoLogin(next(self._ids), sessao, nome, cpf, senha, focar, tela)
+            self._pedidos[pedido.id] = pedido
+            self._versao += 1
+        pedido.evento.wait()
+        return pedido.resultado
+
+    def resolver(self, id_pedido, resultado):
+        """Resposta do operador (chamado pelo painel)."""
+        with self._lock:
+            pedido = self._pedidos.pop(id_pedido, None)
+            self._versao += 1
+        if pedido:
+            pedido.resultado = resultado
+            pedido.evento.set()
+
+    def focar(self, id_pedido):
+        """Traz o navegador da sessão para frente (a thread da sessão está bloqueada em solicitar)."""
+        with self._lock:
+            pedido = self._pedidos.get(id_pedido)
+        if pedido and pedido.focar:
+            try: pedido.focar()
+            except Exception as e: print(f"[FILA LOGIN] Não foi possível focar a sessão {pedido.sessao}: {e}")
+
+    def cancelar_todos(self):
+        """Parada do robô: libera todas as sessões esperando login (resultado None)."""
+        with self._lock:
+            pedidos = list(self._pedidos.values())
+            self._pedidos.clear()
+            self._versao += 1
+        for pedido in pedidos:
+            pedido.evento.set()
+
+    def instantaneo(self):
+        """(versão, pedidos na ordem de chegada) para o painel redesenhar só quando muda."""
+        with self._lock:
+            return self._versao, sorted(self._pedidos.values(), key=lambda p: p.id)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pedidos)
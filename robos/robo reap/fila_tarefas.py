@@ -0,0 +1,166 @@
+import json
+import time
+import threading
+from collections import deque
+
+# ==============================================================================
+# FILA DE TAREFAS (ENTRADA EM STREAMING)
+# ==============================================================================
+# Substitui o --json_task gigante na linha de comando: os clientes chegam em
+# NDJSON (um JSON por linha) via stdin ou named pipe e o robô já começa a
+# trabalhar no primeiro enquanto o resto ainda está chegando.
+
+class FilaTarefas:
+    """
+    Fila thread-safe de clientes.
+    obter() bloqueia até chegar um cliente ou a entrada ser encerrada (fechar()).
+    Itens reagendados (retry) só saem depois do seu "_nao_antes_de".
+    """
+    def __init__(self, itens=None):
+        self._itens = deque(itens or [])
+        self._cond = threading.Condition()
+        self._fechada = False
+        self._cancelada = False
+        self.recebidos = len(self._itens)
+
+    def adicionar(self, cliente):
+        """Enfileira um cliente novo. Depois de fechar() ninguém mais o atenderia: levanta RuntimeError."""
+        with self._cond:
+            if self._fechada: raise RuntimeError("fila fechada: não aceita novos clientes")
+            self._itens.append(cliente)
+            self.recebidos += 1
+            self._cond.notify()
+
+    def fechar(self):
+        """Sinaliza que não chegarão mais clientes (EOF da entrada)."""
+        with self._cond:
+            self._fechada = True
+            self._cond.notify_all()
+
+    def cancelar(self):
+        """Parada do robô: obter() passa a retornar None mesmo com itens reagendados."""
+        with self._cond:
+            self._cancelada = True
+            self._fechada = True
+            self._cond.notify_all()
+
+    def reagendar(self, cliente, atraso):
+        """Devolve o cliente ao fim da fila para ser retentado só daqui a `atraso` segundos."""
+        cliente["_nao_antes_de"] = time.time() + atraso
+        with self._cond:
+            self._itens.append(cliente)
+            self._cond.notify()
+
+    @property
+    def fechada(self):
+        return self._fechada
+
+    def obter(self, timeout=None):
+        """Retorna o próximo cliente pronto, ou None se a fila foi fechada e esvaziou (ou timeout)."""
+        limite = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                if self._cancelada: return None
+                agora = time.time()
+                for item in self._itens:
+                    if item.get("_nao_antes_de", 0) <= agora:
+                        self._itens.remove(item)
+                        return item
+                if not self._itens and self._fechada: return None
+
+                # Só há itens aguardando o backoff (ou nenhum): dorme até o primeiro ficar pronto
+                espera = min((i["_nao_antes_de"] - agora for i in self._itens), default=None)
+                if limite is not None:
+                    restante = limite - agora
+                    if restante <= 0: return None
+                    espera = restante if espera is None else min(espera, restante)
+                self._cond.wait(espera)
+
+    def priorizar(self, cpf):
+        """Move o cliente com este CPF para o início da fila. Retorna True se encontrou."""
+        alvo = cpf_do_item({"cpf": cpf})
+        with self._cond:
+            for item in self._itens:
+                if cpf_do_item(item) == alvo:
+                    self._itens.remove(item)
+                    self._itens.appendleft(item)
+                    return True
+        return False
+
+    def listar(self):
+        """Cópia dos itens pendentes (na ordem de atendimento)."""
+        with self._cond:
+            return list(self._itens)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._itens)
+
+    def __iter__(self):
+        while True:
+            item = self.obter()
+            if item is None: return
+            yield item
+
+def cpf_do_item(item):
+    """CPF (só dígitos) de um item da fila, seja do JSON (cpf/cpf_cnpj) ou do plano Excel (CPF)."""
+    bruto = item.get("CPF", item.get("cpf", item.get("cpf_cnpj", "")))
+    bruto = str(bruto)
+    if bruto.endswith(".0"): bruto = bruto[:-2]
+    return "".join(ch for ch in bruto if ch.isdigit())
+
+def _extrair_clientes(obj):
+    """Aceita uma linha com um cliente ou com uma tarefa completa {"clients": [...]}."""
+    if isinstance(obj, dict) and isinstance(obj.get("clients"), list):
+        return obj["clients"]
+    if isinstance(obj, list):
+        return obj
+    return [obj]
+
+def ler_ndjson(stream, fila, instancia=1, total_instancias=1, ao_receber=None):
+    """
+    Lê NDJSON (bytes) de um stream até EOF e alimenta a fila.
+    Aplica a mesma divisão intercalada do --json_task pela ordem de chegada.
+    """
+    contador = 0
+    try:
+        for linha in stream:
+            linha = linha.decode("utf-8", errors="replace").strip() if isinstance(linha, bytes) else linha.strip()
+            if not linha: continue
+            try:
+                obj = json.loads(linha)
+            except Exception as e:
+                print(f"[{instancia}] [ERRO] Linha NDJSON inválida ignorada: {e}")
+                continue
+
+            if fila.fechada: break # Robô parado (cancelar()): o resto da entrada não seria atendido
+            for cliente in _extrair_clientes(obj):
+                if contador % total_instancias == instancia - 1:
+                    fila.adicionar(cliente)
+                    if ao_receber: ao_receber(cliente)
+                contador += 1
+    except Exception as e:
+        print(f"[{instancia}] [ERRO] Falha na leitura da entrada de tarefas: {e}")
+    finally:
+        fila.fechar()
+
+def iniciar_leitura(caminho, fila, instancia=1, total_instancias=1, ao_receber=None):
+    """
+    Inicia a thread de leitura. caminho "-" = stdin; senão um named pipe
+    (\\\\.\\pipe\\nome no Windows, FIFO no Linux) ou arquivo NDJSON.
+    """
+    def _run():
+        if caminho == "-":
+            import sys
+            ler_ndjson(sys.stdin.buffer, fila, instancia, total_instancias, ao_receber)
+        else:
+            try:
+                with open(caminho, "rb") as stream:
+                    ler_ndjson(stream, fila, instancia, total_instancias, ao_receber)
+            except Exception as e:
+                print(f"[{instancia}] [ERRO] Não foi possível abrir a entrada {caminho}: {e}")
+                fila.fechar()
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    return t
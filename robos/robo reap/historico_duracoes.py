@@ -0,0 +1,147 @@
+import os
+import json
+import threading
+
+import numpy as np
+
+# ==============================================================================
+# HISTÓRICO DE DURAÇÕES E PREVISÃO POR CLIENTE
+# ==============================================================================
+# Cada tentativa de cliente vira uma linha em temp_results/historico_duracoes.jsonl
+# com a duração total, a duração por etapa (dos eventos "progress" do canal de
+# resultados) e as características do cliente. O modelo usa esse histórico para
+# prever quanto um cliente vai levar:
+#   - regressão linear (mínimos quadrados) em [espécies, meses de pesca, falhas anteriores];
+#   - misturada com a média do próprio cliente quando ele já foi atendido antes.
+# A previsão ordena a fila de cada instância (maior primeiro; menor primeiro
+# conclui mais clientes cedo) e alimenta o ETA dos logs e do /stats.
+#
+# A divisão da base entre instâncias NÃO usa o histórico nem o status: as outras
+# instâncias gravam os dois durante o lote, e uma instância que começasse ou
+# reiniciasse depois calcularia outra divisão (cliente em duas instâncias, ou em
+# nenhuma). Ela usa custo_pelos_dados, que só depende dos dados de pesca.
+
+HISTORICO_ARQUIVO = os.path.join("temp_results", "historico_duracoes.jsonl")
+PADRAO_S = 420.0 # Sem histórico nenhum: ~7 min por cliente (login humano incluso)
+MINIMO_AJUSTE = 8 # Registros necessários para ajustar a regressão
+MINIMO_S = 30.0
+
+# Pesos de custo_pelos_dados (mesma ordem de grandeza das durações reais)
+CUSTO_FIXO_S = 240.0 # Login, Tela 1/2, envio e PDF
+CUSTO_ESPECIE_S = 25.0
+CUSTO_MES_S = 20.0
+
+def caracteristicas(registros, meses_pesca):
+    """(espécies, meses de pesca) a partir das linhas mensais do cliente."""
+    especies, meses = 0, set()
+    for reg in registros or []:
+        mes = str(reg.get("MES", ""))
+        alvo = next((m for m in meses_pesca if m.lower() in mes.lower()), None)
+        if alvo:
+            especies += 1
+            meses.add(alvo)
+    return especies, len(meses)
+
+def custo_pelos_dados(registros, meses_pesca):
+    """Custo relativo do cliente só pelos dados de pesca (igual em todas as instâncias)."""
+    especies, meses = caracteristicas(registros, meses_pesca)
+    return CUSTO_FIXO_S + CUSTO_ESPECIE_S * especies + CUSTO_MES_S * meses
+
+class ModeloDuracao:
+    def __init__(self, registros=None):
+        self.registros = registros or []
+        self._por_cpf = {}
+        for r in self.registros:
+            self._por_cpf.setdefault(r.get("cpf"), []).append(r)
+        self.coeficientes = None
+        self.media = float(np.mean([r["total_s"] for r in self.registros])) if self.registros else PADRAO_S
+        self._ajustar()
+
+    @classmethod
+    def carregar(cls, caminho=HISTORICO_ARQUIVO):
+        registros = []
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        r = json.loads(linha)
+                        if r.get("total_s", 0) > 0: registros.append(r)
+                    except ValueError:
+                        continue
+        return cls(registros)
+
+    def falhas_anteriores(self, cpf):
+        return sum(1 for r in self._por_cpf.get(cpf, []) if not r.get("ok"))
+
+    @staticmethod
+    def _vetor(especies, meses, falhas):
+        return [1.0, float(especies), float(meses), float(falhas)]
+
+    def _ajustar(self):
+        amostras = [r for r in self.registros if "especies" in r]
+        if len(amostras) < MINIMO_AJUSTE: return
+        falhas_ate = {}
+        x, y = [], []
+        for r in sorted(amostras, key=lambda r: r.get("ts", 0)):
+            cpf = r.get("cpf")
+            x.append(self._vetor(r["especies"], r.get("meses", 0), falhas_ate.get(cpf, 0)))
+            y.append(r["total_s"])
+            if not r.get("ok"): falhas_ate[cpf] = falhas_ate.get(cpf, 0) + 1
+        try:
+            self.coeficientes = np.linalg.lstsq(np.array(x), np.array(y), rcond=None)[0]
+        except np.linalg.LinAlgError:
+            self.coeficientes = None
+
+    def prever(self, cpf, especies, meses):
+        """Duração esperada (s) da próxima tentativa do cliente."""
+        if self.coeficientes is not None:
+            base = float(np.dot(self.coeficientes, self._vetor(especies, meses, self.falhas_anteriores(cpf))))
+        else:
+            base = self.media
+        proprios = [r["total_s"] for r in self._por_cpf.get(cpf, [])]
+        if proprios:
+            base = 0.5 * base + 0.5 * float(np.mean(proprios[-3:]))
+        return max(MINIMO_S, base)
+
+class Cronometro:
+    """Ouvinte do canal_resultados: mede cada tentativa por etapa e grava no histórico."""
+    def __init__(self, instancia=1, caminho=HISTORICO_ARQUIVO):
+        self.instancia = instancia
+        self.caminho = caminho
+        self.caracteristicas = {} # cpf -> {"especies", "meses", "previsto_s"} (preenchido antes de atender)
+        self._abertos = {}
+        self._lock = threading.Lock()
+
+    def ao_evento(self, evento):
+        tipo = evento.get("type")
+        if tipo == "progress":
+            with self._lock:
+                atual = self._abertos.setdefault(evento.get("cpf"), {"inicio": evento["ts"], "etapas": {}, "_em": {}})
+                etapa = evento.get("step")
+                if evento.get("state") == "start":
+                    atual["_em"][etapa] = evento["ts"]
+                elif etapa in atual["_em"]:
+                    duracao = evento["ts"] - atual["_em"].pop(etapa)
+                    atual["etapas"][etapa] = round(atual["etapas"].get(etapa, 0) + duracao, 1)
+        elif tipo == "retry":
+            self._finalizar(evento.get("cpf"), evento["ts"], False, "retry")
+        elif tipo == "result":
+            dados = evento.get("data") or {}
+            self._finalizar(dados.get("cpf"), evento["ts"], bool(dados.get("success")), "result")
+
+    def _finalizar(self, cpf, ts, ok, desfecho):
+        with self._lock:
+            atual = self._abertos.pop(cpf, None)
+        if not atual: return # Ex: rejeitado na validação, sem navegador
+        registro = {"cpf": cpf, "ts": ts, "instancia": self.instancia, "ok": ok, "desfecho": desfecho,
+                    "total_s": round(ts - atual["inicio"], 1), "etapas": atual["etapas"]}
+        registro.update(self.caracteristicas.get(cpf, {}))
+        previsto = registro.get("previsto_s")
+        print(f"[{self.instancia}] [DURAÇÃO] {cpf}: {registro['total_s']:.0f}s"
+              + (f" (previsto {previsto:.0f}s)" if previsto else ""))
+        try:
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            with open(self.caminho, "a", encoding="utf-8") as f: # Uma linha por escrita: instâncias não se misturam
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"[WARN] Falha ao gravar histórico de duração: {e}")
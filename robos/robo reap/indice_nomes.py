@@ -0,0 +1,103 @@
+import threading
+
+from normalizacao import texto_canonico
+
+# ==============================================================================
+# ÍNDICE DE NOMES DE CLIENTES (RECONCILIAÇÃO DE RESULTADOS)
+# ==============================================================================
+# Substitui os str.contains() sobre a coluna NOME (varredura da planilha inteira
+# a cada chamada, "MARIA SILVA" casando com "MARIA SILVA SANTOS" e "JOÃO" não
+# casando com "JOAO"). Monta uma vez por conteúdo da coluna:
+#   - mapa exato: nome canônico (sem acento, maiúsculo, espaços colapsados) -> linhas
+#   - índice de trigramas: trigrama -> nomes canônicos que o contêm
+# A busca exata é O(1); sem exata, os candidatos saem só das listas dos trigramas
+# do nome procurado (O(k)) e são ranqueados por Jaccard dos trigramas.
+
+SEMELHANCA_MINIMA = 0.85
+MARGEM_AMBIGUIDADE = 0.05 # Melhor candidato precisa ganhar do segundo por essa folga
+
+def trigramas(canonico):
+    texto = f"  {canonico} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+class IndiceNomes:
+    def __init__(self, pares):
+        """pares: iterável de (linha, nome), ex: serie.items() de um DataFrame."""
+        self.exato = {} # canônico -> [linhas]
+        self._trigramas = {} # canônico -> set de trigramas
+        self._postagens = {} # trigrama -> set de canônicos
+        for linha, nome in pares:
+            canonico = texto_canonico(nome)
+            if not canonico or canonico == "NAN": continue
+            self.exato.setdefault(canonico, []).append(linha)
+            if canonico not in self._trigramas:
+                tri = trigramas(canonico)
+                self._trigramas[canonico] = tri
+                for t in tri: self._postagens.setdefault(t, set()).add(canonico)
+
+    @classmethod
+    def da_coluna(cls, serie):
+        return cls(serie.items())
+
+    def candidatos(self, nome, limite=5):
+        """[(nome canônico, semelhança 0..1, linhas)] do mais parecido para o menos."""
+        alvo = texto_canonico(nome)
+        if not alvo: return []
+        if alvo in self.exato: return [(alvo, 1.0, self.exato[alvo])]
+        tri = trigramas(alvo)
+        comuns = {}
+        for t in tri:
+            for canonico in self._postagens.get(t, ()):
+                comuns[canonico] = comuns.get(canonico, 0) + 1
+        ranqueados = []
+        for canonico, n in comuns.items():
+            jaccard = n / (len(tri) + len(self._trigramas[canonico]) - n)
+            ranqueados.append((canonico, jaccard, self.exato[canonico]))
+        ranqueados.sort(key=lambda c: -c[1])
+        return ranqueados[:limite]
+
+    def comecando_por(self, inicio):
+        """Nomes canônicos que começam por `inicio` (só os que têm todos os trigramas dele)."""
+        texto = f"  {inicio}"
+        tri = [texto[i:i + 3] for i in range(len(texto) - 2)]
+        if not tri: return []
+        nomes = set.intersection(*(self._postagens.get(t, set()) for t in tri))
+        return [n for n in nomes if n.startswith(inicio)]
+
+    def localizar(self, nome, minimo=SEMELHANCA_MINIMA, corte=None):
+        """
+        Linhas do cliente, ou [] se não houver um candidato único e confiável:
+        nome exato; senão o mais parecido (>= minimo e com folga sobre o segundo).
+
+        corte: o chamador só confia nos primeiros N caracteres do nome (ex: 20). Se o
+        nome passar disso, aceita também um único nome da coluna que comece pelo nome
+        cortado. Nunca no sentido contrário: um nome da coluna mais curto que o
+        procurado não é o mesmo cliente.
+        """
+        cands = self.candidatos(nome)
+        if cands:
+            melhor = cands[0]
+            if melhor[1] >= 1.0: return melhor[2]
+            segundo = cands[1][1] if len(cands) > 1 else 0.0
+            if melhor[1] >= minimo and melhor[1] - segundo >= MARGEM_AMBIGUIDADE:
+                return melhor[2]
+        alvo = texto_canonico(nome)
+        if corte and len(alvo) > corte:
+            prefixos = self.comecando_por(alvo[:corte])
+            if len(prefixos) == 1: return self.exato[prefixos[0]]
+        return []
+
+# --- Cache por conteúdo da coluna (a planilha é relida a cada gravação, os nomes quase nunca mudam) ---
+_cache = {}
+_lock = threading.Lock()
+
+def indice_da_coluna(chave, serie):
+    """Índice da coluna de nomes, reconstruído só quando os nomes (ou a ordem das linhas) mudam."""
+    assinatura = hash((tuple(serie.index), tuple(serie.astype(str))))
+    with _lock:
+        atual = _cache.get(chave)
+        if atual and atual[0] == assinatura: return atual[1]
+    indice = IndiceNomes.da_coluna(serie)
+    with _lock:
+        _cache[chave] = (assinatura, indice)
+    return indice
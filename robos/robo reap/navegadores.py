@@ -0,0 +1,237 @@
+import os
+import time
+import queue
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ==============================================================================
+# GERENCIADOR DE NAVEGADORES (REUSO, RECICLAGEM E MEMÓRIA)
+# ==============================================================================
+# Cada sessão mantém um Chrome vivo entre clientes (sem pagar a inicialização a
+# cada um) e o recicla ENTRE clientes, nunca no meio de um, quando:
+#   - atendeu max_clientes clientes;
+#   - o RSS do Chrome + chromedriver passou de limite_rss_mb;
+#   - a sessão do WebDriver caiu (invalid session id, renderer morto).
+# As amostras de RSS (psutil) vão para `ao_amostrar` (canal de métricas).
+#
+# Pipeline (profundidade > 0): além do navegador em uso, `profundidade` navegadores
+# ficam prontos em segundo plano (abertos, limpos e parados na tela de login do
+# gov.br, via `preparar`). O cliente seguinte pega um pronto na hora e o navegador
+# devolvido é limpo/preparado de novo em paralelo; o tempo de preparo que deixou
+# de ser esperado é contabilizado em `economia_s`.
+
+def medir_rss(driver=None):
+    """RSS (MB) do Chrome + chromedriver (árvore de processos) e do próprio Python."""
+    if psutil is None: return {}
+    amostra = {"python_mb": round(psutil.Process(os.getpid()).memory_info().rss / 1048576, 1)}
+    if driver is None: return amostra
+
+    raizes = []
+    try: raizes.append(driver.service.process.pid) # chromedriver
+    except Exception: pass
+    if getattr(driver, "browser_pid", None): raizes.append(driver.browser_pid) # Chrome (undetected_chromedriver)
+
+    processos = {}
+    for pid in raizes:
+        try:
+            raiz = psutil.Process(pid)
+            for p in [raiz] + raiz.children(recursive=True):
+                processos[p.pid] = p
+        except psutil.Error:
+            continue
+    total = 0
+    for p in processos.values():
+        try: total += p.memory_info().rss
+        except psutil.Error: pass
+    amostra["navegador_mb"] = round(total / 1048576, 1)
+    amostra["processos"] = len(processos)
+    return amostra
+
+def navegador_vivo(driver):
+    """Sonda barata: a sessão do WebDriver ainda responde?"""
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
+
+class GerenciadorNavegador:
+    """Um navegador por sessão, reaproveitado entre clientes e reciclado entre eles."""
+    def __init__(self, criar, nome="S1", max_clientes=10, limite_rss_mb=1500, ao_amostrar=None,
+                 profundidade=0, preparar=None, validade_preparo=600, ao_encerrar=None):
+        self.criar = criar # criar(slot): slot distingue o perfil de cada navegador do pipeline
+        self.nome = nome
+        self.max_clientes = max_clientes
+        self.limite_rss_mb = limite_rss_mb
+        self.ao_amostrar = ao_amostrar
+        self.ao_encerrar = ao_encerrar # Ex: apagar o perfil temporário do navegador fechado
+        self.driver = None
+        self.clientes = 0
+        self.reciclagens = 0
+        # Pipeline
+        self.profundidade = profundidade if preparar else 0
+        self.preparar = preparar
+        self.validade_preparo = validade_preparo # Tela de login parada há muito tempo expira no gov.br
+        self.pronto = False # O navegador entregue por obter() já está na tela de login?
+        self.espera_s = 0.0
+        self.economia_s = 0.0
+        self.ultimo_preparo = {}
+        self._prontos = queue.Queue()
+        self._sujos = queue.Queue()
+        self._slots = {} # id(driver) -> slot do perfil
+        self._contagem = {} # id(driver) -> clientes atendidos
+        self._cond = threading.Condition()
+        self._preparador = None
+        self._encerrado = False
+
+    def obter(self):
+        """Navegador pronto para o próximo cliente (cria se não houver)."""
+        if self.profundidade:
+            return self._obter_do_pipeline()
+        if self.driver is None:
+            self.driver = self.criar(0)
+            self.clientes = 0
+        return self.driver
+
+    def devolver(self, saudavel=True):
+        """Fim de um cliente: amostra a memória e recicla se algum limite foi atingido."""
+        if self.driver is None: return None
+        self.clientes += 1
+        amostra = self.amostrar()
+        motivo = None
+        if not saudavel:
+            motivo = "sessão do navegador caiu"
+        elif self.max_clientes and self.clientes >= self.max_clientes:
+            motivo = f"{self.clientes} clientes atendidos"
+        elif self.limite_rss_mb and amostra.get("navegador_mb", 0) >= self.limite_rss_mb:
+            motivo = f"memória {amostra['navegador_mb']:.0f} MB >= {self.limite_rss_mb} MB"
+        if motivo:
+            self.reciclar(motivo)
+        elif self.profundidade:
+            # Volta para o preparador; o próximo cliente já pega outro pronto
+            self._contagem[id(self.driver)] = self.clientes
+            self._sujos.put(self.driver)
+            self.driver = None
+            with self._cond: self._cond.notify_all()
+        return amostra
+
+    # --- Pipeline ---
+    def _obter_do_pipeline(self):
+        self._iniciar_preparador()
+        inicio = time.time()
+        while True:
+            try:
+                driver, pronto_em, custo = self._prontos.get(timeout=5)
+                break
+            except queue.Empty:
+                if not self._preparador.is_alive(): # Preparador morreu: não deixa o cliente preso
+                    self._preparador = None
+                    self._iniciar_preparador()
+        espera = time.time() - inicio
+        self.driver = driver
+        self.clientes = self._contagem.get(id(driver), 0)
+        self.pronto = time.time() - pronto_em < self.validade_preparo
+        economia = max(0.0, custo - espera) if self.pronto else 0.0
+        self.espera_s += espera
+        self.economia_s += economia
+        self.ultimo_preparo = {"espera_s": round(espera, 1), "preparo_s": round(custo, 1),
+                               "economia_s": round(economia, 1), "economia_total_s": round(self.economia_s, 1),
+                               "pronto": self.pronto}
+        return driver
+
+    def _iniciar_preparador(self):
+        if self._preparador is None:
+            self._preparador = threading.Thread(target=self._preparar_continuamente, daemon=True)
+            self._preparador.start()
+
+    def _vivos(self):
+        return len(self._slots)
+
+    def _preparar_continuamente(self):
+        while not self._encerrado:
+            try: driver = self._sujos.get_nowait()
+            except queue.Empty: driver = None
+            if driver is None:
+                with self._cond:
+                    # Em uso + prontos não passam de 1 + profundidade
+                    if self._vivos() >= self.profundidade + 1:
+                        self._cond.wait(timeout=1)
+                        continue
+                slot = min(set(range(self.profundidade + 1)) - set(self._slots.values()))
+                inicio = time.time()
+                try:
+                    driver = self.criar(slot)
+                except Exception as e:
+                    print(f"[{self.nome}] [PIPELINE] Falha ao abrir navegador (slot {slot}): {e}")
+                    time.sleep(5)
+                    continue
+                self._slots[id(driver)] = slot
+            else:
+                inicio = time.time()
+            try:
+                self.preparar(driver)
+                if self._encerrado: # Execução acabou enquanto preparava
+                    self._descartar(driver)
+                    return
+                self._prontos.put((driver, time.time(), time.time() - inicio))
+            except Exception as e:
+                print(f"[{self.nome}] [PIPELINE] Falha ao preparar navegador: {e}")
+                self._descartar(driver)
+                time.sleep(2)
+
+    def _descartar(self, driver):
+        try: driver.quit()
+        except Exception: pass
+        if self.ao_encerrar:
+            try: self.ao_encerrar(driver)
+            except Exception: pass
+        self._slots.pop(id(driver), None)
+        self._contagem.pop(id(driver), None)
+        with self._cond: self._cond.notify_all()
+
+    def amostrar(self, reciclado=None):
+        amostra = medir_rss(self.driver)
+        if amostra:
+            amostra.update({"sessao": self.nome, "clientes": self.clientes, "reciclagens": self.reciclagens})
+            if reciclado: amostra["reciclado"] = reciclado
+            if self.ao_amostrar:
+                try: self.ao_amostrar(amostra)
+                except Exception: pass
+        return amostra
+
+    def reciclar(self, motivo):
+        print(f"[{self.nome}] [NAVEGADOR] Reciclando Chrome ({motivo}).")
+        self.encerrar()
+        self.reciclagens += 1
+        self.amostrar(reciclado=motivo)
+
+    def encerrar(self):
+        if self.driver is not None:
+            self._descartar(self.driver)
+            self.driver = None
+
+    def encerrar_todos(self):
+        """Fim da execução: fecha também os navegadores parados no pipeline."""
+        self._encerrado = True
+        self.encerrar()
+        for fila in (self._prontos, self._sujos):
+            while True:
+                try: item = fila.get_nowait()
+                except queue.Empty: break
+                self._descartar(item[0] if isinstance(item, tuple) else item)
+
+def iniciar_monitor(gerenciadores, intervalo=30):
+    """Amostra periodicamente todas as sessões (o crescimento no meio de um cliente também aparece)."""
+    if psutil is None: return None
+    def _run():
+        while True:
+            time.sleep(intervalo)
+            for g in list(gerenciadores.values()):
+                if g.driver is not None: g.amostrar()
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    return t
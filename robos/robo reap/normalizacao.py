@@ -0,0 +1,42 @@
+import re
+import unicodedata
+
+# ==============================================================================
+# NORMALIZAÇÃO DE TEXTOS E NÚMEROS
+# ==============================================================================
+# Comparações tolerantes entre o que vem da planilha/JSON e o que o portal
+# mostra: acentos, caixa, espaços e formatos numéricos brasileiros ("R$ 8,50").
+
+def dobrar_acentos(texto):
+    """'Maranhão' -> 'Maranhao'."""
+    return "".join(ch for ch in unicodedata.normalize("NFKD", str(texto)) if not unicodedata.combining(ch))
+
+def texto_canonico(valor):
+    """Chave de comparação: sem acento, maiúsculo e com espaços colapsados."""
+    if valor is None: return ""
+    return re.sub(r"\s+", " ", dobrar_acentos(valor)).strip().upper()
+
+def para_float(valor):
+    """Converte 8.5, '8,50', 'R$ 1.234,50', '50' em float. None se não for número."""
+    if valor is None: return None
+    if isinstance(valor, (int, float)):
+        return None if valor != valor else float(valor) # NaN -> None
+    texto = str(valor).replace("R$", "").replace("\xa0", "").strip()
+    if not texto: return None
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".") # Formato BR: milhar com ponto, decimal com vírgula
+    try: return float(texto)
+    except ValueError: return None
+
+def valores_iguais(atual, alvo, numerico=False, rotulo=None):
+    """
+    O valor atual do campo já corresponde ao alvo? Igualdade canônica, nunca parcial
+    ('São Luís' não é 'São Luís Gonzaga do Maranhão'). Dropdowns mostram o rótulo
+    completo da opção: passe em `rotulo` o rótulo aprendido para o alvo, se houver.
+    """
+    if atual is None or str(atual).strip() == "": return False
+    if numerico:
+        a, b = para_float(atual), para_float(alvo)
+        return a is not None and b is not None and abs(a - b) < 0.005
+    atual_c = texto_canonico(atual)
+    return atual_c in (texto_canonico(alvo), texto_canonico(rotulo)) and atual_c != ""
@@ -4,9 +4,11 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
+from utils import instrumentacao_driver
 
 class BasePage:
     def __init__(self, driver: WebDriver, logger=None):
+        instrumentacao_driver.instrumentar(driver) # Opt-in (ADV_INSTRUMENTAR); idempotente
         self.driver = driver
         self.logger = logger
         self.default_timeout = 15
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ==============================================================================
+# PERFIS EFÊMEROS DO CHROME (CLONES DE UM PERFIL MODELO)
+# ==============================================================================
+# Em vez de reaproveitar chrome_profile_N (que cresce a temporada inteira com
+# cache/IndexedDB e deixa a inicialização cada vez mais lenta), cada navegador
+# recebe uma cópia nova de um perfil modelo mínimo e a cópia é apagada quando o
+# navegador fecha. Tempo de inicialização constante e nada vaza entre navegadores.
+#
+#   - Modelo: chrome_profile_modelo (no CWD). Na primeira vez o Chrome é aberto
+#     nele uma vez (aquecimento) e depois o que é volátil é podado.
+#   - Clones: /dev/shm (tmpfs) no Linux, senão a pasta temporária do sistema.
+#     No Linux a cópia usa `cp --reflink=auto` (copy-on-write onde o FS suporta).
+#   - Cada clone leva um arquivo DONO com o pid (e a hora de início) do processo
+#     que o criou. Na inicialização só são apagados clones cujo dono morreu (crash):
+#     um lote longo de outra instância nunca perde o perfil no meio. Sem como
+#     verificar o pid (clone antigo sem DONO, ou Windows sem psutil) vale a idade.
+
+MODELO_DIR = os.path.join(os.getcwd(), "chrome_profile_modelo")
+PREFIXO_CLONE = "reap_perfil_"
+ARQUIVO_DONO = ".reap_dono"
+ORFAO_HORAS = 12
+
+# Tudo que o Chrome recria sozinho e que não deve ir para os clones
+VOLATEIS = [
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache", "GraphiteDawnCache", "DawnCache",
+    "Service Worker", "IndexedDB", "Local Storage", "Session Storage", "Sessions", "blob_storage",
+    "Crashpad", "Cookies", "Cookies-journal", "History", "History-journal", "Visited Links",
+    "Network Persistent State", "TransportSecurity", "SingletonLock", "SingletonCookie", "SingletonSocket",
+    "lockfile",
+]
+
+def _pasta_clones():
+    if sys.platform.startswith("linux") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+def _podar(pasta):
+    """Remove o que é volátil do perfil (na raiz e em Default/)."""
+    for base in (pasta, os.path.join(pasta, "Default")):
+        for nome in VOLATEIS:
+            caminho = os.path.join(base, nome)
+            if os.path.isdir(caminho) and not os.path.islink(caminho):
+                shutil.rmtree(caminho, ignore_errors=True)
+            elif os.path.lexists(caminho):
+                try: os.remove(caminho)
+                except OSError: pass
+
+def _copiar(origem, destino):
+    if sys.platform.startswith("linux") and shutil.which("cp"):
+        r = subprocess.run(["cp", "-a", "--reflink=auto", origem, destino], capture_output=True)
+        if r.returncode == 0: return
+        shutil.rmtree(destino, ignore_errors=True)
+    shutil.copytree(origem, destino, symlinks=True)
+
+def _inicio_processo(pid):
+    if psutil is None: return None
+    try: return round(psutil.Process(pid).create_time(), 1)
+    except psutil.Error: return None
+
+def _marcar_dono(pasta):
+    with open(os.path.join(pasta, ARQUIVO_DONO), "w", encoding="utf-8") as f:
+        f.write(f"{os.getpid()} {_inicio_processo(os.getpid())}")
+
+def _dono_vivo(pasta):
+    """True/False se dá para saber se o processo dono do clone está vivo, senão None."""
+    try:
+        with open(os.path.join(pasta, ARQUIVO_DONO), encoding="utf-8") as f:
+            pid_txt, inicio_txt = f.read().split()
+        pid = int(pid_txt)
+    except (OSError, ValueError):
+        return None
+    if psutil is not None:
+        if not psutil.pid_exists(pid): return False
+        inicio = _inicio_processo(pid)
+        if inicio_txt == "None" or inicio is None: return True
+        return abs(inicio - float(inicio_txt)) < 1 # Mesmo pid reaproveitado por outro processo = morto
+    if os.name == "nt": return None # Sem psutil no Windows não há como testar o pid
+    try:
+        os.kill(pid, 0)
+        return True
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+
+def descartar(pasta, tentativas=5):
+    """Apaga um clone (no Windows o Chrome pode segurar arquivos por um instante após o quit)."""
+    if not pasta or not os.path.basename(pasta).startswith(PREFIXO_CLONE): return
+    for _ in range(tentativas):
+        shutil.rmtree(pasta, ignore_errors=True)
+        if not os.path.exists(pasta): return
+        time.sleep(0.5)
+    print(f"[WARN] Não foi possível apagar o perfil temporário {pasta}.")
+
+class GerenciadorPerfis:
+    def __init__(self, modelo_dir=MODELO_DIR, aquecer=None):
+        """`aquecer(pasta)` abre e fecha o Chrome na pasta do modelo (primeira vez)."""
+        self.modelo_dir = modelo_dir
+        self.aquecer = aquecer
+        self.pasta = _pasta_clones()
+        self._lock = threading.Lock()
+        self._pronto = False
+
+    def limpar_orfaos(self):
+        """Clones cujo processo dono morreu sem descartar (ou, sem dono verificável, mais velhos que ORFAO_HORAS)."""
+        limite = time.time() - ORFAO_HORAS * 3600
+        try: nomes = os.listdir(self.pasta)
+        except OSError: return
+        for nome in nomes:
+            caminho = os.path.join(self.pasta, nome)
+            if not nome.startswith(PREFIXO_CLONE): continue
+            try:
+                vivo = _dono_vivo(caminho)
+                if vivo is False or (vivo is None and os.path.getmtime(caminho) < limite):
+                    descartar(caminho)
+            except OSError: pass
+
+    def _garantir_modelo(self):
+        with self._lock:
+            if self._pronto: return
+            trava = self.modelo_dir + ".lock" # Várias instâncias podem chegar aqui juntas
+            os.makedirs(os.path.dirname(self.modelo_dir) or ".", exist_ok=True)
+            inicio = time.time()
+            while True:
+                try:
+                    os.close(os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    break
+                except FileExistsError:
+                    if time.time() - inicio > 120:
+                        try: os.remove(trava) # Trava órfã
+                        except OSError: pass
+                    time.sleep(0.5)
+            try:
+                if not os.path.exists(os.path.join(self.modelo_dir, "Local State")):
+                    print("[PERFIS] Preparando o perfil modelo do Chrome (primeira execução)...")
+                    os.makedirs(self.modelo_dir, exist_ok=True)
+                    if self.aquecer: self.aquecer(self.modelo_dir)
+                    _podar(self.modelo_dir)
+                self._pronto = True
+            finally:
+                try: os.remove(trava)
+                except OSError: pass
+            self.limpar_orfaos()
+
+    def clonar(self, nome):
+        """Cópia nova do modelo para um navegador. Retorna o caminho (descartar() ao fechar)."""
+        self._garantir_modelo()
+        destino = tempfile.mkdtemp(prefix=f"{PREFIXO_CLONE}{nome}_", dir=self.pasta)
+        os.rmdir(destino) # cp/copytree criam a pasta
+        inicio = time.time()
+        _copiar(self.modelo_dir, destino)
+        _podar(destino) # Modelo pode ter sido tocado por fora; clone sempre nasce limpo
+        _marcar_dono(destino)
+        print(f"[PERFIS] Perfil temporário {os.path.basename(destino)} pronto em {time.time() - inicio:.2f}s.")
+        return destino
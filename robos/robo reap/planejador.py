@@ -0,0 +1,195 @@
+import os
+import json
+import heapq
+import argparse
+
+import pandas as pd
+
+# ==============================================================================
+# PLANEJAMENTO DA FILA (MODO EXCEL)
+# ==============================================================================
+# Calcula de uma vez só, de forma vetorizada, quem precisa ser atendido.
+# Substitui o teste linha a linha do loop principal e o apply() do
+# precisa_gerar_dados. As duas regras continuam diferentes de propósito:
+#   - fila (montar_plano): status por substring (TERMOS_*), só progresso_final.json
+#   - gerador (precisa_gerar): status exato (STATUS_FINAIS_GERADOR) e todos os
+#     temp_results/*.json. Mais conservador: prepara dados também para quem parou
+#     numa pendência parcial ("SENHA", "2FA"...) ou aparece só num log antigo.
+
+# Classes de status (ordem de prioridade na classificação)
+CLASSE_CONCLUIDO = "CONCLUIDO"
+CLASSE_PENDENCIA = "PENDENCIA"
+CLASSE_RETRY = "RETRY"
+CLASSE_NOVO = "NOVO"
+
+CLASSES_A_PROCESSAR = [CLASSE_RETRY, CLASSE_NOVO]
+
+TERMOS_CONCLUIDO = ["OK", "SÓ FALTA PDF"]
+TERMOS_PENDENCIA = ["PENDENCIA", "PENDÊNCIA", "SENHA", "NIVEL", "2FA", "ETAPA", "BLOQUEADO", "AUTORIZADO"]
+TERMOS_PULAR = TERMOS_CONCLUIDO + TERMOS_PENDENCIA
+
+STATUS_FINAIS_GERADOR = {"OK", "PENDENCIA", "SÓ FALTA PDF"}
+
+def _regex_termos(termos):
+    return "|".join(termos)
+
+def carregar_progresso(results_file):
+    """Lê o progresso_final.json (CPF -> {STATUS, ...}). Retorna {} se não existir."""
+    if not os.path.exists(results_file):
+        return {}
+    try:
+        with open(results_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return {}
+
+def carregar_progresso_pasta(pasta):
+    """Junta o progresso de todos os .json da pasta (logs de instâncias e versões antigas)."""
+    progresso = {}
+    if not os.path.isdir(pasta):
+        return progresso
+    for nome in os.listdir(pasta):
+        if not nome.endswith(".json"): continue
+        try:
+            with open(os.path.join(pasta, nome), "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except Exception:
+            continue
+        if isinstance(dados, dict):
+            progresso.update({cpf: p for cpf, p in dados.items() if isinstance(p, dict)})
+    return progresso
+
+def _classificar_status(status):
+    """Classifica uma Series de status (já em maiúsculas) em CONCLUIDO / PENDENCIA / None."""
+    classe = pd.Series(None, index=status.index, dtype=object)
+    classe[status.str.contains(_regex_termos(TERMOS_PENDENCIA), regex=True, na=False)] = CLASSE_PENDENCIA
+    # Concluído tem prioridade (ex: "OK" vence uma pendência antiga no mesmo texto)
+    classe[status.str.contains(_regex_termos(TERMOS_CONCLUIDO), regex=True, na=False)] = CLASSE_CONCLUIDO
+    return classe
+
+def montar_plano(df_clientes, df_dados=None, progresso_local=None, instancia=1, total_instancias=1):
+    """
+    Monta o plano de trabalho em uma única passada vetorizada.
+
+    Retorna um DataFrame com uma linha por cliente da fatia da instância e as colunas:
+    CPF, NOME, SENHA_GOV, STATUS_EXCEL, STATUS_LOCAL, CLASSE, PROCESSAR, TEM_DADOS.
+    A ordem original da planilha é preservada.
+    """
+    progresso_local = progresso_local or {}
+
+    # Mesma divisão intercalada do loop principal (Instância 1: 0, 2, 4... / Instância 2: 1, 3, 5...)
+    df = df_clientes.iloc[instancia-1::total_instancias]
+
+    plano = pd.DataFrame(index=df.index)
+    plano["CPF"] = df["CPF"].astype(str)
+    plano["NOME"] = df["NOME"]
+    plano["SENHA_GOV"] = df["SENHA_GOV"] if "SENHA_GOV" in df.columns else ""
+
+    if "STATUS" in df.columns:
+        plano["STATUS_EXCEL"] = df["STATUS"].fillna("").astype(str).str.upper()
+    else:
+        plano["STATUS_EXCEL"] = ""
+
+    status_local = {cpf: str(p.get("STATUS", "")).upper() for cpf, p in progresso_local.items()}
+    plano["STATUS_LOCAL"] = plano["CPF"].map(status_local)
+
+    classe_excel = _classificar_status(plano["STATUS_EXCEL"])
+    classe_local = _classificar_status(plano["STATUS_LOCAL"].fillna(""))
+
+    # Excel manda; depois o log local; quem está no log sem status final é RETRY
+    classe = classe_excel.fillna(classe_local)
+    classe[classe.isna() & plano["STATUS_LOCAL"].notna()] = CLASSE_RETRY
+    plano["CLASSE"] = classe.fillna(CLASSE_NOVO)
+    plano["PROCESSAR"] = plano["CLASSE"].isin(CLASSES_A_PROCESSAR)
+
+    if df_dados is not None and "NOME" in df_dados.columns:
+        plano["TEM_DADOS"] = plano["NOME"].isin(set(df_dados["NOME"].unique()))
+    else:
+        plano["TEM_DADOS"] = False
+
+    return plano
+
+def precisa_gerar(df_clientes, df_dados, progresso_local):
+    """
+    True se algum cliente da base inteira ainda não finalizado (status exato em
+    STATUS_FINAIS_GERADOR, na planilha ou no progresso local) não tem linhas em
+    dados.xlsx. df_dados None = arquivo ausente ou corrompido.
+    """
+    cpfs = df_clientes["CPF"].astype(str)
+    if "STATUS" in df_clientes.columns:
+        status_excel = df_clientes["STATUS"].astype(str).str.upper()
+    else:
+        status_excel = pd.Series("", index=df_clientes.index)
+    status_local = cpfs.map({cpf: str(p.get("STATUS", "")).upper() for cpf, p in progresso_local.items()})
+    finalizado = status_excel.isin(STATUS_FINAIS_GERADOR) | status_local.isin(STATUS_FINAIS_GERADOR)
+
+    pendentes = df_clientes[~finalizado]
+    if pendentes.empty: return False
+    if df_dados is None or "NOME" not in df_dados.columns: return True
+    return not pendentes["NOME"].isin(set(df_dados["NOME"].unique())).all()
+
+def agrupar_dados_por_nome(df_dados):
+    """Agrupa dados.xlsx por NOME uma única vez (evita df_d[df_d['NOME'] == nome] por cliente)."""
+    if df_dados is None or "NOME" not in df_dados.columns:
+        return {}
+    return {nome: grupo for nome, grupo in df_dados.groupby("NOME", sort=False)}
+
+def dividir_por_carga(custos, total_instancias):
+    """
+    Divide itens entre instâncias pela carga prevista (LPT): do mais longo para o
+    mais curto, cada item vai para a instância com menor soma até então.
+    Retorna uma lista de índices (na ordem original) por instância.
+
+    Determinística: empates vão para o item de menor índice e para a instância de
+    menor número, então instâncias que calculam com os mesmos custos chegam à
+    mesma divisão sem conversar.
+    """
+    total_instancias = max(1, total_instancias)
+    partes = [[] for _ in range(total_instancias)]
+    cargas = [(0.0, n) for n in range(total_instancias)]
+    for i in sorted(range(len(custos)), key=lambda i: (-custos[i], i)):
+        carga, n = heapq.heappop(cargas)
+        partes[n].append(i)
+        heapq.heappush(cargas, (carga + custos[i], n))
+    return [sorted(p) for p in partes]
+
+def itens_pendentes(plano):
+    """Lista compacta (dicts) do que os workers devem processar, na ordem da planilha."""
+    pend = plano[plano["PROCESSAR"]]
+    return pend[["CPF", "NOME", "SENHA_GOV", "CLASSE", "STATUS_LOCAL", "TEM_DADOS"]].to_dict("records")
+
+def resumir_plano(plano):
+    """Contagens por classe e de clientes pendentes sem dados de pesca."""
+    contagem = plano["CLASSE"].value_counts()
+    pend = plano[plano["PROCESSAR"]]
+    return {
+        "total": int(len(plano)),
+        "concluidos": int(contagem.get(CLASSE_CONCLUIDO, 0)),
+        "pendencias": int(contagem.get(CLASSE_PENDENCIA, 0)),
+        "retry": int(contagem.get(CLASSE_RETRY, 0)),
+        "novos": int(contagem.get(CLASSE_NOVO, 0)),
+        "a_processar": int(len(pend)),
+        "sem_dados_pesca": int((~pend["TEM_DADOS"]).sum()),
+    }
+
+def imprimir_resumo(resumo, prefixo=""):
+    print(f"{prefixo}[PLANO] Total:                 {resumo['total']}")
+    print(f"{prefixo}[PLANO] Concluídos (pular):    {resumo['concluidos']}")
+    print(f"{prefixo}[PLANO] Pendências (pular):    {resumo['pendencias']}")
+    print(f"{prefixo}[PLANO] Retentativas:          {resumo['retry']}")
+    print(f"{prefixo}[PLANO] Novos:                 {resumo['novos']}")
+    print(f"{prefixo}[PLANO] A processar:           {resumo['a_processar']}")
+    print(f"{prefixo}[PLANO]   sem dados de pesca:  {resumo['sem_dados_pesca']}")
+
+if __name__ == "__main__":
+    # Dry-run independente: python planejador.py [--instancia N --total_instances M]
+    # (fatia intercalada; o robô divide a base inteira pela duração prevista)
+    parser = argparse.ArgumentParser(description="Plano de trabalho do Robô REAP (sem abrir navegador)")
+    parser.add_argument("--instancia", type=int, default=1)
+    parser.add_argument("--total_instances", type=int, default=1)
+    args = parser.parse_args()
+
+    df_c = pd.read_excel("base_clientes.xlsx")
+    df_d = pd.read_excel("dados.xlsx") if os.path.exists("dados.xlsx") else None
+    progresso = carregar_progresso("temp_results/progresso_final.json")
+    imprimir_resumo(resumir_plano(montar_plano(df_c, df_d, progresso, args.instancia, args.total_instances)))
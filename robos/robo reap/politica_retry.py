@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import time
+import random
+
+# ==============================================================================
+# POLÍTICA DE RETRY E DISJUNTOR DO PORTAL
+# ==============================================================================
+# Classifica a falha de um cliente e decide se vale retentar, quando, e se o
+# portal está fora do ar para todas as instâncias (disjuntor compartilhado em
+# arquivo). O cliente que falha volta para o fim da fila com um "não antes de",
+# em vez de travar o worker com time.sleep fixo.
+
+# Categorias de falha
+FALHA_PARADO = "PARADO"           # Usuário mandou parar
+FALHA_CLIENTE = "CLIENTE"         # Senha, nível gov.br, 2FA, pendência: retentar não resolve
+FALHA_NAVEGADOR = "NAVEGADOR"     # Chrome/driver caiu (invalid session id etc): transitória
+FALHA_PORTAL = "PORTAL"           # Portal lento/fora do ar: transitória e conta para o disjuntor
+FALHA_DESCONHECIDA = "DESCONHECIDA"
+
+_TERMOS = [
+    (FALHA_PARADO, ["PARADO"]),
+    (FALHA_CLIENTE, ["LOGIN", "SENHA", "PENDEN", "PENDÊN", "AUTORIZADO", "NIVEL", "NÍVEL", "2FA",
+                     "CANCELADO", "BLOQUEADO"]),
+    (FALHA_NAVEGADOR, ["INVALID SESSION", "CHROME NOT REACHABLE", "DISCONNECTED", "NO SUCH WINDOW",
+                       "TARGET WINDOW ALREADY CLOSED", "SESSION DELETED", "RENDERER", "CONNECTIONRESET",
+                       "MAX RETRIES EXCEEDED", "FAILED TO ESTABLISH A NEW CONNECTION"]),
+    (FALHA_PORTAL, ["TIMEOUT", "TIMED OUT", "TEMPO LIMITE", "BAD GATEWAY", "GATEWAY TIMEOUT",
+                    "SERVICE UNAVAILABLE", "INDISPONÍVEL", "INDISPONIVEL", "MANUTENÇÃO", "ERR_CONNECTION",
+                    "ERR_NAME_NOT_RESOLVED", "ERR_TIMED_OUT", "ERR_INTERNET_DISCONNECTED", "ERRO AO ENVIAR"]),
+]
+
+# Código HTTP só conta com contexto: número solto também aparece em CPFs e nos
+# endereços hexadecimais da stacktrace do chromedriver
+_HTTP_PORTAL = re.compile(r"\b(?:HTTP|STATUS|C[OÓ]DIGO|GATEWAY)\D{0,12}\b50[234]\b|\b50[234]\s*(?:BAD|SERVICE|GATEWAY)")
+
+def classificar_falha(motivo):
+    """Mapeia a mensagem de falha (motivo) para uma das categorias FALHA_*."""
+    # Só a mensagem: a stacktrace do Selenium ("Stacktrace:" em diante) é ruído
+    texto = str(motivo or "").upper().split("STACKTRACE:")[0]
+    for categoria, termos in _TERMOS:
+        if any(t in texto for t in termos):
+            return categoria
+    if _HTTP_PORTAL.search(texto):
+        return FALHA_PORTAL
+    # TimeoutException do Selenium chega como "Erro: Message: " (texto vazio)
+    if texto.strip().rstrip(":").endswith("MESSAGE"):
+        return FALHA_PORTAL
+    return FALHA_DESCONHECIDA
+
+class PoliticaRetry:
+    """Backoff exponencial com jitter e limite de tentativas por categoria."""
+    def __init__(self, max_tentativas=None, base=5.0, teto=300.0):
+        self.max_tentativas = max_tentativas or {
+            FALHA_PARADO: 1,
+            FALHA_CLIENTE: 1,
+            FALHA_NAVEGADOR: 3,
+            FALHA_PORTAL: 4,
+            FALHA_DESCONHECIDA: 3,
+        }
+        self.base = base
+        self.teto = teto
+
+    def deve_retentar(self, categoria, tentativa):
+        """tentativa = quantas já foram feitas (1 = primeira falhou)."""
+        return tentativa < self.max_tentativas.get(categoria, 1)
+
+    def atraso(self, tentativa):
+        """Segundos até a próxima tentativa: base * 2^(n-1), com jitter de ±50% e teto."""
+        bruto = min(self.teto, self.base * (2 ** max(0, tentativa - 1)))
+        return bruto * random.uniform(0.5, 1.5)
+
+class DisjuntorPortal:
+    """
+    Circuit breaker compartilhado entre instâncias (arquivo JSON + lock).
+    Abre após `limiar` falhas de portal em `janela` segundos (somando todas as
+    instâncias) e fica aberto por `tempo_aberto` segundos; depois libera uma
+    tentativa de sondagem (meio-aberto). Sucesso fecha o disjuntor.
+    """
+    def __init__(self, nome="portal", pasta="temp_results", limiar=5, janela=120, tempo_aberto=180):
+        os.makedirs(pasta, exist_ok=True)
+        self.arquivo = os.path.join(pasta, f"disjuntor_{nome}.state")
+        self.lock = self.arquivo + ".lock"
+        self.limiar = limiar
+        self.janela = janela
+        self.tempo_aberto = tempo_aberto
+
+    # --- Lock entre processos (criação exclusiva do arquivo) ---
+    def _travar(self, timeout=5):
+        inicio = time.time()
+        while time.time() - inicio < timeout:
+            try:
+                os.close(os.open(self.lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                # Lock órfão (processo morreu segurando): descarta após 30s
+                try:
+                    if time.time() - os.path.getmtime(self.lock) > 30: os.remove(self.lock)
+                except OSError: pass
+                time.sleep(0.05)
+        return False
+
+    def _destravar(self):
+        try: os.remove(self.lock)
+        except OSError: pass
+
+    def _ler(self):
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except:
+            return {"falhas": [], "aberto_ate": 0, "sondando_desde": 0}
+
+    def _gravar(self, estado):
+        tmp = self.arquivo + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f)
+        os.replace(tmp, self.arquivo)
+
+    def _atualizar(self, fn):
+        if not self._travar(): return None
+        try:
+            estado = self._ler()
+            resultado = fn(estado)
+            self._gravar(estado)
+            return resultado
+        finally:
+            self._destravar()
+
+    # --- API ---
+    def registrar_falha(self):
+        def _fn(estado):
+            agora = time.time()
+            meio_aberto = estado.get("aberto_ate", 0) and estado["aberto_ate"] <= agora
+            estado["falhas"] = [t for t in estado.get("falhas", []) if agora - t < self.janela] + [agora]
+            if meio_aberto or len(estado["falhas"]) >= self.limiar:
+                # Sondagem falhou ou limiar atingido: (re)abre
+                estado["aberto_ate"] = agora + self.tempo_aberto
+                estado["falhas"] = []
+                estado["sondando_desde"] = 0
+                return True
+            return False
+        abriu = self._atualizar(_fn)
+        if abriu:
+            print(f"[DISJUNTOR] Portal instável (falhas em todas as instâncias). Pausando tentativas por {self.tempo_aberto}s.")
+
+    def registrar_sucesso(self):
+        def _fn(estado):
+            if estado.get("aberto_ate", 0):
+                print("[DISJUNTOR] Portal respondeu. Disjuntor fechado.")
+            estado["falhas"] = []
+            estado["aberto_ate"] = 0
+            estado["sondando_desde"] = 0
+        self._atualizar(_fn)
+
+    def liberado(self):
+        """True se pode tentar agora. No meio-aberto, só uma instância por vez leva a sondagem."""
+        def _fn(estado):
+            agora = time.time()
+            aberto_ate = estado.get("aberto_ate", 0)
+            if not aberto_ate: return True # Fechado
+            if aberto_ate > agora: return False # Aberto
+            # Meio-aberto: libera uma sondagem (expira se a instância que sondava sumir)
+            if agora - estado.get("sondando_desde", 0) > self.tempo_aberto:
+                estado["sondando_desde"] = agora
+                return True
+            return False
+        res = self._atualizar(_fn)
+        return True if res is None else res # Sem lock: não bloqueia o robô
+
+    def segundos_para_liberar(self):
+        return max(0.0, self._ler().get("aberto_ate", 0) - time.time())
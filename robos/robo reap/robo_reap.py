@@ -18,12 +18,14 @@ from pages.monthly_report_page import MonthlyReportPage
 parser = argparse.ArgumentParser()
 parser.add_argument("--instancia", type=int, default=1)
 parser.add_argument("--json_task", type=str, help="JSON Task Data")
+parser.add_argument("--plan", action="store_true", help="Dry-run: apenas imprime o plano")
 args, _ = parser.parse_known_args()
 
 ID_INSTANCIA = args.instancia
 logger = Logger(case_id=f"INS-{ID_INSTANCIA}")
 
 def main():
+    if args.plan: return # Dry-run não abre navegador (tratado no main_v2)
     logger.info("Bot Started v2.0 (POM)", "STARTUP")
     
     driver = None
@@ -86,8 +88,44 @@ if __name__ == "__main__":
 
 # Import V2 Modules
 # from gerador_v2 import GeradorDadosV2 # REMOVED: Now using DB/JSON
+import re
+import shutil
+import zipfile
+import threading
+import ctypes
+import requests
+import pandas as pd
+import tkinter as tk
+from tkinter import Tk, messagebox
+from datetime import datetime
+import undetected_chromedriver as uc
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
 from assistente_login import invocar_assistente
 import ipc_utils
+import planejador
+from fila_tarefas import FilaTarefas, iniciar_leitura
+from coordenador import FilaCoordenador
+import canal_resultados
+from controle_api import EstadoRobo, iniciar_servidor
+from fila_login import FilaLogin
+import checkpoints
+import sessoes_gov
+from utils import bloqueio_recursos
+from utils import limitador_portal
+from utils import instrumentacao_driver
+from utils import perfilador
+import navegadores
+import perfis_chrome
+from normalizacao import valores_iguais
+from cache_opcoes import CacheOpcoes
+import validacao_dados
+import indice_nomes
+import historico_duracoes
+from politica_retry import PoliticaRetry, DisjuntorPortal, classificar_falha, FALHA_CLIENTE, FALHA_PORTAL
 
 # ==============================================================================
 # CONFIGURAÇÃO DE INSTÂNCIA E POSICIONAMENTO
@@ -116,11 +154,42 @@ parser.add_argument("--instancia", type=int, default=1)
 parser.add_argument("--total_instances", type=int, default=1)
 parser.add_argument("--json_task", type=str, help="Tarefa em formato JSON (Base64 ou String)")
 parser.add_argument("--download_dir", type=str, default="downloads", help="Diretório de downloads")
+parser.add_argument("--plan", action="store_true", help="Dry-run: imprime o plano de trabalho sem abrir navegadores")
+parser.add_argument("--coordinator", type=str, default=None, help="URL do coordenador (coordenador.py): entra como worker e pega clientes de lá")
+parser.add_argument("--task_stream", type=str, help="Clientes em NDJSON (um por linha): '-' para stdin ou caminho de named pipe")
+parser.add_argument("--result_fd", type=int, default=None, help="Descritor para resultados/progresso em NDJSON (ex: 3)")
+parser.add_argument("--control_port", type=int, default=None, help="Porta da API local de controle em 127.0.0.1 (0 = automática; com --headless/--xvfb sobe sempre)")
+parser.add_argument("--sem_reuso_sessao", action="store_true", help="Não salva/restaura sessões gov.br entre tentativas do mesmo cliente")
+parser.add_argument("--headless", action="store_true", help="Chrome sem janela (headless novo), viewport fixo e sem janelas visuais")
+parser.add_argument("--xvfb", action="store_true", help="Linux: Chrome numa tela virtual Xvfb (pyvirtualdisplay) em vez do headless")
+parser.add_argument("--viewport", type=str, default="1366x900", help="Viewport fixo do modo headless/Xvfb (LARGURAxALTURA)")
+parser.add_argument("--sem_bloqueio", action="store_true", help="Não bloqueia imagens/fontes/analytics (para comparar as métricas)")
+parser.add_argument("--reciclar_apos", type=int, default=10, help="Recicla o Chrome da sessão após N clientes (0 = nunca)")
+parser.add_argument("--instrumentar", action="store_true", help="Conta os comandos WebDriver por função e grava um resumo por cliente (erros_robo/instrumentacao)")
+parser.add_argument("--profile", nargs="?", const="amostragem", choices=perfilador.MODOS, default=None,
+                    help="Perfila o lado Python do lote inteiro (erros_robo/perfis); padrão: amostragem de todas as threads")
+parser.add_argument("--sem_limitador", action="store_true", help="Não usa o limitador de acesso ao portal compartilhado entre processos")
+parser.add_argument("--perfil_fixo", action="store_true", help="Reaproveita chrome_profile_N em vez de clonar um perfil temporário do modelo")
+parser.add_argument("--pipeline", type=int, default=0, help="Navegadores extras por sessão já abertos, limpos e na tela de login do gov.br (0 = desligado)")
+parser.add_argument("--limite_memoria_mb", type=int, default=1500, help="Recicla o Chrome entre clientes se o RSS passar disso (0 = sem limite)")
+parser.add_argument("--ordem", choices=["maior_primeiro", "menor_primeiro", "planilha"], default="maior_primeiro",
+                    help="Ordem da fila da instância pela duração prevista (histórico); a divisão entre instâncias é pela carga dos dados de pesca")
+parser.add_argument("--sem_validacao", action="store_true", help="Não valida/normaliza os dados de pesca antes de abrir o navegador")
+parser.add_argument("--sem_cache_opcoes", action="store_true", help="Não usa o cache de rótulos dos autocompletes (sempre procura a opção na tela)")
+parser.add_argument("--sem_diff", action="store_true", help="Redigita todos os campos do mês (desliga o preenchimento só do que difere)")
+parser.add_argument("--sessoes", type=int, default=1, help="Navegadores em paralelo nesta instância (login humano vira uma fila única)")
 args, _ = parser.parse_known_args()
+if args.instrumentar: os.environ["ADV_INSTRUMENTAR"] = "1" # Vale também para pages.BasePage
+if args.profile: os.environ["ADV_PROFILE"] = args.profile
 
 ID_INSTANCIA = args.instancia
 TOTAL_INSTANCIAS = args.total_instances
 JSON_TASK = args.json_task
+TASK_STREAM = args.task_stream
+COORDENADOR_URL = args.coordinator
+SESSOES = max(1, args.sessoes)
+REUSAR_SESSAO = not args.sem_reuso_sessao and sessoes_gov.ativo()
+MODO_OCULTO = args.headless or args.xvfb # Sem janela do Chrome: sem tiling, zoom nem janela de STOP
 COR_TEMA = "#3498db" if ID_INSTANCIA == 1 else "#f1c40f"
 
 # Variáveis de Geometria (serão preenchidas no main_v2 ou no import)
@@ -151,6 +220,13 @@ def gerar_dados_pesca_default(nome, municipio="Buriticupu"):
 
 def configurar_geometria(id_inst):
     global POS_X, POS_Y, LARGURA_W, ALTURA_W
+    if MODO_OCULTO:
+        # Viewport fixo: não depende do monitor (nem de haver um)
+        try: LARGURA_W, ALTURA_W = (int(v) for v in args.viewport.lower().split("x"))
+        except: LARGURA_W, ALTURA_W = 1366, 900
+        POS_X, POS_Y = 0, 0
+        print(f"DEBUG: Modo {'Xvfb' if args.xvfb else 'headless'} - viewport fixo {LARGURA_W}x{ALTURA_W}")
+        return
     try:
         temp_root = Tk()
         sw = temp_root.winfo_screenwidth()
@@ -184,6 +260,44 @@ configurar_geometria(ID_INSTANCIA)
 #  UTILITIES & HELPERS
 # ==============================================================================
 
+_DISPLAY_VIRTUAL = None
+
+def display_virtual():
+    """Sobe (uma vez por processo) a tela Xvfb usada só pelo Chrome. None se indisponível."""
+    global _DISPLAY_VIRTUAL
+    if _DISPLAY_VIRTUAL is None:
+        try:
+            from pyvirtualdisplay import Display
+            # manage_global_env=False: o DISPLAY do processo (Tk do operador) continua o real
+            _DISPLAY_VIRTUAL = Display(visible=False, size=(LARGURA_W, ALTURA_W), manage_global_env=False)
+            _DISPLAY_VIRTUAL.start()
+            print(f"[{ID_INSTANCIA}] [XVFB] Tela virtual :{_DISPLAY_VIRTUAL.display} ({LARGURA_W}x{ALTURA_W})")
+        except Exception as e:
+            print(f"[{ID_INSTANCIA}] [AVISO] Xvfb indisponível ({e}). Usando headless.")
+            _DISPLAY_VIRTUAL = False
+    return _DISPLAY_VIRTUAL or None
+
+class TelaRemota:
+    """Ponte entre o visualizador do assistente e um navegador sem janela (via CDP)."""
+    def __init__(self, driver):
+        self.driver = driver
+
+    def capturar(self):
+        return self.driver.get_screenshot_as_png()
+
+    def clicar(self, x, y):
+        for tipo in ("mousePressed", "mouseReleased"):
+            self.driver.execute_cdp_cmd("Input.dispatchMouseEvent",
+                                        {"type": tipo, "x": x, "y": y, "button": "left", "clickCount": 1})
+
+    def digitar(self, texto):
+        self.driver.execute_cdp_cmd("Input.insertText", {"text": texto})
+
+    def enter(self):
+        for tipo in ("keyDown", "keyUp"):
+            self.driver.execute_cdp_cmd("Input.dispatchKeyEvent",
+                                        {"type": tipo, "key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13, "text": "\r"})
+
 def get_chrome_version_windows():
     """Tenta detectar a versão principal do Chrome instalado no Windows."""
     try:
@@ -228,11 +342,116 @@ def safe_read_excel(filepath, engine="openpyxl"):
 # ==============================================================================
 ROBO_PARADO = False
 
-def find_latest_pdf_and_rename(download_dir, target_name, expected_cpf=None):
+def parar_robo():
+    global ROBO_PARADO
+    ROBO_PARADO = True
+    # Não espera o backoff de clientes reagendados para sair
+    if CONTROLE.fila is not None: CONTROLE.fila.cancelar()
+    if FILA_LOGIN is not None: FILA_LOGIN.cancelar_todos()
+
+# Sessões paralelas: cada thread de sessão tem seu navegador; o login humano é uma fila única
+SESSAO_ATUAL = threading.local()
+FILA_LOGIN = FilaLogin(cor=COR_TEMA) if SESSOES > 1 else None
+LOCK_PLANILHAS = threading.RLock() # Excel, progresso e IPC são compartilhados entre as sessões
+LOCK_NAVEGADOR = threading.Lock()  # uc.Chrome corrige o chromedriver em disco: uma criação por vez
+
+def sessao_atual():
+    return getattr(SESSAO_ATUAL, "id", 1)
+
+def sob_lock_planilhas(funcao):
+    """Uma sessão por vez lendo/gravando as planilhas (lê, altera e grava o arquivo inteiro)."""
+    def com_lock(*args_f, **kwargs_f):
+        with LOCK_PLANILHAS: return funcao(*args_f, **kwargs_f)
+    return com_lock
+
+def pasta_downloads(sessao=None):
+    """Com --sessoes N cada navegador baixa na sua subpasta: o PDF mais recente dela é o do seu cliente."""
+    base = os.path.abspath(args.download_dir)
+    if SESSOES == 1: return base
+    return os.path.join(base, f"sessao_{sessao or sessao_atual()}")
+
+# Estado compartilhado com a API local de controle (pausa/parada entre etapas, estatísticas)
+CONTROLE = EstadoRobo(ID_INSTANCIA, ao_parar=parar_robo)
+canal_resultados.adicionar_ouvinte(CONTROLE.ao_evento)
+
+# Duração de cada tentativa (total e por etapa) gravada para prever os próximos clientes
+CRONOMETRO = historico_duracoes.Cronometro(ID_INSTANCIA)
+canal_resultados.adicionar_ouvinte(CRONOMETRO.ao_evento)
+MODELO_DURACAO = None
+
+def checar_controle():
+    """Ponto de checagem entre etapas: respeita a pausa da API e retorna True se o robô foi parado."""
+    CONTROLE.aguardar_se_pausado()
+    return ROBO_PARADO
+
+# Retry com backoff/reagendamento e disjuntor do portal compartilhado entre instâncias
+POLITICA_RETRY = PoliticaRetry()
+DISJUNTOR = DisjuntorPortal()
+
+# Rótulos exatos das opções dos autocompletes (municípios, espécies, petrechos...) aprendidos na tela
+CACHE_OPCOES = None if args.sem_cache_opcoes else CacheOpcoes()
+
+# Fichas por navegação e vagas de concorrência (AIMD) no portal, compartilhadas com as
+# outras instâncias do REAP e com a consulta pesqbrasil (utils/limitador_portal.py)
+LIMITAR_PORTAL = not args.sem_limitador
+ESPERA_VAGA_S = 10 * 60 # Sem vaga nesse tempo o cliente volta para a fila (com a sessão gov.br salva, se o reuso estiver ligado)
+if LIMITAR_PORTAL: CONTROLE.limitador = limitador_portal.situacao
+
+def aguardar_disjuntor():
+    """Segura o próximo cliente enquanto o portal estiver marcado como fora do ar. Retorna True se parado."""
+    while not DISJUNTOR.liberado():
+        if checar_controle(): return True
+        espera = DISJUNTOR.segundos_para_liberar()
+        print(f"[{ID_INSTANCIA}] [DISJUNTOR] Portal instável. Aguardando {int(espera)}s antes do próximo cliente...")
+        time.sleep(min(15, max(1, espera)))
+    return checar_controle()
+
+def tentar_pescador(nome, df_pessoa, cpf, senha):
+    """Uma tentativa de processar_pescador_v2; exceção vira falha com motivo."""
+    try:
+        return processar_pescador_v2(nome, df_pessoa, cpf, senha)
+    except Exception as e:
+        traceback.print_exc()
+        return False, f"Erro: {e}", "", ""
+
+def avaliar_tentativa(clie, fila, cpf, nome, ok, mot):
+    """
+    Decide o destino do cliente após uma tentativa.
+    Retorna (final, motivo): final=False significa que ele voltou para o fim da fila com backoff.
+    """
+    categoria = None if ok else classificar_falha(mot)
+    if LIMITAR_PORTAL:
+        try: limitador_portal.registrar(latencia_ms=getattr(SESSAO_ATUAL, "pronto_ms", None), erro=categoria == FALHA_PORTAL)
+        except Exception as e: print(f"[{ID_INSTANCIA}] [LIMITADOR] Falha ao registrar amostra: {e}")
+    if ok or categoria == FALHA_CLIENTE:
+        DISJUNTOR.registrar_sucesso() # Portal respondeu
+    elif categoria == FALHA_PORTAL:
+        DISJUNTOR.registrar_falha()
+    if ok or categoria == FALHA_CLIENTE:
+        sessoes_gov.limpar(cpf) # Sessão salva só serve para retentar este cliente
+    if ok: return True, mot
+
+    tentativa = clie.get("_tentativa", 0) + 1
+    clie["_tentativa"] = tentativa
+    if not ROBO_PARADO and POLITICA_RETRY.deve_retentar(categoria, tentativa):
+        atraso = POLITICA_RETRY.atraso(tentativa)
+        print(f"[{ID_INSTANCIA}] [RETRY] {nome}: falha {categoria} na tentativa {tentativa} ({mot}). "
+              f"Voltando à fila em {atraso:.0f}s.")
+        canal_resultados.emitir("retry", cpf=cpf, nome=nome, categoria=categoria, tentativa=tentativa,
+                                atraso_s=round(atraso, 1), message=mot)
+        fila.reagendar(clie, atraso)
+        return False, mot
+
+    if tentativa > 1:
+        mot = f"FALHA APÓS {tentativa} TENTATIVAS - {mot}"
+    return True, mot
+
+def find_latest_pdf_and_rename(download_dir, target_name, expected_cpf=None, downloads_usuario=True):
     """Localiza o último PDF baixado, espera concluir e renomeia.
     
     Se expected_cpf for fornecido, tenta validar se o PDF pertence ao cliente correto.
-    Também verifica a pasta de Downloads do Windows como fallback.
+    Também verifica a pasta de Downloads do Windows como fallback (downloads_usuario;
+    desligado com várias sessões, que baixariam todas lá).
     """
     try:
         target_path = os.path.join(download_dir, target_name)
@@ -240,7 +459,7 @@ def find_latest_pdf_and_rename(download_dir, target_name, expected_cpf=None):
         # Lista de diretórios para procurar (projeto + Downloads do usuário)
         search_dirs = [download_dir]
         user_downloads = os.path.join(os.path.expanduser("~"), "Downloads")
-        if os.path.exists(user_downloads) and user_downloads != download_dir:
+        if downloads_usuario and os.path.exists(user_downloads) and user_downloads != download_dir:
             search_dirs.append(user_downloads)
         
         # Aguarda até 15 segundos pelo arquivo terminar de baixar
@@ -328,15 +547,15 @@ class FloatingStopWindow:
         self.root.mainloop()
 
     def parar(self):
-        global ROBO_PARADO
         if messagebox.askyesno("Confirmar", f"Parar Robô {self.id_inst}?"):
-            ROBO_PARADO = True
+            CONTROLE.parar()
 
 # ==============================================================================
 # 🛠️ 1. HELPER FUNCTIONS
 # ==============================================================================
 
 def carregar_zoom(driver, scale=0.60):
+    if MODO_OCULTO: return # Zoom só servia para caber no monitor; o viewport fixo já comporta o layout
     try:
         zoom_pct = int(scale * 100)
         driver.execute_script(f"document.body.style.zoom = '{zoom_pct}%';")
@@ -374,10 +593,10 @@ def gerar_dados_pesca_default(nome_cliente, municipio="Buriticupu"):
     if os.path.exists(dados_path):
         try:
             df = pd.read_excel(dados_path)
-            # Busca pelo nome do cliente (parcial, case-insensitive)
-            nome_limpo = str(nome_cliente).strip().upper()
-            mask = df['NOME'].astype(str).str.strip().str.upper().str.contains(nome_limpo[:20], na=False)
-            df_cliente = df[mask]
+            # Busca pelo nome do cliente (sem acento/caixa); como antes, só os 20 primeiros
+            # caracteres precisam bater, e aí só se um único nome começar por eles
+            linhas = indice_nomes.indice_da_coluna(dados_path, df['NOME']).localizar(nome_cliente, corte=20)
+            df_cliente = df.loc[linhas]
             
             if not df_cliente.empty:
                 print(f"   [DADOS] Encontrados {len(df_cliente)} registros para {nome_cliente[:30]} em dados.xlsx")
@@ -439,6 +658,53 @@ def gerar_dados_pesca_default(nome_cliente, municipio="Buriticupu"):
     print(f"   [DADOS] Gerados {len(dados_gerados)} registros padrão para {nome_cliente[:30]}")
     return dados_gerados
 
+# Clica a opção aprendida: pelo id do input (se ainda bater com o rótulo) ou pelo rótulo exato
+JS_CLICAR_OPCAO = """
+const id = arguments[0], rotulo = arguments[1], marcar = arguments[2];
+const vis = e => !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length);
+const norm = t => (t || '').replace(/\\s+/g, ' ').trim();
+let label = id ? document.querySelector('label[for="' + CSS.escape(id) + '"]') : null;
+if (label && (!vis(label) || norm(label.textContent) !== rotulo)) label = null;
+if (!label) label = Array.from(document.querySelectorAll('label')).find(l => vis(l) && norm(l.textContent) === rotulo) || null;
+if (!label) return false;
+if (marcar) {
+    const inp = document.getElementById(label.getAttribute('for'));
+    if (inp && inp.checked) return true;
+}
+label.click();
+return true;
+"""
+
+def clicar_opcao_cache(driver, campo, valor, marcar=False, espera=1.0):
+    """
+    Seleciona a opção já aprendida para (campo, valor), esperando o autocomplete
+    renderizar por até `espera` s. False se não há cache ou a opção não apareceu a tempo
+    (a entrada continua no cache: o fallback a substitui se achar outra exata).
+    """
+    if CACHE_OPCOES is None or not campo: return False
+    opcao = CACHE_OPCOES.consultar(campo, valor)
+    if not opcao: return False
+    limite = time.time() + espera
+    while True:
+        try:
+            if driver.execute_script(JS_CLICAR_OPCAO, opcao.get("id"), opcao["rotulo"], marcar): return True
+        except: pass
+        if time.time() >= limite: return False
+        time.sleep(0.1)
+
+def rotulo_aprendido(campo, valor):
+    """Rótulo completo que o dropdown mostra para o valor (do cache de opções), ou None."""
+    if CACHE_OPCOES is None or not campo: return None
+    return CACHE_OPCOES.rotulo(campo, valor)
+
+def aprender_opcao(campo, valor, label):
+    """Guarda o rótulo/id da opção do fallback (contains) para as próximas vezes, se ela for exata."""
+    if CACHE_OPCOES is None or not campo: return
+    try:
+        rotulo = " ".join((label.get_attribute("textContent") or "").split())
+        CACHE_OPCOES.aprender(campo, valor, rotulo, label.get_attribute("for"))
+    except: pass
+
 def preencher_dropdown_simples(driver, nome_campo, texto_digitar, texto_clicar):
     try:
         xpath_input = f"//input[@name='{nome_campo}']"
@@ -450,9 +716,11 @@ def preencher_dropdown_simples(driver, nome_campo, texto_digitar, texto_clicar):
         campo.send_keys(Keys.CONTROL + "a"); campo.send_keys(Keys.DELETE)
         campo.send_keys(texto_digitar); time.sleep(0.6) # Reduzido de 1.5s
         
-        xpath_opcao = f"//label[contains(normalize-space(), '{texto_clicar}')]"
-        opcao = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, xpath_opcao)))
-        driver.execute_script("arguments[0].click();", opcao)
+        if not clicar_opcao_cache(driver, nome_campo, texto_clicar, espera=3.0):
+            xpath_opcao = f"//label[contains(normalize-space(), '{texto_clicar}')]"
+            opcao = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, xpath_opcao)))
+            aprender_opcao(nome_campo, texto_clicar, opcao)
+            driver.execute_script("arguments[0].click();", opcao)
         time.sleep(0.2)
     except Exception as e: print(f"   [X] Erro Dropdown {nome_campo}: {e}")
 
@@ -487,7 +755,7 @@ def configurar_checkbox_por_indice(driver, nome_grupo, indice_alvo):
             except: pass
     except: pass
 
-def preencher_campo_tabela(driver, input_elemento, valor, eh_dropdown=True):
+def preencher_campo_tabela(driver, input_elemento, valor, eh_dropdown=True, campo=None):
     try:
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", input_elemento)
         if eh_dropdown:
@@ -497,6 +765,7 @@ def preencher_campo_tabela(driver, input_elemento, valor, eh_dropdown=True):
                     # Tenta limpar e digitar
                     input_elemento.send_keys(Keys.CONTROL + "a"); input_elemento.send_keys(Keys.DELETE)
                     input_elemento.send_keys(str(valor)); time.sleep(0.3) 
+                    if clicar_opcao_cache(driver, campo, valor): break
                     
                     xpath_opt = f"//div[contains(@class, 'br-item')]//label[contains(normalize-space(), '{valor}')]"
                     itens = driver.find_elements(By.XPATH, xpath_opt)
@@ -507,6 +776,7 @@ def preencher_campo_tabela(driver, input_elemento, valor, eh_dropdown=True):
                     item_clicado = False
                     for item in itens:
                         if item.is_displayed():
+                            aprender_opcao(campo, valor, item)
                             driver.execute_script("arguments[0].click();", item)
                             item_clicado = True
                             break
@@ -521,24 +791,78 @@ def preencher_campo_tabela(driver, input_elemento, valor, eh_dropdown=True):
             input_elemento.send_keys(Keys.TAB)
     except Exception as e: print(f"      [WARN] Erro tabela ({valor}): {e}")
 
-def selecionar_unidade_relativa(driver, index_linha):
+def selecionar_unidade_quilo(driver, input_unidade):
+    """Abre o select de unidade da linha (já resolvido em mapear_linhas_especie) e marca 'Quilo'."""
     try:
-        xpath_nome = f"(//input[@placeholder='Digite o nome da espécie'])[{index_linha+1}]"
-        xpath_unidade = f"{xpath_nome}/following::input[@placeholder='Selecione'][1]"
-        target = WebDriverWait(driver, 5).until(EC.visibility_of_element_located((By.XPATH, xpath_unidade)))
-        driver.execute_script("arguments[0].click();", target); time.sleep(0.3) 
-        xpath_kg = "//div[contains(@class, 'br-item')]//label[contains(text(), 'Quilo')]"
-        for op in driver.find_elements(By.XPATH, xpath_kg):
-            if op.is_displayed(): driver.execute_script("arguments[0].click();", op); break
+        driver.execute_script("arguments[0].click();", input_unidade); time.sleep(0.3) 
+        # Opção procurada só no select desta linha; se o portal renderizar a lista fora dele, cai no global
+        opcoes = input_unidade.find_elements(By.XPATH, "./ancestor::div[contains(@class, 'br-select')][1]//label[contains(text(), 'Quilo')]")
+        if not opcoes:
+            opcoes = [op for op in driver.find_elements(By.XPATH, "//div[contains(@class, 'br-item')]//label[contains(text(), 'Quilo')]") if op.is_displayed()]
+        if opcoes: driver.execute_script("arguments[0].click();", opcoes[0])
         driver.find_element(By.TAG_NAME, "body").click()
     except: pass
 
+# Uma chamada de script resolve todas as linhas de espécie visíveis do mês:
+# [nome, quantidade, valor, unidade] por linha, na ordem da tela.
+JS_LINHAS_ESPECIE = """
+const c = arguments[0], inicio = arguments[1] || 0;
+const vis = e => !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length);
+const pegar = ph => Array.from(c.querySelectorAll('input[placeholder="' + ph + '"]')).filter(vis);
+const nomes = pegar('Digite o nome da espécie'), qtds = pegar('Informe a quantidade'),
+      valores = pegar('Informe o valor'), selects = pegar('Selecione');
+const linhas = [];
+for (let i = inicio; i < nomes.length; i++) {
+    const unidade = selects.find(s => nomes[i].compareDocumentPosition(s) & Node.DOCUMENT_POSITION_FOLLOWING) || null;
+    linhas.push([nomes[i], qtds[i] || null, valores[i] || null, unidade]);
+}
+return linhas;
+"""
+
+# Estado atual do formulário do mês numa única chamada (preenchimento por diferença)
+JS_ESTADO_MES = """
+const c = arguments[0], idx = arguments[1];
+const vis = e => !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length);
+const val = e => e ? (e.value || '').trim() : null;
+const dias = document.querySelector("input[name='informesMensais." + idx + ".diasTrabalhados']");
+const textos = Array.from(c.querySelectorAll("input[type='text']")).filter(vis);
+const locais = textos.filter(i => !(i.name || '').includes('diasTrabalhados') && !(i.placeholder || '').includes('espécie'))
+                     .slice(0, 5).map(val);
+const pegar = ph => Array.from(c.querySelectorAll('input[placeholder="' + ph + '"]')).filter(vis);
+const nomes = pegar('Digite o nome da espécie'), qtds = pegar('Informe a quantidade'),
+      valores = pegar('Informe o valor'), selects = pegar('Selecione');
+const especies = nomes.map((n, i) => {
+    const unidade = selects.find(s => n.compareDocumentPosition(s) & Node.DOCUMENT_POSITION_FOLLOWING);
+    return [val(n), val(qtds[i]), val(valores[i]), val(unidade)];
+});
+return {dias: val(dias), locais: locais, especies: especies};
+"""
+
+def ler_estado_mes(driver, conteudo, idx):
+    """Valores atuais do mês (dias, locais, linhas de espécie). None se não conseguir ler."""
+    if args.sem_diff: return None
+    try: return driver.execute_script(JS_ESTADO_MES, conteudo, idx)
+    except: return None
+
+def marcar_radio(driver, seletor):
+    """Clica no radio/checkbox só se ainda não estiver marcado."""
+    el = driver.find_element(By.CSS_SELECTOR, seletor)
+    if not el.is_selected(): driver.execute_script("arguments[0].click();", el)
+    return el
+
+def mapear_linhas_especie(driver, conteudo, inicio=0):
+    """Linhas de espécie do mês a partir de `inicio` (incremental após 'Adicionar nova espécie')."""
+    try: return driver.execute_script(JS_LINHAS_ESPECIE, conteudo, inicio) or []
+    except: return []
+
 def configurar_petrecho_seguro(driver, input_elemento, valor):
     try:
         driver.execute_script("arguments[0].click();", input_elemento); time.sleep(0.3)
+        if clicar_opcao_cache(driver, "petrecho", valor, marcar=True): return
         xpath_opt = f"//div[contains(@class, 'br-item')]//label[contains(text(), '{valor}')]"
         for o in driver.find_elements(By.XPATH, xpath_opt):
             if o.is_displayed():
+                aprender_opcao("petrecho", valor, o)
                 c_id = o.get_attribute("for")
                 if not driver.execute_script(f"return document.getElementById('{c_id}').checked;"):
                     driver.execute_script("arguments[0].click();", o)
@@ -640,42 +964,71 @@ def executar_preenchimento_mensal(driver, mes_nome, idx, df_mes, eh_defeso, cach
             driver.execute_script("arguments[0].click();", btn); time.sleep(1.0)
 
         if eh_defeso:
-            driver.execute_script("arguments[0].click();", driver.find_element(By.CSS_SELECTOR, f"input[name='informesMensais.{idx}.houvePesca'][value='false']"))
-            chk = driver.find_element(By.CSS_SELECTOR, f"input[name='informesMensais.{idx}.justificativasNaoDeclaracao'][value='1']")
-            if not chk.is_selected(): driver.execute_script("arguments[0].click();", chk)
+            marcar_radio(driver, f"input[name='informesMensais.{idx}.houvePesca'][value='false']")
+            marcar_radio(driver, f"input[name='informesMensais.{idx}.justificativasNaoDeclaracao'][value='1']")
         else:
-            driver.execute_script("arguments[0].click();", driver.find_element(By.CSS_SELECTOR, f"input[name='informesMensais.{idx}.houvePesca'][value='true']")); time.sleep(0.1)
+            marcar_radio(driver, f"input[name='informesMensais.{idx}.houvePesca'][value='true']"); time.sleep(0.1)
             row0 = df_mes.iloc[0]
-            preencher_campo_tabela(driver, driver.find_element(By.NAME, f"informesMensais.{idx}.diasTrabalhados"), row0['DIAS'], False)
-            
             conteudo = btn.find_element(By.XPATH, "./../following-sibling::div")
-            inps = [i for i in conteudo.find_elements(By.CSS_SELECTOR, "input[type='text']") if i.is_displayed()]
-            inps_loc = [i for i in inps if "diasTrabalhados" not in i.get_attribute("name") and "espécie" not in (i.get_attribute("placeholder") or "")]
+
+            # [DIFF] Lê o que já está na tela e só escreve o que difere (retomada/varredura)
+            estado = ler_estado_mes(driver, conteudo, idx) or {}
+            locais_atuais = estado.get("locais") or []
+            especies_atuais = estado.get("especies") or []
+            escritos, mantidos = 0, 0
+            def difere(atual, alvo, numerico=False, campo=None):
+                nonlocal escritos, mantidos
+                if valores_iguais(atual, alvo, numerico, rotulo_aprendido(campo, alvo)):
+                    mantidos += 1
+                    return False
+                escritos += 1
+                return True
+
+            if difere(estado.get("dias"), row0['DIAS'], numerico=True):
+                preencher_campo_tabela(driver, driver.find_element(By.NAME, f"informesMensais.{idx}.diasTrabalhados"), row0['DIAS'], False)
             
-            if len(inps_loc) >= 5:
-                # Tenta preencher local, estado, municipio, localidade e petrecho
-                preencher_campo_tabela(driver, inps_loc[0], row0['TIPO_LOCAL'])
-                preencher_campo_tabela(driver, inps_loc[1], "MARANHAO")
-                preencher_campo_tabela(driver, inps_loc[2], row0['MUNICIPIO'])
-                preencher_campo_tabela(driver, inps_loc[3], row0['NOME_LOCAL'], False)
-                configurar_petrecho_seguro(driver, inps_loc[4], row0['PETRECHO'])
-
-            # Espécies
+            alvos_loc = [row0['TIPO_LOCAL'], "MARANHAO", row0['MUNICIPIO'], row0['NOME_LOCAL'], row0['PETRECHO']]
+            campos_loc = ["tipo_local", "estado", "municipio", None, "petrecho"]
+            atuais_loc = (locais_atuais + [None] * 5)[:5]
+            if any(not valores_iguais(a, b, rotulo=rotulo_aprendido(c, b)) for a, b, c in zip(atuais_loc, alvos_loc, campos_loc)):
+                inps = [i for i in conteudo.find_elements(By.CSS_SELECTOR, "input[type='text']") if i.is_displayed()]
+                inps_loc = [i for i in inps if "diasTrabalhados" not in i.get_attribute("name") and "espécie" not in (i.get_attribute("placeholder") or "")]
+            
+                if len(inps_loc) >= 5:
+                    # Tenta preencher local, estado, municipio, localidade e petrecho
+                    if difere(atuais_loc[0], alvos_loc[0], campo="tipo_local"): preencher_campo_tabela(driver, inps_loc[0], row0['TIPO_LOCAL'], campo="tipo_local")
+                    if difere(atuais_loc[1], alvos_loc[1], campo="estado"): preencher_campo_tabela(driver, inps_loc[1], "MARANHAO", campo="estado")
+                    if difere(atuais_loc[2], alvos_loc[2], campo="municipio"): preencher_campo_tabela(driver, inps_loc[2], row0['MUNICIPIO'], campo="municipio")
+                    if difere(atuais_loc[3], alvos_loc[3]): preencher_campo_tabela(driver, inps_loc[3], row0['NOME_LOCAL'], False)
+                    if difere(atuais_loc[4], alvos_loc[4], campo="petrecho"): configurar_petrecho_seguro(driver, inps_loc[4], row0['PETRECHO'])
+            else:
+                mantidos += 5
+
+            # Espécies: linhas do mês resolvidas uma vez; linhas novas, incrementalmente
+            linhas = mapear_linhas_especie(driver, conteudo)
+            btn_add = None
             for i_e, (_, r_e) in enumerate(df_mes.iterrows()):
-                nms = [x for x in driver.find_elements(By.XPATH, "//input[@placeholder='Digite o nome da espécie']") if x.is_displayed()]
-                if i_e >= len(nms):
-                    add_b = [b for b in driver.find_elements(By.XPATH, "//button[contains(., 'Adicionar nova espécie')]") if b.is_displayed()]
-                    if add_b: driver.execute_script("arguments[0].click();", add_b[0]); time.sleep(0.2)
+                if i_e >= len(linhas):
+                    if btn_add is None:
+                        add_b = conteudo.find_elements(By.XPATH, ".//button[contains(., 'Adicionar nova espécie')]") or \
+                                [b for b in driver.find_elements(By.XPATH, "//button[contains(., 'Adicionar nova espécie')]") if b.is_displayed()]
+                        btn_add = add_b[0] if add_b else False
+                    if btn_add:
+                        driver.execute_script("arguments[0].click();", btn_add); time.sleep(0.2)
+                        linhas.extend(mapear_linhas_especie(driver, conteudo, len(linhas)))
                 
-                nms = [x for x in driver.find_elements(By.XPATH, "//input[@placeholder='Digite o nome da espécie']") if x.is_displayed()]
-                qts = [x for x in driver.find_elements(By.XPATH, "//input[@placeholder='Informe a quantidade']") if x.is_displayed()]
-                vls = [x for x in driver.find_elements(By.XPATH, "//input[@placeholder='Informe o valor']") if x.is_displayed()]
-                
-                if i_e < len(nms):
-                    preencher_campo_tabela(driver, nms[i_e], r_e['ESPECIE'])
-                    selecionar_unidade_relativa(driver, i_e) 
-                    preencher_campo_tabela(driver, qts[i_e], r_e['QUANTIDADE'], False)
-                    preencher_campo_tabela(driver, vls[i_e], r_e['VALOR'], False)
+                if i_e < len(linhas):
+                    nome_inp, qtd_inp, valor_inp, unidade_inp = linhas[i_e]
+                    atual = especies_atuais[i_e] if i_e < len(especies_atuais) else [None] * 4
+                    if difere(atual[0], r_e['ESPECIE'], campo="especie"): preencher_campo_tabela(driver, nome_inp, r_e['ESPECIE'], campo="especie")
+                    if unidade_inp is not None and difere(atual[3], "Quilo"): selecionar_unidade_quilo(driver, unidade_inp)
+                    if qtd_inp is not None and difere(atual[1], r_e['QUANTIDADE'], numerico=True):
+                        preencher_campo_tabela(driver, qtd_inp, r_e['QUANTIDADE'], False)
+                    if valor_inp is not None and difere(atual[2], r_e['VALOR'], numerico=True):
+                        preencher_campo_tabela(driver, valor_inp, r_e['VALOR'], False)
+
+            if estado:
+                log_debug(f"{mes_nome}: {escritos} campos escritos, {mantidos} já corretos (diff).")
         
         # 4. Fechamento e Validação
         # Fecha o acordeão para dar o check "oficial".
@@ -710,42 +1063,11 @@ def precisa_gerar_dados():
         df_c = safe_read_excel("base_clientes.xlsx")
         if df_c is None: return False # Se corrompeu, não tem como saber o que falta agora
         
-        # Pega resultados locais para saber quem já terminou
-        progresso_local = {}
-        results_dir = "temp_results"
-        if os.path.exists(results_dir):
-            for f in os.listdir(results_dir):
-                if f.endswith(".json"):
-                    try:
-                        with open(os.path.join(results_dir, f), "r", encoding="utf-8") as rj:
-                            progresso_local.update(json.load(rj))
-                    except: pass
-        
-        # Função interna para checar se está feito
-        def esta_concluido(row):
-            cpf = str(row['CPF'])
-            st_xls = str(row.get('STATUS', '')).upper()
-            if st_xls in ["OK", "PENDENCIA", "SÓ FALTA PDF"]: return True
-            if cpf in progresso_local:
-                st_loc = str(progresso_local[cpf].get('STATUS', '')).upper()
-                if st_loc in ["OK", "PENDENCIA", "SÓ FALTA PDF"]: return True
-            return False
-
-        pendentes = df_c[~df_c.apply(esta_concluido, axis=1)]
-        if pendentes.empty: return False # Ninguém pendente
-        
-        if not os.path.exists("dados.xlsx"): return True # Tem gente mas não tem o arquivo
-        
-        df_d = safe_read_excel("dados.xlsx")
-        if df_d is None: return True # Arquivo existia mas estava corrompido (safe_read_excel já renomeou)
+        df_d = safe_read_excel("dados.xlsx") if os.path.exists("dados.xlsx") else None
+        progresso_local = planejador.carregar_progresso_pasta("temp_results")
         
-        nomes_com_dados = set(df_d['NOME'].unique())
-        
-        for _, clie in pendentes.iterrows():
-            if clie['NOME'] not in nomes_com_dados:
-                return True # Algum cliente pendente não tem dados no arquivo
-                
-        return False
+        # Base inteira (sem fatia): o gerador atende todas as instâncias
+        return planejador.precisa_gerar(df_c, df_d, progresso_local)
     except Exception as e:
         print(f"[WARN] Erro ao verificar necessidade de geracao: {e}")
         return False
@@ -757,6 +1079,7 @@ def dados_estao_prontos():
         return True
     except: return False
 
+@sob_lock_planilhas
 def salvar_resultado_excel(cpf_alvo, status, motivo, nome_pdf="", nome_pessoa_arg=""):
     """
     Atualiza a base_clientes.xlsx de forma robusta. 
@@ -791,8 +1114,8 @@ def salvar_resultado_excel(cpf_alvo, status, motivo, nome_pdf="", nome_pessoa_ar
             
             # Tenta encontrar por NOME (Busca de Fallback se CPF falhar)
             if not mask.any() and nome_pessoa_arg:
-                nome_alvo = str(nome_pessoa_arg).lower().strip()
-                mask = df['NOME'].astype(str).str.lower().str.contains(nome_alvo, na=False)
+                linhas = indice_nomes.indice_da_coluna("base_clientes.xlsx", df['NOME']).localizar(nome_pessoa_arg)
+                mask = df.index.isin(linhas)
             
             if mask.any():
                 df.loc[mask, 'STATUS'] = str(status).upper()
@@ -816,6 +1139,7 @@ def salvar_resultado_excel(cpf_alvo, status, motivo, nome_pdf="", nome_pessoa_ar
             print(f"[{ID_INSTANCIA}] [ERRO] Falha ao salvar Excel: {e}")
             break
 
+@sob_lock_planilhas
 def atualizar_status_dados(nome_cliente, status):
     """
     Atualiza a planilha dados.xlsx marcando o status das linhas do cliente.
@@ -829,7 +1153,8 @@ def atualizar_status_dados(nome_cliente, status):
             if df is None: return
             if 'STATUS' not in df.columns: df['STATUS'] = ""
             
-            mask = df['NOME'].astype(str).str.contains(str(nome_cliente), case=False, na=False)
+            linhas = indice_nomes.indice_da_coluna("dados.xlsx", df['NOME']).localizar(nome_cliente)
+            mask = df.index.isin(linhas)
             if mask.any():
                 df.loc[mask, 'STATUS'] = str(status).upper()
                 df.to_excel("dados.xlsx", index=False)
@@ -847,25 +1172,99 @@ def atualizar_status_dados(nome_cliente, status):
 # [ROBOT] 2. PROCESSAR PESCADOR
 # ==============================================================================
 
-def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
-    global ROBO_PARADO
-    if ROBO_PARADO: return False, "PARADO PELO USUÁRIO", "", ""
-    
-    print(f"[{ID_INSTANCIA}] >> ATENDENDO: {nome_pessoa}")
-    
-    local_municipio_alvo = "Buriticupu"
-    try: 
-        if not df_pessoa.empty and "MUNICIPIO" in df_pessoa.columns:
-            local_municipio_alvo = df_pessoa.iloc[0]["MUNICIPIO"]
+def ir_para_passo(driver, num_passo):
+    """Clica no botão do passo (barra de progresso) para saltar telas já concluídas."""
+    try:
+        btn = driver.find_element(By.XPATH, f"//button[@step-num='{num_passo}']")
+        driver.execute_script("arguments[0].click();", btn); time.sleep(2)
+        return True
+    except:
+        return False
+
+def registrar_pdf_salvo(cpf, caminho_pdf, ano_base, enviado=True):
+    """
+    Fim da etapa PDF: avisa o canal e, se a declaração foi enviada, grava o checkpoint
+    final do cliente. PDF sem envio confirmado (vai para retry) não vira checkpoint:
+    senão o retry encontraria o PDF e reportaria OK sem a declaração ter sido enviada.
+    """
+    canal_resultados.emitir_progresso(cpf, "PDF", "end", arquivo=caminho_pdf)
+    if enviado: checkpoints.marcar(cpf, "PDF", ARQUIVO_PDF=caminho_pdf, ANO_BASE=ano_base)
+
+def limpar_sessao_navegador(driver):
+    """Zera cookies, storage e IndexedDB do portal (o perfil do Chrome é reaproveitado entre clientes)."""
+    # [LIMPEZA] LOG
+    try:
+        print(f"[{ID_INSTANCIA}] [LIMPEZA] Limpando cookies, cache e IndexedDB...")
+        driver.delete_all_cookies()
+        # Cookies de todos os domínios (inclui o SSO do gov.br do cliente anterior)
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_script("window.localStorage.clear();")
+        driver.execute_script("window.sessionStorage.clear();")
+        driver.execute_script("""
+            if (window.indexedDB && window.indexedDB.databases) {
+                window.indexedDB.databases().then(dbs => {
+                    dbs.forEach(db => window.indexedDB.deleteDatabase(db.name));
+                });
+            }
+        """)
+        # Tenta clicar em um botão de sair se estiver visível
+        for btn_sair in driver.find_elements(By.XPATH, "//button[contains(., 'Sair')] | //a[contains(., 'Sair')]"):
+            if btn_sair.is_displayed():
+                driver.execute_script("arguments[0].click();", btn_sair)
+                time.sleep(1)
+        driver.refresh()
+        time.sleep(2)
     except: pass
 
-    # Isolamento de Perfil - Chrome
-    perfil_dir = os.path.join(os.getcwd(), f"chrome_profile_{ID_INSTANCIA}")
-    os.makedirs(perfil_dir, exist_ok=True)
+def sessao_autenticada(driver, timeout=8):
+    """Sondagem rápida: a home do portal mostra o menu logado (e não o botão 'Entrar com')."""
+    try:
+        WebDriverWait(driver, timeout).until(lambda d:
+            d.find_elements(By.XPATH, "//div[contains(@class, 'card-home-menu')]") or
+            d.find_elements(By.XPATH, "//button[contains(., 'Entrar com')]"))
+        return bool(driver.find_elements(By.XPATH, "//div[contains(@class, 'card-home-menu')]"))
+    except:
+        return False
+
+def janela_da_sessao(sessao):
+    """Sessões paralelas ficam em cascata para o operador distinguir as janelas."""
+    return dict(x=POS_X + (sessao - 1) * 40, y=POS_Y + (sessao - 1) * 40, width=LARGURA_W, height=ALTURA_W)
+
+def aquecer_perfil_modelo(pasta):
+    """Abre e fecha o Chrome uma vez no perfil modelo para ele nascer inicializado."""
+    options = uc.ChromeOptions()
+    options.add_argument(f"--user-data-dir={pasta}")
+    options.add_argument("--headless=new")
+    with LOCK_NAVEGADOR:
+        driver = uc.Chrome(options=options, version_main=get_chrome_version_windows())
+    try:
+        driver.get("about:blank"); time.sleep(2)
+    finally:
+        driver.quit()
+
+# Perfil temporário por navegador, clonado do modelo e apagado quando o navegador fecha
+PERFIS = None if args.perfil_fixo else perfis_chrome.GerenciadorPerfis(aquecer=aquecer_perfil_modelo)
+
+def criar_navegador(sessao, slot=0):
+    """Inicia o Chrome de uma sessão (perfil, downloads, modo headless/janela)."""
+    # Isolamento de Perfil - Chrome (um por sessão quando há sessões paralelas, um por navegador do pipeline)
+    sufixo_sessao = f"_s{sessao}" if SESSOES > 1 else ""
+    if slot: sufixo_sessao += f"_p{slot}"
+    if PERFIS is not None:
+        perfil_dir = PERFIS.clonar(f"{ID_INSTANCIA}_s{sessao}_p{slot}")
+    else:
+        perfil_dir = os.path.join(os.getcwd(), f"chrome_profile_{ID_INSTANCIA}{sufixo_sessao}")
+        os.makedirs(perfil_dir, exist_ok=True)
 
     options = uc.ChromeOptions()
     options.add_argument(f"--user-data-dir={perfil_dir}")
-    options.add_argument("--start-maximized")
+    if MODO_OCULTO:
+        options.add_argument(f"--window-size={LARGURA_W},{ALTURA_W}")
+        display = display_virtual() if args.xvfb else None
+        if display: options.add_argument(f"--display=:{display.display}")
+        else: options.add_argument("--headless=new")
+    else:
+        options.add_argument("--start-maximized")
     # options.add_argument("--disable-blink-features=AutomationControlled")
     # options.add_argument("--no-sandbox")
     # options.add_argument("--disable-dev-shm-usage")
@@ -875,72 +1274,191 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
     options.add_argument("--ignore-certificate-errors")
     
     # Configura diretório de download absoluto
-    abs_download_dir = os.path.abspath(args.download_dir)
+    abs_download_dir = pasta_downloads(sessao)
     os.makedirs(abs_download_dir, exist_ok=True)
     
     prefs = {
-        "profile.managed_default_content_settings.images": 1,
+        "profile.managed_default_content_settings.images": 1, # Captcha do login precisa; o resto é cortado via CDP
         "download.default_directory": abs_download_dir,
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "plugins.always_open_pdf_externally": True # Faz o Chrome baixar em vez de abrir
     }
     options.add_experimental_option("prefs", prefs)
+
+    print(f"[{ID_INSTANCIA}] [DEBUG] Inicializando Chrome Driver...")
+    v_main = get_chrome_version_windows()
+    try:
+        with LOCK_NAVEGADOR:
+            driver = uc.Chrome(options=options, version_main=v_main)
+    except Exception:
+        if PERFIS is not None: perfis_chrome.descartar(perfil_dir)
+        raise
+    driver.perfil_temporario = perfil_dir if PERFIS is not None else None
+    instrumentacao_driver.instrumentar(driver, nome=f"{ID_INSTANCIA}.S{sessao}")
+    print(f"[{ID_INSTANCIA}] [DEBUG] Chrome Driver Inicializado (Versão: {v_main or 'Auto'}).")
+    if not MODO_OCULTO:
+        try: driver.set_window_rect(**janela_da_sessao(sessao))
+        except: pass
+    return driver
+
+# Um gerenciador (Chrome reaproveitado + reciclagem por clientes/memória) por sessão
+GERENCIADORES = {}
+
+def navegador_da_sessao():
+    sessao = sessao_atual()
+    if sessao not in GERENCIADORES:
+        GERENCIADORES[sessao] = navegadores.GerenciadorNavegador(
+            lambda slot: criar_navegador(sessao, slot), nome=f"{ID_INSTANCIA}.S{sessao}",
+            max_clientes=args.reciclar_apos, limite_rss_mb=args.limite_memoria_mb,
+            ao_amostrar=lambda amostra: canal_resultados.emitir("resources", **amostra),
+            profundidade=args.pipeline, preparar=preparar_navegador,
+            ao_encerrar=lambda d: perfis_chrome.descartar(getattr(d, "perfil_temporario", None)))
+    return GERENCIADORES[sessao]
+
+def encerrar_navegadores():
+    for g in GERENCIADORES.values(): g.encerrar_todos()
+
+def clicar_entrar_com(driver):
+    try: WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Entrar com')]"))).click()
+    except: pass
+
+def preparar_navegador(driver):
+    """
+    Deixa o navegador limpo e parado na tela de login do gov.br. Roda inline antes
+    do cliente ou, com --pipeline, em segundo plano enquanto outro cliente é preenchido.
+    """
+    if not args.sem_bloqueio: bloqueio_recursos.aplicar(driver, "reap_login")
+    fechar_abas_extras(driver)
+
+    if LIMITAR_PORTAL and limitador_portal.adquirir(parar=checar_controle) is None:
+        raise RuntimeError("PARADO PELO USUÁRIO" if checar_controle() else "Limitador do portal: sem ficha para navegar a tempo")
+    driver.get("https://pesqbrasil-pescadorprofissional.mpa.gov.br")
+    driver.metricas_home = bloqueio_recursos.medir_pagina(driver)
+
+    time.sleep(1)
+    
+    limpar_sessao_navegador(driver)
+    clicar_entrar_com(driver)
+    return driver.metricas_home
+
+def fechar_abas_extras(driver):
+    """Chrome reaproveitado: fecha abas que o cliente anterior deixou (ex: PDF) e volta à principal."""
+    try:
+        abas = driver.window_handles
+        for aba in abas[1:]:
+            driver.switch_to.window(aba)
+            driver.close()
+        driver.switch_to.window(abas[0])
+    except: pass
+
+def registrar_metricas_navegador(driver, cpf, metricas_home):
+    """Bytes/tempo de página do cliente (home + última página) no canal de resultados, para comparar com/sem bloqueio."""
+    final = bloqueio_recursos.medir_pagina(driver)
+    SESSAO_ATUAL.pronto_ms = metricas_home.get("pronto_ms") # Amostra de latência para o limitador (AIMD)
+    if not final and not metricas_home: return
+    print(f"[{ID_INSTANCIA}] [METRICAS] home: {metricas_home.get('bytes', 0) / 1024:.0f} KB em {metricas_home.get('pronto_ms', 0)} ms | "
+          f"final: {final.get('bytes', 0) / 1024:.0f} KB, {final.get('recursos', 0)} recursos (bloqueio {'OFF' if args.sem_bloqueio else 'ON'})")
+    canal_resultados.emitir("metrics", cpf=cpf, bloqueio=not args.sem_bloqueio, home=metricas_home, final=final)
+
+def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
+    global ROBO_PARADO
+    if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
     
+    print(f"[{ID_INSTANCIA}] >> ATENDENDO: {nome_pessoa}")
+
+    # [CHECKPOINT] Retoma da primeira etapa pendente (crash/retry/nova execução)
+    ck = checkpoints.carregar(cpf)
+    if ck.get("PDF") and ck.get("ENVIADO") and os.path.exists(ck.get("ARQUIVO_PDF", "")):
+        print(f"[{ID_INSTANCIA}] [CHECKPOINT] PDF já salvo anteriormente. Nada a fazer para {nome_pessoa}.")
+        canal_resultados.emitir_progresso(cpf, "PDF", "skip", arquivo=ck["ARQUIVO_PDF"])
+        return True, "OK", ck["ARQUIVO_PDF"], ck.get("ANO_BASE", "")
+    meses_ok = set(ck.get("MESES", []))
+    if ck:
+        etapas_ok = [e for e in ["LOGADO", "TELA1", "TELA2", "TELA3", "ENVIADO"] if ck.get(e)]
+        print(f"[{ID_INSTANCIA}] [CHECKPOINT] Retomando {nome_pessoa}: {etapas_ok} + {len(meses_ok)} meses.")
+    
+    local_municipio_alvo = "Buriticupu"
+    try: 
+        if not df_pessoa.empty and "MUNICIPIO" in df_pessoa.columns:
+            local_municipio_alvo = df_pessoa.iloc[0]["MUNICIPIO"]
+    except: pass
+
+    sessao = sessao_atual()
+    janela = janela_da_sessao(sessao)
+    gerenciador = navegador_da_sessao()
+
     driver = None
     foi_enviado_com_sucesso = False
+    metricas_home = {}
+    id_vaga = None
     
     try:
-        print(f"[{ID_INSTANCIA}] [DEBUG] Inicializando Chrome Driver...")
-        v_main = get_chrome_version_windows()
-        driver = uc.Chrome(options=options, version_main=v_main)
-        print(f"[{ID_INSTANCIA}] [DEBUG] Chrome Driver Inicializado (Versão: {v_main or 'Auto'}).")
-        try: driver.set_window_rect(x=POS_X, y=POS_Y, width=LARGURA_W, height=ALTURA_W)
-        except: pass
-        
-        try: driver.switch_to.window(driver.window_handles[0])
-        except: pass
-
-        driver.get("https://pesqbrasil-pescadorprofissional.mpa.gov.br")
+        canal_resultados.emitir_progresso(cpf, "NAVEGADOR", "start", nome=nome_pessoa)
+        driver = gerenciador.obter() # Reaproveita o Chrome da sessão (reciclado entre clientes)
+        tela = TelaRemota(driver) if MODO_OCULTO else None
+        if gerenciador.pronto:
+            # [PIPELINE] Preparado em segundo plano enquanto o cliente anterior era preenchido
+            metricas_home = getattr(driver, "metricas_home", {})
+            info = gerenciador.ultimo_preparo
+            print(f"[{ID_INSTANCIA}] [PIPELINE] Navegador já na tela de login (espera {info['espera_s']}s, "
+                  f"economizou {info['economia_s']}s; total {info['economia_total_s']}s).")
+            canal_resultados.emitir("pipeline", cpf=cpf, sessao=gerenciador.nome, **info)
+        else:
+            metricas_home = preparar_navegador(driver)
+
+        # [SESSÃO SALVA] Retry/retomada do mesmo cliente: tenta pular o login humano
+        sessao_restaurada = False
+        if REUSAR_SESSAO and sessoes_gov.restaurar(driver, cpf):
+            if sessao_autenticada(driver):
+                sessao_restaurada = True
+                print(f"[{ID_INSTANCIA}] [SESSÃO] Sessão gov.br salva ainda válida. Pulando login de {nome_pessoa}.")
+            else:
+                print(f"[{ID_INSTANCIA}] [SESSÃO] Sessão salva expirou no portal. Login manual necessário.")
+                sessoes_gov.limpar(cpf)
+                limpar_sessao_navegador(driver)
+                clicar_entrar_com(driver)
 
-        time.sleep(1)
-        
-        # [LIMPEZA] LOG
-        try:
-            print(f"[{ID_INSTANCIA}] [LIMPEZA] Limpando cookies, cache e IndexedDB...")
-            driver.delete_all_cookies()
-            driver.execute_script("window.localStorage.clear();")
-            driver.execute_script("window.sessionStorage.clear();")
-            driver.execute_script("""
-                if (window.indexedDB && window.indexedDB.databases) {
-                    window.indexedDB.databases().then(dbs => {
-                        dbs.forEach(db => window.indexedDB.deleteDatabase(db.name));
-                    });
-                }
-            """)
-            # Tenta clicar em um botão de sair se estiver visível
-            for btn_sair in driver.find_elements(By.XPATH, "//button[contains(., 'Sair')] | //a[contains(., 'Sair')]"):
-                if btn_sair.is_displayed():
-                    driver.execute_script("arguments[0].click();", btn_sair)
-                    time.sleep(1)
-            driver.refresh()
-            time.sleep(2)
-        except: pass
-        
         # Posiciona no Canto Superior Esquerdo (A pedido do usuário)
         popup_x = POS_X + 50
         popup_y = POS_Y + 80
-        
-        # Inicia Login
-        try: WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Entrar com')]"))).click()
-        except: pass
+
+        canal_resultados.emitir_progresso(cpf, "NAVEGADOR", "end")
 
         # Login Assistant V2
-        res_login = invocar_assistente(nome_pessoa, cpf, senha, x=popup_x, y=popup_y, cor=COR_TEMA)
+        canal_resultados.emitir_progresso(cpf, "LOGIN", "skip" if sessao_restaurada else "start")
+        if sessao_restaurada:
+            res_login = "OK"
+        elif FILA_LOGIN is not None:
+            # Etapa de login humano: entra na fila do painel e libera o operador para as outras sessões
+            print(f"[{ID_INSTANCIA}] [FILA LOGIN] Sessão {sessao} aguardando login de {nome_pessoa} ({len(FILA_LOGIN) + 1} na fila).")
+            def focar_janela():
+                driver.minimize_window()
+                driver.set_window_rect(**janela)
+            res_login = FILA_LOGIN.solicitar(sessao, nome_pessoa, cpf, senha,
+                                             focar=None if MODO_OCULTO else focar_janela, tela=tela)
+            if res_login is None and ROBO_PARADO: return False, "PARADO PELO USUÁRIO", "", ""
+        else:
+            res_login = invocar_assistente(nome_pessoa, cpf, senha, x=popup_x, y=popup_y, cor=COR_TEMA, tela=tela)
         if not res_login or res_login != "OK":
-            return False, (res_login if res_login else "CANCELADO"), ""
-
-        if ROBO_PARADO: return False, "PARADO PELO USUÁRIO", ""
+            canal_resultados.emitir_progresso(cpf, "LOGIN", "fail", motivo=res_login or "CANCELADO")
+            return False, (res_login if res_login else "CANCELADO"), "", ""
+        if not sessao_restaurada:
+            canal_resultados.emitir_progresso(cpf, "LOGIN", "end")
+            if REUSAR_SESSAO: sessoes_gov.salvar(driver, cpf)
+        checkpoints.marcar(cpf, "LOGADO")
+        # Daqui em diante só o robô usa a página: corta imagens e fontes também
+        if not args.sem_bloqueio: bloqueio_recursos.aplicar(driver, "reap")
+
+        if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
+
+        # Vaga de concorrência no portal (AIMD entre todos os processos) só para o trabalho do
+        # robô: o login humano não segura vaga e não trava a consulta pesqbrasil por minutos
+        if LIMITAR_PORTAL:
+            id_vaga = limitador_portal.ocupar_vaga(parar=checar_controle, timeout=ESPERA_VAGA_S)
+            if id_vaga is None:
+                if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
+                return False, "Limitador do portal: sem vaga de concorrência a tempo", "", ""
 
         # Robot takes over
         carregar_zoom(driver, 0.60)
@@ -957,18 +1475,29 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
             if "manutencao-reap" not in url_atual:
                 try: WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'card-home-menu') and contains(., 'Manutenção anual')]"))).click(); time.sleep(2)
                 except: pass
-            try:
-                btn_edit = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[@aria-label='editar']")))
-                driver.execute_script("arguments[0].click();", btn_edit); time.sleep(5)
-            except: 
-                if len(driver.find_elements(By.XPATH, "//button[@aria-label='visualizar_2a_via']")) > 0:
-                    foi_enviado_com_sucesso = True
+            if ck.get("ENVIADO"):
+                # [CHECKPOINT] Já enviado: vai direto para o PDF
+                print(f"[{ID_INSTANCIA}] [CHECKPOINT] Declaração já enviada. Pulando para o PDF...")
+                foi_enviado_com_sucesso = True
+            else:
+                try:
+                    btn_edit = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[@aria-label='editar']")))
+                    driver.execute_script("arguments[0].click();", btn_edit); time.sleep(5)
+                except: 
+                    if len(driver.find_elements(By.XPATH, "//button[@aria-label='visualizar_2a_via']")) > 0:
+                        foi_enviado_com_sucesso = True
 
         if not foi_enviado_com_sucesso:
-            if ROBO_PARADO: return False, "PARADO PELO USUÁRIO", ""
+            if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
             # --- TELA 1 ---
             carregar_zoom(driver)
-            if len(driver.find_elements(By.NAME, "uf")) > 0:
+            if ck.get("TELA1"):
+                # [CHECKPOINT] Telas já confirmadas: salta direto para a primeira pendente
+                print(f"[{ID_INSTANCIA}] [CHECKPOINT] Tela 1 já concluída. Pulando...")
+                canal_resultados.emitir_progresso(cpf, "TELA1", "skip")
+                ir_para_passo(driver, 3 if ck.get("TELA2") else 2)
+            elif len(driver.find_elements(By.NAME, "uf")) > 0:
+                canal_resultados.emitir_progresso(cpf, "TELA1", "start")
                 print(f"[{ID_INSTANCIA}] [INFO] Preenchendo Tela 1...")
                 tentativas_t1 = 0
                 while tentativas_t1 < 3:
@@ -980,13 +1509,18 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                     time.sleep(3)
                     if verificar_passo_concluido(driver, 1):
                         print(f"[{ID_INSTANCIA}] [OK] Tela 1 concluída com sucesso.")
+                        canal_resultados.emitir_progresso(cpf, "TELA1", "end")
+                        checkpoints.marcar(cpf, "TELA1")
                         break
                     tentativas_t1 += 1
                     print(f"[{ID_INSTANCIA}] [AVISO] Tela 1 não confirmada, tentando novamente ({tentativas_t1}/3)...")
 
             # --- TELA 2 ---
             carregar_zoom(driver)
-            if len(driver.find_elements(By.NAME, "prestacaoServico")) > 0 or verificar_passo_concluido(driver, 1):
+            if ck.get("TELA2"):
+                print(f"[{ID_INSTANCIA}] [CHECKPOINT] Tela 2 já concluída. Pulando...")
+                canal_resultados.emitir_progresso(cpf, "TELA2", "skip")
+            elif len(driver.find_elements(By.NAME, "prestacaoServico")) > 0 or verificar_passo_concluido(driver, 1):
                 # Se não estiver na tela 2 mas o passo 1 está OK, tenta clicar no 2
                 if len(driver.find_elements(By.NAME, "prestacaoServico")) == 0:
                     try:
@@ -995,6 +1529,7 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                     except: pass
 
                 if len(driver.find_elements(By.NAME, "prestacaoServico")) > 0:
+                    canal_resultados.emitir_progresso(cpf, "TELA2", "start")
                     print(f"[{ID_INSTANCIA}] [INFO] Preenchendo Tela 2...")
                     tentativas_t2 = 0
                     while tentativas_t2 < 3:
@@ -1006,11 +1541,14 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                         time.sleep(3)
                         if verificar_passo_concluido(driver, 2):
                             print(f"[{ID_INSTANCIA}] [OK] Tela 2 concluída com sucesso.")
+                            canal_resultados.emitir_progresso(cpf, "TELA2", "end")
+                            checkpoints.marcar(cpf, "TELA2")
                             break
                         tentativas_t2 += 1
                         print(f"[{ID_INSTANCIA}] [AVISO] Tela 2 não confirmada, tentando novamente ({tentativas_t2}/3)...")
 
             # --- TELA 3 ---
+            canal_resultados.emitir_progresso(cpf, "TELA3", "start")
             carregar_zoom(driver)
             WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.XPATH, "//button[contains(., 'Janeiro')]")))
             
@@ -1025,14 +1563,17 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                 todas_as_listas = [ (MESES_DEFESO, True), (MESES_PESCA, False) ]
                 for lista, eh_defeso in todas_as_listas:
                     for mes_n, idx_n in lista.items():
-                        if ROBO_PARADO: break
+                        if checar_controle(): break
+                        if mes_n in meses_ok: continue # [CHECKPOINT] Já validado antes
                         
                         print(f"[{ID_INSTANCIA}] [TRABALHO] Preenchendo Mês: {mes_n}")
                         filtro_m = df_pessoa[df_pessoa['MES'].astype(str).str.contains(mes_n, case=False, na=False)]
                         if not eh_defeso and filtro_m.empty: continue
                         
+                        canal_resultados.emitir_progresso(cpf, "MES", "start", mes=mes_n)
                         btn_c = cache_botoes.get(mes_n)
-                        executar_preenchimento_mensal(driver, mes_n, idx_n, filtro_m, eh_defeso, cached_btn=btn_c)
+                        ok_mes = executar_preenchimento_mensal(driver, mes_n, idx_n, filtro_m, eh_defeso, cached_btn=btn_c)
+                        canal_resultados.emitir_progresso(cpf, "MES", "end" if ok_mes else "fail", mes=mes_n)
 
 
             # 1. Verificação Inicial Inteligente (Smart Resume)
@@ -1040,7 +1581,10 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
             print(f"[{ID_INSTANCIA}] [CHECK] Verificando se Tela 3 pode ser pulada...")
             precisa_preencher_t3 = False
             for m in todas_as_chaves:
-                if not verificar_mes_concluido(driver, m):
+                if m in meses_ok: continue # [CHECKPOINT] Mês validado em tentativa anterior
+                if verificar_mes_concluido(driver, m):
+                    meses_ok.add(m); checkpoints.marcar_mes(cpf, m)
+                else:
                      # Se o mês não tá verde, checa se ele deveria ser preenchido
                      if m in MESES_DEFESO: 
                          precisa_preencher_t3 = True; break
@@ -1064,7 +1608,13 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
             
             start_sweep = time.time()
             while time.time() - start_sweep < 300: # Timeout de 5 min para evitar loop infinito
-                meses_faltantes = [m for m in todas_as_chaves if not verificar_mes_concluido(driver, m)]
+                meses_faltantes = []
+                for m in todas_as_chaves:
+                    if m in meses_ok: continue
+                    if verificar_mes_concluido(driver, m):
+                        meses_ok.add(m); checkpoints.marcar_mes(cpf, m)
+                    else:
+                        meses_faltantes.append(m)
                 
                 # Filtra apenas os meses que REALMENTE precisam ser preenchidos e que não estouraram o limite
                 meses_para_corrigir = []
@@ -1092,7 +1642,7 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                     executar_preenchimento_mensal(driver, mf, idx_f, filtro_f, eh_def_f)
                 
                 time.sleep(2)
-                if ROBO_PARADO: return False, "PARADO PELO USUÁRIO", ""
+                if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
 
             print(f"[{ID_INSTANCIA}] -> Finalizando Tela 3 e avançando...")
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight)"); time.sleep(0.5)
@@ -1104,6 +1654,8 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                     driver.execute_script("arguments[0].click();", b_avan); time.sleep(3)
                     if verificar_passo_concluido(driver, 3):
                         print(f"[{ID_INSTANCIA}] [OK] Tela 3 concluída com sucesso.")
+                        canal_resultados.emitir_progresso(cpf, "TELA3", "end")
+                        checkpoints.marcar(cpf, "TELA3")
                         break
                 except: pass
                 tentativas_t3 += 1
@@ -1111,7 +1663,7 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                 time.sleep(1)
 
             # --- TELA 4 ---
-            if ROBO_PARADO: return False, "PARADO PELO USUÁRIO", ""
+            if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
             
             # Verificação de segurança: Passo 1 and 2 devem estar verdes na Tela 4
             if not verificar_passo_concluido(driver, 1) or not verificar_passo_concluido(driver, 2):
@@ -1119,6 +1671,7 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                 # Tenta voltar clicando no passo se necessário (opcional conforme pedido)
             
             carregar_zoom(driver)
+            canal_resultados.emitir_progresso(cpf, "ENVIO", "start")
             print("[INFO] Tela 4: Finalização...")
             try:
                 print("   [x] Preparando declaração de responsabilidade...")
@@ -1168,11 +1721,14 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                         if not foi_enviado_com_sucesso:
                              print("   [?] URL não mudou, mas 'Sim' foi clicado. Assumindo sucesso para PDF.")
                              foi_enviado_com_sucesso = True
+                        canal_resultados.emitir_progresso(cpf, "ENVIO", "end")
+                        checkpoints.marcar(cpf, "ENVIADO")
                     except: pass
             except: pass
 
         # 📄 PDF
-        if ROBO_PARADO: return False, "PARADO PELO USUÁRIO", "", ""
+        if checar_controle(): return False, "PARADO PELO USUÁRIO", "", ""
+        canal_resultados.emitir_progresso(cpf, "PDF", "start")
         print("[PDF] Gerando PDF..."); time.sleep(1.5)
         a_s = str(datetime.now().year)
         try:
@@ -1209,15 +1765,17 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                     driver.execute_script(f"var a=document.createElement('a');a.href='{url}';a.download='{final_filename}';document.body.appendChild(a);a.click();document.body.removeChild(a);")
                     
                     # Usa o helper para garantir o nome correto (browser as vezes ignora a.download)
-                    full_path = find_latest_pdf_and_rename(os.path.abspath(args.download_dir), final_filename)
+                    full_path = find_latest_pdf_and_rename(pasta_downloads(sessao), final_filename, downloads_usuario=SESSOES == 1)
                     
                     if full_path and os.path.exists(full_path):
                         print(f"[{ID_INSTANCIA}] [PDF] Arquivo localizado e renomeado: {full_path}")
+                        registrar_pdf_salvo(cpf, full_path, a_s, enviado=foi_enviado_com_sucesso)
                         return foi_enviado_com_sucesso, "OK", full_path, a_s
                     else:
                         print(f"[{ID_INSTANCIA}] [AVISO] Helper não localizou o arquivo. Tentando fallback pelo nome sugerido.")
-                        full_path = os.path.join(os.path.abspath(args.download_dir), final_filename)
+                        full_path = os.path.join(pasta_downloads(sessao), final_filename)
                         if os.path.exists(full_path):
+                             registrar_pdf_salvo(cpf, full_path, a_s, enviado=foi_enviado_com_sucesso)
                              return foi_enviado_com_sucesso, "OK", full_path, a_s
 
                 driver.close()
@@ -1232,9 +1790,10 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
                 # Aguarda um pouco para o download iniciar
                 time.sleep(3)
                 
-                full_path = find_latest_pdf_and_rename(os.path.abspath(args.download_dir), final_filename)
+                full_path = find_latest_pdf_and_rename(pasta_downloads(sessao), final_filename, downloads_usuario=SESSOES == 1)
                 if full_path and os.path.exists(full_path):
                     print(f"[{ID_INSTANCIA}] [PDF] Arquivo localizado via fallback: {full_path}")
+                    registrar_pdf_salvo(cpf, full_path, a_s)
                     return True, "OK", full_path, a_s
                 else:
                     print(f"[{ID_INSTANCIA}] [AVISO] PDF não localizado. Retornando sucesso sem anexo.")
@@ -1254,8 +1813,12 @@ def processar_pescador_v2(nome_pessoa, df_pessoa, cpf, senha):
         log_crash(msg + "\n" + traceback.format_exc())
         return False, f"Erro: {str(e)}", "", ""
     finally:
-        if driver: driver.quit()
-        pass
+        try: limitador_portal.liberar_vaga(id_vaga)
+        except Exception as e: print(f"[{ID_INSTANCIA}] [LIMITADOR] Falha ao liberar vaga: {e}")
+        if driver:
+            registrar_metricas_navegador(driver, cpf, metricas_home)
+            instrumentacao_driver.fechar_cliente(driver, re.sub(r"\D", "", str(cpf)) or "sem_cpf", prefixo=f"[{ID_INSTANCIA}] ")
+            gerenciador.devolver(saudavel=navegadores.navegador_vivo(driver))
 
 # ==============================================================================
 # [START] MAIN LOOP V2
@@ -1278,6 +1841,245 @@ def log_debug(msg):
             f.write(f"[{timestamp}] {msg}\n")
     except: pass
 
+# ==============================================================================
+# VALIDAÇÃO DOS DADOS DE PESCA EM LOTE (ANTES DE AGENDAR)
+# ==============================================================================
+VOCABULARIO = None
+
+def vocabulario():
+    global VOCABULARIO
+    if VOCABULARIO is None:
+        VOCABULARIO = validacao_dados.Vocabulario.carregar(os.path.dirname(os.path.abspath(__file__)), CACHE_OPCOES)
+    return VOCABULARIO
+
+def validar_lote(lote):
+    """
+    Valida [(chave, cpf, nome, registros), ...] de uma vez e grava o relatório de rejeições.
+    Retorna ({chave: registros normalizados} dos aceitos, {chave: motivo} dos rejeitados).
+    """
+    aceitos, rejeitados, relatorio, avisos_todos = {}, {}, [], []
+    for chave, cpf, nome, registros in lote:
+        normalizados, erros, avisos = validacao_dados.validar_registros(registros, vocabulario())
+        avisos_todos.extend({"cpf": cpf, "nome": nome, "aviso": a} for a in avisos)
+        if erros:
+            rejeitados[chave] = validacao_dados.resumir_erros(erros)
+            relatorio.append({"cpf": cpf, "nome": nome, "erros": erros})
+        else:
+            aceitos[chave] = normalizados
+    if lote:
+        caminho = validacao_dados.salvar_relatorio(relatorio, avisos_todos, ID_INSTANCIA)
+        print(f"[{ID_INSTANCIA}] [VALIDAÇÃO] {len(aceitos)} clientes com dados válidos, {len(rejeitados)} rejeitados, "
+              f"{len(avisos_todos)} avisos (relatório: {caminho}).")
+        for item in relatorio:
+            print(f"[{ID_INSTANCIA}] [VALIDAÇÃO] Rejeitado {item['nome']}: {item['erros'][0]}")
+        canal_resultados.emitir("validation", aceitos=len(aceitos), rejeitados=len(rejeitados), avisos=len(avisos_todos))
+    return aceitos, rejeitados
+
+def validar_pendentes_excel(itens, dados_por_nome, registrar=True):
+    """Modo Excel: normaliza dados_por_nome no lugar e tira da fila quem tem dados inválidos."""
+    lote = [(it['CPF'], it['CPF'], it['NOME'], dados_por_nome[it['NOME']].to_dict('records')) for it in itens if it['NOME'] in dados_por_nome]
+    aceitos, rejeitados = validar_lote(lote)
+    for it in itens:
+        if it['CPF'] in aceitos:
+            dados_por_nome[it['NOME']] = pd.DataFrame(aceitos[it['CPF']])
+        elif it['CPF'] in rejeitados and registrar:
+            salvar_resultado_excel(it['CPF'], rejeitados[it['CPF']], rejeitados[it['CPF']], "", it['NOME'])
+            atualizar_status_dados(it['NOME'], rejeitados[it['CPF']])
+    return [it for it in itens if it['CPF'] not in rejeitados]
+
+def validar_clientes_json(clientes):
+    """Modo JSON: normaliza fishing_data de cada cliente e reporta os rejeitados sem abrir navegador."""
+    lote = [(i, c.get('cpf', c.get('cpf_cnpj', '')), c.get('nome', c.get('nome_completo', 'PESCADOR')), c['fishing_data'])
+            for i, c in enumerate(clientes) if c.get('fishing_data')]
+    aceitos, rejeitados = validar_lote(lote)
+    restantes = []
+    for i, clie in enumerate(clientes):
+        if i in rejeitados:
+            reportar_resultado_json(clie, False, rejeitados[i])
+            continue
+        if i in aceitos:
+            clie['fishing_data'] = aceitos[i]
+            clie['_validado'] = True
+        restantes.append(clie)
+    return restantes
+
+# ==============================================================================
+# PREVISÃO DE DURAÇÃO, ORDEM DA FILA E ETA
+# ==============================================================================
+def prever_cliente(cpf, registros):
+    """Duração prevista (s) do cliente; guarda as características para o histórico."""
+    global MODELO_DURACAO
+    if MODELO_DURACAO is None: MODELO_DURACAO = historico_duracoes.ModeloDuracao.carregar()
+    especies, meses = historico_duracoes.caracteristicas(registros, MESES_PESCA)
+    previsto = MODELO_DURACAO.prever(cpf, especies, meses)
+    CRONOMETRO.caracteristicas[cpf] = {"especies": especies, "meses": meses, "previsto_s": round(previsto, 1)}
+    return previsto
+
+def dividir_pelos_dados(registros_por_cliente):
+    """
+    Posições (na ordem da base) dos clientes que ficam com esta instância.
+    Recebe a base inteira, inclusive os já concluídos, e divide pela carga de cada
+    cliente calculada só dos dados de pesca (historico_duracoes.custo_pelos_dados):
+    nada que as outras instâncias gravam durante o lote entra na conta, então
+    instâncias que começam ou reiniciam em momentos diferentes chegam à mesma divisão.
+    """
+    if TOTAL_INSTANCIAS <= 1: return list(range(len(registros_por_cliente)))
+    custos = [historico_duracoes.custo_pelos_dados(r, MESES_PESCA) for r in registros_por_cliente]
+    partes = planejador.dividir_por_carga(custos, TOTAL_INSTANCIAS)
+    cargas = " / ".join(f"{sum(custos[i] for i in p) / 60:.0f}" for p in partes)
+    print(f"[{ID_INSTANCIA}] [PREVISÃO] Divisão da base por carga dos dados (min por instância): {cargas}; "
+          f"minha parte: {len(partes[ID_INSTANCIA-1])} clientes.")
+    return partes[ID_INSTANCIA-1]
+
+def clientes_json_desta_instancia(clientes):
+    return [clientes[i] for i in dividir_pelos_dados([c.get('fishing_data') or [] for c in clientes])]
+
+def pendentes_excel_desta_instancia(plano, dados_por_nome):
+    """Divide a base inteira do plano e devolve só os pendentes da parte desta instância."""
+    registros = [dados_por_nome[n].to_dict('records') if n in dados_por_nome else [] for n in plano["NOME"]]
+    return planejador.itens_pendentes(plano.iloc[dividir_pelos_dados(registros)])
+
+def ordenar_por_previsao(itens, cpf_de, registros_de):
+    """Calcula _previsto_s de cada item e ordena conforme --ordem."""
+    for it in itens:
+        it['_previsto_s'] = prever_cliente(cpf_de(it), registros_de(it))
+    if args.ordem != "planilha":
+        itens = sorted(itens, key=lambda it: it['_previsto_s'], reverse=args.ordem == "maior_primeiro")
+    total = sum(it['_previsto_s'] for it in itens)
+    if itens:
+        print(f"[{ID_INSTANCIA}] [PREVISÃO] {len(itens)} clientes, ~{total / 60:.0f} min de trabalho "
+              f"(ETA ~{total / 60 / max(1, SESSOES):.0f} min com {SESSOES} sessão(ões)); ordem: {args.ordem}.")
+    return itens
+
+def estimar_eta(em_andamento):
+    """Segundos restantes: previsto da fila + o que falta dos clientes em andamento, dividido pelas sessões."""
+    fila = CONTROLE.fila.listar() if CONTROLE.fila is not None else []
+    restante = sum(it.get('_previsto_s', historico_duracoes.PADRAO_S) for it in fila)
+    agora = time.time()
+    for atual in em_andamento:
+        previsto = CRONOMETRO.caracteristicas.get(atual.get("cpf"), {}).get("previsto_s", historico_duracoes.PADRAO_S)
+        restante += max(0.0, previsto - (agora - atual.get("inicio", agora)))
+    return restante / max(1, SESSOES)
+
+CONTROLE.eta = estimar_eta
+
+def imprimir_plano(task_data=None):
+    """Dry-run (--plan): imprime as contagens do plano sem abrir navegadores."""
+    if task_data:
+        clientes = clientes_json_desta_instancia(task_data.get('clients', []))
+        sem_dados = sum(1 for c in clientes if not c.get('fishing_data'))
+        print(f"[{ID_INSTANCIA}] [PLANO] Tarefa JSON: {len(clientes)} clientes na minha parte ({sem_dados} sem dados de pesca).")
+        if not args.sem_validacao:
+            validar_lote([(i, c.get('cpf', c.get('cpf_cnpj', '')), c.get('nome', c.get('nome_completo', '')), c['fishing_data'])
+                          for i, c in enumerate(clientes) if c.get('fishing_data')])
+        return
+
+    df_c = safe_read_excel("base_clientes.xlsx")
+    if df_c is None:
+        print(f"[{ID_INSTANCIA}] [ERRO] base_clientes.xlsx não encontrada ou inválida.")
+        return
+    df_d = safe_read_excel("dados.xlsx")
+    progresso_local = planejador.carregar_progresso("temp_results/progresso_final.json")
+    plano = planejador.montar_plano(df_c, df_d, progresso_local)
+    planejador.imprimir_resumo(planejador.resumir_plano(plano), prefixo=f"[{ID_INSTANCIA}] ")
+    dados_por_nome = planejador.agrupar_dados_por_nome(df_d)
+    itens = pendentes_excel_desta_instancia(plano, dados_por_nome)
+    if not args.sem_validacao and df_d is not None:
+        validar_pendentes_excel(itens, dados_por_nome, registrar=False)
+
+def cpf_cliente_json(clie):
+    return clie.get('cpf', clie.get('cpf_cnpj', '')).replace('.', '').replace('-', '')
+
+def processar_cliente_json(clie, fila):
+    """Atende um cliente vindo do JSON/stream e reporta o resultado (ou o reagenda na fila)."""
+    nome = clie.get('nome', clie.get('nome_completo', 'PESCADOR'))
+    cpf = cpf_cliente_json(clie)
+    senha = clie.get('senha', clie.get('senha_gov', ''))
+    
+    # Dados de Pesca Mensal vindos do JSON ou Default
+    fishing_data = clie.get('fishing_data', [])
+    if not fishing_data:
+        # Fallback: Gerar dados padrão se não houver no JSON
+        fishing_data = gerar_dados_pesca_default(nome, clie.get('municipio', 'Buriticupu'))
+    
+    # Stream: cliente chega sozinho, então a validação acontece aqui (ainda antes do navegador)
+    if not args.sem_validacao and not clie.get('_validado'):
+        fishing_data, erros, _ = validacao_dados.validar_registros(fishing_data, vocabulario())
+        if erros:
+            print(f"[{ID_INSTANCIA}] [VALIDAÇÃO] Rejeitado {nome}: {erros[0]}")
+            reportar_resultado_json(clie, False, validacao_dados.resumir_erros(erros))
+            return
+    
+    df_d_clie = pd.DataFrame(fishing_data)
+    
+    print(f"[{ID_INSTANCIA}] [PROCESSANDO] {nome} ({cpf})")
+    
+    ok, mot, arq, ano = tentar_pescador(nome, df_d_clie, cpf, senha)
+    final, mot = avaliar_tentativa(clie, fila, cpf, nome, ok, mot)
+    if not final: return
+    reportar_resultado_json(clie, ok, mot, arq, ano)
+
+def reportar_resultado_json(clie, ok, mot, arq="", ano=""):
+    """Resultado de um cliente do JSON/stream para o Node.js (canal/STDOUT) e para o ERP."""
+    cpf = cpf_cliente_json(clie)
+    # Reporta resultado via STDOUT delimitado para o Node.js capturar
+    result_json = {
+        "id": clie.get('id'),
+        "cpf": cpf,
+        "nome": clie.get('nome', clie.get('nome_completo', 'PESCADOR')),
+        "success": ok,
+        "message": mot,
+        "pdf": os.path.abspath(arq) if arq and os.path.exists(arq) else "",
+        "ano_base": ano,
+        "timestamp": datetime.now().isoformat()
+    }
+    canal_resultados.emitir_resultado(result_json)
+    
+    # Webhook Integration (Regra 1)
+    enviar_para_erp(cpf, mot, result_json)
+
+def imprimir_eta():
+    estado = CONTROLE.estatisticas()
+    if estado.get("eta_s") is not None:
+        print(f"[{ID_INSTANCIA}] [ETA] ~{estado['eta_s'] / 60:.0f} min restantes ({estado['fila']} na fila, "
+              f"{len(estado['em_andamento'])} em andamento).")
+
+def executar_sessoes(fila, atender):
+    """
+    Consome a fila até ela ser fechada e esvaziar (ou o usuário parar).
+    Com --sessoes N, N threads (um navegador cada) consomem a mesma fila e o
+    login humano passa pela FILA_LOGIN; com 1 sessão roda aqui mesmo, como antes.
+    """
+    def _sessao(num):
+        SESSAO_ATUAL.id = num
+        for clie in fila:
+            if aguardar_disjuntor():
+                fila.reagendar(clie, 0) # Devolve já (no coordenador o empréstimo não fica preso até expirar)
+                break
+            atender(clie, fila) # A vaga do limitador é tomada dentro do cliente, depois do login
+            imprimir_eta()
+
+    navegadores.iniciar_monitor(GERENCIADORES)
+    if SESSOES == 1:
+        try: _sessao(1)
+        finally: encerrar_navegadores()
+        return
+
+    print(f"[{ID_INSTANCIA}] [SESSÕES] Iniciando {SESSOES} sessões paralelas com fila de login única.")
+    FILA_LOGIN.iniciar_painel()
+    threads = []
+    for num in range(1, SESSOES + 1):
+        t = threading.Thread(target=_sessao, args=(num,), daemon=True)
+        t.start()
+        threads.append(t)
+        time.sleep(2) # Escalona a abertura dos navegadores
+    for t in threads: t.join()
+    encerrar_navegadores()
+
+def processar_fila_json(fila):
+    """Consome a fila do JSON/stream (uma ou várias sessões)."""
+    executar_sessoes(fila, processar_cliente_json)
+
 def main_v2():
     # FIX: FORÇA O FLUSH IMEDIATO DO TERMINAL
     # sys.stdout.reconfigure(line_buffering=True) # REMOVIDO POR PRECAUÇÃO
@@ -1289,7 +2091,8 @@ def main_v2():
     except: pass
 
     try:
-        _main_v2_logic()
+        with perfilador.perfilar(f"reap_{ID_INSTANCIA}", prefixo=f"[{ID_INSTANCIA}] "):
+            _main_v2_logic()
     except Exception as e:
         err_msg = f"ERRO FATAL NA MAIN_V2: {str(e)}\n{traceback.format_exc()}"
         print(f"\n[X] {err_msg}")
@@ -1317,68 +2120,78 @@ def _main_v2_logic():
             print(f"[{ID_INSTANCIA}] [ERRO] Falha ao decodificar JSON_TASK: {e}")
             return
 
+    # Canal dedicado de resultados/progresso (fd aberto pelo Node.js)
+    if args.result_fd is not None:
+        canal_resultados.configurar(args.result_fd)
+
+    # API local de controle (stop/pause/resume/stats/clients/priority).
+    # Sem janela (headless/Xvfb) ela é o único jeito de parar: sobe numa porta livre
+    # mesmo sem --control_port (a porta sai no log e no evento "control").
+    porta_controle = args.control_port
+    if porta_controle is None and MODO_OCULTO: porta_controle = 0
+    if porta_controle is not None and not args.plan:
+        porta = iniciar_servidor(CONTROLE, porta_controle)
+        print(f"[{ID_INSTANCIA}] [CONTROLE] API local em http://127.0.0.1:{porta}")
+        canal_resultados.emitir("control", port=porta, instancia=ID_INSTANCIA)
+
+    # --- DRY-RUN: SÓ IMPRIME O PLANO ---
+    if args.plan:
+        imprimir_plano(task_data)
+        return
+
     # Limpeza de ambiente IPC se for Master
     if ID_INSTANCIA == 1:
         ipc_utils.limpar_ambiente_ipc()
 
     print(f">> Iniciando Instância {ID_INSTANCIA}...")
     
-    FloatingStopWindow(ID_INSTANCIA, POS_X, POS_Y, COR_TEMA)
+    if MODO_OCULTO:
+        print(f"[{ID_INSTANCIA}] [HEADLESS] Sem janela de STOP: use POST /stop na API de controle.")
+    else:
+        FloatingStopWindow(ID_INSTANCIA, POS_X, POS_Y, COR_TEMA)
+
+    # --- LÓGICA DE DADOS (COORDENADOR/STREAM/JSON vs EXCEL) ---
+    if COORDENADOR_URL:
+        # Worker: um cliente emprestado por vez; resultados e retries voltam para o coordenador
+        fila = FilaCoordenador(COORDENADOR_URL, instancia=ID_INSTANCIA)
+        canal_resultados.adicionar_ouvinte(fila.ao_evento)
+        CONTROLE.fila = fila
+        print(f"[{ID_INSTANCIA}] [COORDENADOR] Worker {fila.worker} pegando clientes de {COORDENADOR_URL}...")
+        processar_fila_json(fila)
+        fila.encerrar()
+        print(f"[{ID_INSTANCIA}] [FIM] Coordenador sem clientes ({fila.recebidos} atendidos por este worker).")
+        return
+
+    if TASK_STREAM:
+        def ao_receber_stream(c):
+            print(f"[{ID_INSTANCIA}] [STREAM] Cliente recebido: {c.get('nome', c.get('nome_completo', ''))}")
+            c['_previsto_s'] = prever_cliente(cpf_cliente_json(c), c.get('fishing_data') or []) # Só para o ETA (ordem de chegada)
+        # Clientes chegam em NDJSON enquanto o robô trabalha (inclusive novos durante a execução)
+        fila = FilaTarefas()
+        CONTROLE.fila = fila
+        iniciar_leitura(TASK_STREAM, fila, ID_INSTANCIA, TOTAL_INSTANCIAS,
+                        ao_receber=ao_receber_stream)
+        print(f"[{ID_INSTANCIA}] [STREAM] Aguardando clientes em {'stdin' if TASK_STREAM == '-' else TASK_STREAM}...")
+        processar_fila_json(fila)
+        print(f"[{ID_INSTANCIA}] [FIM] Stream de tarefas finalizado ({fila.recebidos} clientes recebidos).")
+        return
 
-    # --- LÓGICA DE DADOS (JSON vs EXCEL) ---
     if task_data:
         # Se temos JSON, usamos ele. 
         # A divisão de trabalho já pode vir pronta ou fazemos aqui.
         all_clients = task_data.get('clients', [])
-        # Divisão simples por instância
-        meus_clientes = all_clients[ID_INSTANCIA-1::TOTAL_INSTANCIAS]
-        print(f"[{ID_INSTANCIA}] [JSON] Minha fatia: {len(meus_clientes)} clientes.")
+        # Divisão pela carga dos dados (antes da validação: todas as instâncias veem os mesmos dados)
+        meus_clientes = clientes_json_desta_instancia(all_clients)
+        print(f"[{ID_INSTANCIA}] [JSON] Minha parte: {len(meus_clientes)} clientes.")
+        if not args.sem_validacao:
+            meus_clientes = validar_clientes_json(meus_clientes)
+        meus_clientes = ordenar_por_previsao(meus_clientes, cpf_cliente_json, lambda c: c.get('fishing_data') or [])
         
-        for clie in meus_clientes:
-            if ROBO_PARADO: break
-            
-            nome = clie.get('nome', clie.get('nome_completo', 'PESCADOR'))
-            cpf = clie.get('cpf', clie.get('cpf_cnpj', '')).replace('.', '').replace('-', '')
-            senha = clie.get('senha', clie.get('senha_gov', ''))
-            
-            # Dados de Pesca Mensal vindos do JSON ou Default
-            fishing_data = clie.get('fishing_data', [])
-            if not fishing_data:
-                # Fallback: Gerar dados padrão se não houver no JSON
-                fishing_data = gerar_dados_pesca_default(nome, clie.get('municipio', 'Buriticupu'))
-            
-            df_d_clie = pd.DataFrame(fishing_data)
-            
-            print(f"[{ID_INSTANCIA}] [PROCESSANDO] {nome} ({cpf})")
-            
-            # TODO: Adaptar processar_pescador_v2 para retornar JSON no stdout
-            ok, mot, arq, ano = False, "", "", ""
-            retry_count = 0
-            while retry_count < 2:
-                try:
-                    ok, mot, arq, ano = processar_pescador_v2(nome, df_d_clie, cpf, senha)
-                    if ok or "PEND" in str(mot).upper() or "LOGIN" in str(mot).upper(): break
-                except: traceback.print_exc()
-                retry_count += 1
-                time.sleep(3)
-            
-            # Reporta resultado via STDOUT delimitado para o Node.js capturar
-            result_json = {
-                "id": clie.get('id'),
-                "cpf": cpf,
-                "nome": nome,
-                "success": ok,
-                "message": mot,
-                "pdf": os.path.abspath(arq) if arq and os.path.exists(arq) else "",
-                "ano_base": ano,
-                "timestamp": datetime.now().isoformat()
-            }
-            print(f"RESULT_START{json.dumps(result_json)}RESULT_END")
-            sys.stdout.flush()
-            
-            # Webhook Integration (Regra 1)
-            enviar_para_erp(cpf, mot, result_json)
-            
+        fila = FilaTarefas(meus_clientes)
+        fila.fechar()
+        CONTROLE.fila = fila
+        CONTROLE.aceita_clientes = False # Modo --json_task: a lista já veio inteira
+        processar_fila_json(fila)
         print(f"[{ID_INSTANCIA}] [FIM] Tarefa JSON finalizada.")
         return
 
@@ -1407,27 +2220,34 @@ def _main_v2_logic():
     results_file = "temp_results/progresso_final.json" # Unificado
     
     # Carrega progresso local se existir
-    progresso_local = {}
-    if os.path.exists(results_file):
-        try:
-            with open(results_file, "r", encoding="utf-8") as f: progresso_local = json.load(f)
-        except: pass
-
-    # --- DIVISÃO DE TRABALHO (INTERCALADO) ---
-    # Instancia 1: Indices 0, 2, 4, 6...
-    # Instancia 2: Indices 1, 3, 5, 7...
-    # Lógica: iloc[start::step]
-    df_minha_fatia = df_c.iloc[ID_INSTANCIA-1::TOTAL_INSTANCIAS].copy()
-
-    print(f"[{ID_INSTANCIA}] [STATUS] Minha Fatia (Intercalada): {len(df_minha_fatia)} clientes.")
-
-    for i, clie in df_minha_fatia.iterrows():
-        if ROBO_PARADO: break
-        
+    progresso_local = planejador.carregar_progresso(results_file)
+
+    # --- PLANO DE TRABALHO ---
+    # Classificação de status, retry e dados de pesca numa única passada vetorizada
+    # sobre a base inteira; as instâncias dividem a base (concluídos inclusos) pela
+    # carga dos dados de pesca e cada uma fica com os pendentes da sua parte.
+    plano = planejador.montar_plano(df_c, df_d, progresso_local)
+    resumo = planejador.resumir_plano(plano)
+    dados_por_nome = planejador.agrupar_dados_por_nome(df_d)
+    itens = pendentes_excel_desta_instancia(plano, dados_por_nome)
+    if not args.sem_validacao:
+        itens = validar_pendentes_excel(itens, dados_por_nome)
+    itens = ordenar_por_previsao(itens, lambda it: it['CPF'],
+                                 lambda it: dados_por_nome[it['NOME']].to_dict('records') if it['NOME'] in dados_por_nome else [])
+    fila = FilaTarefas(itens)
+    fila.fechar()
+    CONTROLE.fila = fila
+    CONTROLE.aceita_clientes = False # Modo Excel: clientes vêm só da planilha
+    df_vazio = df_d.iloc[0:0]
+
+    print(f"[{ID_INSTANCIA}] [STATUS] Base: {resumo['total']} clientes. "
+          f"A processar: {resumo['a_processar']}, minha parte: {len(itens)} (pulados: {resumo['concluidos'] + resumo['pendencias']}).")
+
+    def atender_excel(clie, fila):
         # --- MASTER: Processar Mensagens IPC do Slave ---
         if ID_INSTANCIA == 1:
             try:
-                msgs_slave = ipc_utils.ler_e_limpar_ipc()
+                with LOCK_PLANILHAS: msgs_slave = ipc_utils.ler_e_limpar_ipc()
                 if msgs_slave:
                      print(f"[{ID_INSTANCIA}] [IPC] Recebidos {len(msgs_slave)} updates do Auxiliar.")
                      for m in msgs_slave:
@@ -1437,55 +2257,17 @@ def _main_v2_logic():
             except Exception as e_ipc:
                 print(f"[{ID_INSTANCIA}] [ERRO] IPC Error: {e_ipc}")
         
-        cpf = str(clie['CPF'])
-        
-        # Pula se já estiver no Excel como concluído ou com pendência impeditiva
-        status_excel = str(clie.get('STATUS', '')).upper()
-        termos_pular = ["OK", "PENDENCIA", "PENDÊNCIA", "SÓ FALTA PDF", "SENHA", "NIVEL", "2FA", "ETAPA", "BLOQUEADO", "AUTORIZADO"]
-        if any(termo in status_excel for termo in termos_pular):
-            print(f"[{ID_INSTANCIA}] [SKIP] Pulando {clie['NOME']} (Status {status_excel} no Excel)")
-            continue
-            
-        # Pula se estiver no log local COM STATUS DE SUCESSO
-        if cpf in progresso_local:
-            status_local = str(progresso_local[cpf].get('STATUS', '')).upper()
-            if any(termo in status_local for termo in termos_pular):
-                continue
-            else:
-                print(f"[{ID_INSTANCIA}] [RETRY] Retentando cliente com status {status_local}: {clie['NOME']}")
+        cpf = clie['CPF']
+        if clie['CLASSE'] == planejador.CLASSE_RETRY and not clie.get('_tentativa'):
+            print(f"[{ID_INSTANCIA}] [RETRY] Retentando cliente com status {clie['STATUS_LOCAL']}: {clie['NOME']}")
 
         nome, senha = clie['NOME'], clie['SENHA_GOV']
         
-        # --- LÓGICA DE RETRY E CORREÇÃO DE ERRO ---
-        retry_count = 0
-        max_retries = 3
-        sucesso_processamento = False
-        ok, mot, arq, ano = False, "", "", ""
-        
+        # --- TENTATIVA ÚNICA: FALHA TRANSITÓRIA VOLTA PARA O FIM DA FILA COM BACKOFF ---
         print(f"[{ID_INSTANCIA}] [PROCESSANDO] {nome} - Tentando...")
-        while retry_count < max_retries:
-            try:
-                ok, mot, arq, ano = processar_pescador_v2(nome, df_d[df_d['NOME'] == nome], cpf, senha)
-                
-                if ok or str(mot) == "PARADO PELO USUÁRIO":
-                    sucesso_processamento = True
-                    break
-                
-                # Se for erro de login ou pendência, não adianta tentar de novo
-                mot_upper = str(mot).upper()
-                if any(x in mot_upper for x in ["LOGIN", "SENHA", "PENDEN", "PENDÊN", "AUTORIZADO", "PARADO"]):
-                    break
-                    
-                print(f"[{ID_INSTANCIA}] [AVISO] Falha na tentativa {retry_count+1}/{max_retries}. Reiniciando...")
-                retry_count += 1
-                time.sleep(5)
-            except Exception as e_proc:
-                print(f"[{ID_INSTANCIA}] [ERRO] Exceção na tentativa {retry_count+1}: {e_proc}")
-                retry_count += 1
-                time.sleep(5)
-        
-        if not sucesso_processamento and not ok:
-            mot = f"FALHA APÓS {max_retries} TENTATIVAS - {mot}"
+        ok, mot, arq, ano = tentar_pescador(nome, dados_por_nome.get(nome, df_vazio), cpf, senha)
+        final, mot = avaliar_tentativa(clie, fila, cpf, nome, ok, mot)
+        if not final: return
         
         # Converte para path absoluto para evitar erros de CWD no Node.js
         abs_pdf_path = os.path.abspath(arq) if arq and os.path.exists(arq) else ""
@@ -1503,6 +2285,13 @@ def _main_v2_logic():
             "timestamp": datetime.now().isoformat()
         })
 
+        # Canal de resultados (fd do processo pai, se houver) e estatísticas da API de controle
+        canal_resultados.emitir("result", data={
+            "cpf": cpf, "nome": nome, "success": bool(ok), "message": mot,
+            "pdf": abs_pdf_path, "ano_base": ano, "instancia": ID_INSTANCIA,
+            "timestamp": datetime.now().isoformat()
+        })
+
         # Modo Slave: Também envia IPC como redundância para o Master registrar nos logs dele
         if ID_INSTANCIA > 1:
             ipc_utils.escrever_resultado_ipc({
@@ -1511,17 +2300,20 @@ def _main_v2_logic():
             })
 
         # 2. SALVA LOG LOCAL (JSON) - Backup de segurança
-        progresso_local[cpf] = {
-            "NOME": nome,
-            "STATUS": str(mot).upper(),
-            "MOTIVO": str(mot),
-            "DATA": datetime.now().isoformat()
-        }
-        
-        try:
-            with open(results_file, "w", encoding="utf-8") as f:
-                json.dump(progresso_local, f, indent=4)
-        except: pass
+        with LOCK_PLANILHAS:
+            progresso_local[cpf] = {
+                "NOME": nome,
+                "STATUS": str(mot).upper(),
+                "MOTIVO": str(mot),
+                "DATA": datetime.now().isoformat()
+            }
+            
+            try:
+                with open(results_file, "w", encoding="utf-8") as f:
+                    json.dump(progresso_local, f, indent=4)
+            except: pass
+
+    executar_sessoes(fila, atender_excel)
 
     # --- FINALIZAÇÃO E SINCRONIA ---
     if ID_INSTANCIA > 1:
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+
+# ==============================================================================
+# SESSÕES GOV.BR SALVAS (REUSO EM RETRY/RETOMADA)
+# ==============================================================================
+# Guarda cookies (todos os domínios, via CDP) e o localStorage do portal de um
+# cliente logado, criptografados com Fernet, por poucos minutos. Um retry do
+# mesmo cliente restaura a sessão e, se a sondagem confirmar que ainda está
+# autenticada, pula o login humano. Nada sai da máquina local.
+#
+# Arquivos: temp_results/sessoes/<cpf>.bin. A chave nunca fica em disco ao lado
+# deles: vem da variável de ambiente REAP_CHAVE_SESSOES ou do cofre de credenciais
+# do sistema via keyring (Gerenciador de Credenciais/DPAPI no Windows, Keychain,
+# Secret Service), gerada na primeira vez. Sem nenhum dos dois o reuso fica desligado.
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    DISPONIVEL = True
+except ImportError:
+    DISPONIVEL = False
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+SESSOES_DIR = os.path.join("temp_results", "sessoes")
+VALIDADE_MINUTOS = 20 # O gov.br derruba a sessão ociosa rápido; não adianta guardar mais
+_CAMPOS_COOKIE = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+_SERVICO_COFRE = "ADV-2026 REAP"
+_CONTA_COFRE = "chave_sessoes_gov"
+
+_fernet = None
+_verificado = False
+
+def _chave_do_cofre():
+    """Chave guardada no cofre do sistema (criada na primeira vez), ou None sem keyring/backend."""
+    if keyring is None: return None
+    try:
+        chave = keyring.get_password(_SERVICO_COFRE, _CONTA_COFRE)
+        if not chave:
+            keyring.set_password(_SERVICO_COFRE, _CONTA_COFRE, Fernet.generate_key().decode("ascii"))
+            chave = keyring.get_password(_SERVICO_COFRE, _CONTA_COFRE) # Outra instância pode ter gravado junto
+        return chave
+    except Exception as e:
+        print(f"[WARN] Cofre de credenciais indisponível para a chave das sessões: {e}")
+        return None
+
+def ativo():
+    """
+    True se dá para salvar/restaurar sessões (cryptography + chave). Na primeira
+    chamada resolve a chave e apaga a chave em texto puro de versões antigas.
+    """
+    global _fernet, _verificado
+    if not _verificado:
+        _verificado = True
+        antiga = os.path.join(SESSOES_DIR, ".chave")
+        if os.path.exists(antiga):
+            try: os.remove(antiga) # Sessões cifradas com ela viram ilegíveis e são descartadas ao carregar
+            except OSError: pass
+        if DISPONIVEL:
+            chave = os.environ.get("REAP_CHAVE_SESSOES") or _chave_do_cofre()
+            try:
+                _fernet = Fernet(chave) if chave else None
+            except (ValueError, TypeError) as e:
+                print(f"[WARN] REAP_CHAVE_SESSOES inválida ({e}); reuso de sessão desligado.")
+            if _fernet is None and not chave:
+                print("[WARN] Reuso de sessão gov.br desligado: defina REAP_CHAVE_SESSOES "
+                      "(Fernet.generate_key()) ou instale o keyring.")
+    return _fernet is not None
+
+def _cifra():
+    return _fernet
+
+def _caminho(cpf):
+    cpf_limpo = "".join(ch for ch in str(cpf) if ch.isdigit()) or "sem_cpf"
+    return os.path.join(SESSOES_DIR, f"{cpf_limpo}.bin")
+
+def salvar(driver, cpf):
+    """Captura cookies + localStorage da sessão logada. Retorna True se salvou."""
+    if not ativo(): return False
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        local_storage = driver.execute_script("return Object.assign({}, window.localStorage);") or {}
+        dados = {
+            "CRIADO_EM": time.time(),
+            "ORIGEM": driver.execute_script("return window.location.origin;"),
+            "COOKIES": [{k: c[k] for k in _CAMPOS_COOKIE if k in c} for c in cookies],
+            "LOCAL_STORAGE": local_storage,
+        }
+        os.makedirs(SESSOES_DIR, exist_ok=True)
+        token = _cifra().encrypt(json.dumps(dados).encode("utf-8"))
+        tmp = _caminho(cpf) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(token)
+        os.replace(tmp, _caminho(cpf))
+        return True
+    except Exception as e:
+        print(f"[WARN] Não foi possível salvar a sessão de {cpf}: {e}")
+        return False
+
+def carregar(cpf):
+    """Dados da sessão salva, ou None se não houver, estiver vencida ou ilegível."""
+    if not ativo(): return None
+    caminho = _caminho(cpf)
+    if not os.path.exists(caminho): return None
+    try:
+        with open(caminho, "rb") as f:
+            dados = json.loads(_cifra().decrypt(f.read(), ttl=VALIDADE_MINUTOS * 60))
+    except (InvalidToken, ValueError, OSError):
+        limpar(cpf) # Vencida (ttl) ou chave trocada
+        return None
+    return dados
+
+def restaurar(driver, cpf):
+    """
+    Reinjeta cookies e localStorage no navegador (vai antes para a origem do portal,
+    já que o localStorage é por origem e o navegador pode estar na tela do gov.br).
+    Retorna True se havia sessão para restaurar; quem chama deve sondar se ela ainda vale.
+    """
+    dados = carregar(cpf)
+    if not dados: return False
+    try:
+        origem = dados.get("ORIGEM")
+        if origem and not driver.current_url.startswith(origem): driver.get(origem)
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": dados["COOKIES"]})
+        driver.execute_script(
+            "const itens = arguments[0]; for (const k in itens) window.localStorage.setItem(k, itens[k]);",
+            dados.get("LOCAL_STORAGE", {}))
+        driver.get(dados.get("ORIGEM") or driver.current_url)
+        return True
+    except Exception as e:
+        print(f"[WARN] Falha ao restaurar a sessão de {cpf}: {e}")
+        return False
+
+def limpar(cpf):
+    try:
+        os.remove(_caminho(cpf))
+    except FileNotFoundError:
+        pass
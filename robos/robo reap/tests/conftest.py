@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os módulos do robô são planos (importados pelo nome, como o robo_reap.py faz)
+PASTA_ROBO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for pasta in (PASTA_ROBO, os.path.join(PASTA_ROBO, "utils")):
+    if pasta not in sys.path: sys.path.insert(0, pasta)
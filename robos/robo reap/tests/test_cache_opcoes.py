@@ -0,0 +1,30 @@
+import json
+
+from cache_opcoes import CacheOpcoes
+
+def test_aprende_so_rotulo_exato(tmp_path):
+    cache = CacheOpcoes(str(tmp_path / "cache.json"))
+    assert not cache.aprender("municipio", "São Luís", "São Luís Gonzaga do Maranhão", "m-2")
+    assert cache.consultar("municipio", "São Luís") is None
+    assert cache.aprender("municipio", "sao luis", "São Luís ", "m-1")
+    assert cache.consultar("municipio", "SÃO LUÍS") == {"rotulo": "São Luís", "id": "m-1"}
+    assert cache.rotulo("municipio", "Sao Luis") == "São Luís"
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+def test_persiste_e_descarta_entradas_parciais_antigas(tmp_path):
+    caminho = tmp_path / "cache.json"
+    caminho.write_text(json.dumps({"municipio": {
+        "SAO LUIS": {"rotulo": "São Luís Gonzaga do Maranhão", "id": "m-2"},
+        "BACABAL": {"rotulo": "Bacabal", "id": "m-3"},
+    }}), encoding="utf-8")
+    cache = CacheOpcoes(str(caminho))
+    assert cache.consultar("municipio", "São Luís") is None
+    assert cache.consultar("municipio", "Bacabal")["id"] == "m-3"
+
+def test_opcao_nova_substitui_a_antiga(tmp_path):
+    caminho = str(tmp_path / "cache.json")
+    CacheOpcoes(caminho).aprender("especie", "Tilápia", "Tilápia", "e-1")
+    cache = CacheOpcoes(caminho)
+    assert cache.consultar("especie", "tilapia")["id"] == "e-1"
+    assert cache.aprender("especie", "tilapia", "Tilápia", "e-9")
+    assert CacheOpcoes(caminho).consultar("especie", "Tilápia")["id"] == "e-9"
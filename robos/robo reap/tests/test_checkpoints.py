@@ -0,0 +1,38 @@
+import json
+import time
+
+import pytest
+
+import checkpoints
+
+@pytest.fixture(autouse=True)
+def pasta_temporaria(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_DIR", str(tmp_path))
+
+def test_marcar_e_carregar():
+    checkpoints.marcar("123.456.789-01", "TELA1")
+    checkpoints.marcar("12345678901", "PDF", ARQUIVO_PDF="a.pdf")
+    dados = checkpoints.carregar("12345678901")
+    assert dados["TELA1"] and dados["PDF"] and dados["ARQUIVO_PDF"] == "a.pdf"
+
+def test_marcar_mes_sem_repetir():
+    checkpoints.marcar_mes("1", "Abril")
+    checkpoints.marcar_mes("1", "Abril")
+    checkpoints.marcar_mes("1", "Maio")
+    assert checkpoints.carregar("1")["MESES"] == ["Abril", "Maio"]
+
+def test_checkpoint_vencido_ou_de_outro_ano_e_ignorado():
+    dados = checkpoints.marcar("1", "TELA1")
+    caminho = checkpoints._caminho("1")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dict(dados, ATUALIZADO_EM=time.time() - (checkpoints.VALIDADE_HORAS + 1) * 3600), f)
+    assert checkpoints.carregar("1") == {}
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dict(dados, ANO=dados["ANO"] - 1), f)
+    assert checkpoints.carregar("1") == {}
+
+def test_limpar():
+    checkpoints.marcar("1", "TELA1")
+    checkpoints.limpar("1")
+    checkpoints.limpar("1")
+    assert checkpoints.carregar("1") == {}
@@ -0,0 +1,68 @@
+import pytest
+
+import coordenador
+from coordenador import Coordenador
+
+@pytest.fixture
+def coord(tmp_path, monkeypatch):
+    monkeypatch.setattr(coordenador, "PASTA_PDFS", str(tmp_path / "pdfs"))
+    return Coordenador(caminho=str(tmp_path / "estado.json"))
+
+def test_adicionar_ignora_cpf_repetido(coord):
+    assert coord.adicionar_varios([{"cpf": "1"}, {"cpf": "1"}, {"cpf": "2"}]) == 2
+    emprestimo = coord.emprestar("w1")
+    assert coord.adicionar({"cpf": "111"}) == 1
+    assert coord.adicionar({"cpf": emprestimo["item"]["cpf"]}) == 0
+
+def test_fim_so_com_fila_fechada_e_vazia(coord):
+    coord.adicionar({"cpf": "1"})
+    lease = coord.emprestar("w1")["lease"]
+    assert "aguarde" in coord.emprestar("w2")
+    coord.fechar()
+    assert "aguarde" in coord.emprestar("w2")
+    coord.registrar_resultado(lease, {"cpf": "1", "success": True}, worker="w1")
+    assert coord.emprestar("w2") == {"fim": True}
+
+def test_emprestimo_expirado_volta_para_a_fila(coord, monkeypatch):
+    coord.adicionar({"cpf": "1"})
+    lease = coord.emprestar("w1")["lease"]
+    coord.leases[lease]["expira"] = 0
+    novo = coord.emprestar("w2")
+    assert novo["item"]["cpf"] == "1" and novo["lease"] != lease
+    assert coord.renovar("w1", [lease]) == []
+
+def test_resultado_duplicado_nao_sobrescreve_sucesso(coord):
+    coord.adicionar({"cpf": "1"})
+    lease1 = coord.emprestar("w1")["lease"]
+    coord.leases[lease1]["expira"] = 0
+    lease2 = coord.emprestar("w2")["lease"]
+    assert coord.registrar_resultado(lease2, {"cpf": "1", "success": True}, worker="w2")["duplicado"] is False
+    assert coord.registrar_resultado(lease1, {"cpf": "1", "success": False}, worker="w1")["duplicado"] is True
+    assert coord.resultados["1"]["worker"] == "w2"
+    assert coord.estatisticas()["duplicados"] == 1
+
+def test_cliente_que_falhou_pode_voltar_a_fila(coord):
+    coord.adicionar({"cpf": "1"})
+    lease = coord.emprestar("w1")["lease"]
+    coord.registrar_resultado(lease, {"cpf": "1", "success": False}, worker="w1")
+    assert coord.adicionar({"cpf": "1"}) == 1
+    assert "1" not in coord.resultados
+    novo = coord.emprestar("w2")["lease"]
+    assert coord.registrar_resultado(novo, {"cpf": "1", "success": True}, worker="w2")["duplicado"] is False
+    assert coord.resultados["1"]["success"]
+    assert coord.adicionar({"cpf": "1"}) == 0
+
+def test_devolver_aplica_backoff(coord):
+    coord.adicionar({"cpf": "1"})
+    lease = coord.emprestar("w1")["lease"]
+    assert coord.devolver(lease, atraso=60, tentativa=2)
+    resp = coord.emprestar("w1")
+    assert "aguarde" in resp and coord.pendentes[0]["_tentativa"] == 2
+
+def test_estado_restaurado_devolve_emprestimos(tmp_path):
+    caminho = str(tmp_path / "estado.json")
+    coord = Coordenador(caminho=caminho)
+    coord.adicionar_varios([{"cpf": "1"}, {"cpf": "2"}])
+    coord.emprestar("w1")
+    restaurado = Coordenador(caminho=caminho)
+    assert sorted(i["cpf"] for i in restaurado.pendentes) == ["1", "2"]
@@ -0,0 +1,57 @@
+import io
+import json
+import time
+
+import pytest
+
+from fila_tarefas import FilaTarefas, cpf_do_item, ler_ndjson
+
+def test_obter_respeita_ordem_e_fechamento():
+    fila = FilaTarefas([{"cpf": "1"}, {"cpf": "2"}])
+    fila.fechar()
+    assert fila.obter()["cpf"] == "1"
+    assert fila.obter()["cpf"] == "2"
+    assert fila.obter() is None
+
+def test_adicionar_em_fila_fechada_falha():
+    fila = FilaTarefas()
+    fila.fechar()
+    with pytest.raises(RuntimeError):
+        fila.adicionar({"cpf": "1"})
+    assert fila.recebidos == 0
+
+
+def test_reagendar_so_libera_depois_do_atraso():
+    fila = FilaTarefas([{"cpf": "1"}])
+    fila.fechar()
+    cliente = fila.obter()
+    fila.reagendar(cliente, 0.2)
+    assert fila.obter(timeout=0.05) is None
+    inicio = time.time()
+    assert fila.obter(timeout=2)["cpf"] == "1"
+    assert time.time() - inicio >= 0.1
+
+def test_cancelar_interrompe_mesmo_com_reagendados():
+    fila = FilaTarefas()
+    fila.reagendar({"cpf": "1"}, 60)
+    fila.cancelar()
+    assert fila.obter(timeout=1) is None
+
+def test_priorizar():
+    fila = FilaTarefas([{"cpf": "1"}, {"cpf_cnpj": "222.333"}])
+    assert fila.priorizar("222333")
+    assert not fila.priorizar("999")
+    assert cpf_do_item(fila.obter(timeout=0)) == "222333"
+
+def test_cpf_do_item():
+    assert cpf_do_item({"CPF": 12345678901.0}) == "12345678901"
+    assert cpf_do_item({"cpf": "123.456.789-01"}) == "12345678901"
+    assert cpf_do_item({}) == ""
+
+def test_ler_ndjson_divide_entre_instancias_e_fecha():
+    linhas = [json.dumps({"cpf": str(i)}) for i in range(4)] + ["nao é json", json.dumps({"clients": [{"cpf": "4"}]})]
+    stream = io.BytesIO("\n".join(linhas).encode("utf-8"))
+    fila = FilaTarefas()
+    ler_ndjson(stream, fila, instancia=2, total_instancias=2)
+    assert fila.fechada
+    assert [c["cpf"] for c in iter(lambda: fila.obter(timeout=0), None)] == ["1", "3"]
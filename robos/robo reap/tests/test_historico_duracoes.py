@@ -0,0 +1,41 @@
+import json
+
+import historico_duracoes as hd
+
+MESES_PESCA = ["Abril", "Maio", "Junho"]
+
+def test_caracteristicas():
+    registros = [{"MES": "Abril"}, {"MES": "abril"}, {"MES": "Maio"}, {"MES": "Janeiro"}]
+    assert hd.caracteristicas(registros, MESES_PESCA) == (3, 2)
+
+def test_sem_historico_usa_padrao():
+    modelo = hd.ModeloDuracao()
+    assert modelo.coeficientes is None
+    assert modelo.prever("1", 3, 2) == hd.PADRAO_S
+
+def test_regressao_e_media_do_cliente():
+    registros = [{"cpf": str(i), "ts": i, "ok": True, "especies": e, "meses": e, "total_s": 100.0 + 50 * e}
+                 for i, e in enumerate([1, 2, 3, 4, 5, 6, 7, 8, 2, 3])]
+    modelo = hd.ModeloDuracao(registros)
+    assert modelo.coeficientes is not None
+    assert abs(modelo.prever("novo", 10, 10) - 600.0) < 1
+    # Cliente já atendido: metade regressão, metade a média dele
+    assert abs(modelo.prever("0", 1, 1) - 150.0) < 1
+
+def test_cronometro_grava_tentativa(tmp_path):
+    caminho = tmp_path / "historico.jsonl"
+    cron = hd.Cronometro(caminho=str(caminho))
+    cron.caracteristicas["1"] = {"especies": 2, "meses": 1}
+    cron.ao_evento({"type": "progress", "cpf": "1", "step": "LOGIN", "state": "start", "ts": 0})
+    cron.ao_evento({"type": "progress", "cpf": "1", "step": "LOGIN", "state": "end", "ts": 40})
+    cron.ao_evento({"type": "result", "ts": 100, "data": {"cpf": "1", "success": True}})
+    registro = json.loads(caminho.read_text(encoding="utf-8"))
+    assert registro["total_s"] == 100 and registro["etapas"] == {"LOGIN": 40} and registro["especies"] == 2
+    modelo = hd.ModeloDuracao.carregar(str(caminho))
+    assert modelo.media == 100
+
+def test_custo_pelos_dados_so_depende_dos_registros():
+    registros = [{"MES": "Abril"}, {"MES": "Abril"}, {"MES": "Junho"}]
+    esperado = hd.CUSTO_FIXO_S + 3 * hd.CUSTO_ESPECIE_S + 2 * hd.CUSTO_MES_S
+    assert hd.custo_pelos_dados(registros, MESES_PESCA) == esperado
+    assert hd.custo_pelos_dados([], MESES_PESCA) == hd.CUSTO_FIXO_S
@@ -0,0 +1,31 @@
+from indice_nomes import IndiceNomes
+
+def _indice(*nomes):
+    return IndiceNomes(enumerate(nomes))
+
+def test_exato_ignora_acento_e_espacos():
+    indice = _indice("JOÃO  DA SILVA", "MARIA SOUZA")
+    assert indice.localizar("joao da silva") == [0]
+
+def test_nome_mais_curto_da_coluna_nao_casa():
+    indice = _indice("MARIA SILVA")
+    assert indice.localizar("MARIA SILVA SANTOS") == []
+
+def test_semelhante_com_folga():
+    indice = _indice("FRANCISCO DAS CHAGAS PEREIRA", "ANTONIO CARLOS")
+    assert indice.localizar("FRANCISCO DA CHAGAS PEREIRA") == [0]
+    assert indice.localizar("FRANCISCO DAS CHAGAS PERERA") == [] # Abaixo da semelhança mínima
+
+def test_prefixo_so_com_corte_e_unico():
+    indice = _indice("RAIMUNDO NONATO DOS SANTOS FILHO", "JOSE RIBAMAR")
+    nome = "RAIMUNDO NONATO DOS SANTOS NETO DE ALMEIDA"
+    assert indice.localizar(nome) == []
+    assert indice.localizar(nome, corte=20) == [0]
+
+def test_prefixo_ambiguo_nao_casa():
+    indice = _indice("RAIMUNDO NONATO DOS SANTOS FILHO", "RAIMUNDO NONATO DOS SANTOS NETO")
+    assert indice.localizar("RAIMUNDO NONATO DOS SANTOS JUNIOR DA COSTA", corte=20) == []
+
+def test_comecando_por():
+    indice = _indice("ANA PAULA", "ANA MARIA", "MARIANA")
+    assert sorted(indice.comecando_por("ANA ")) == ["ANA MARIA", "ANA PAULA"]
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+import limitador_portal as lp
+
+HOST = "portal.teste"
+
+@pytest.fixture(autouse=True)
+def banco_temporario(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "limitador.db")
+    monkeypatch.setenv("ADV_LIMITADOR_DB", caminho)
+    monkeypatch.setattr(lp, "CAMINHO_DB", caminho)
+    monkeypatch.setattr(lp, "_local", threading.local()) # Conexões novas, apontando para o banco do teste
+
+def test_balde_libera_rajada_e_depois_espera(monkeypatch):
+    monkeypatch.setattr(lp, "CAPACIDADE_PADRAO", 2.0)
+    monkeypatch.setattr(lp, "TAXA_PADRAO", 0.01)
+    assert lp.adquirir(HOST, timeout=0) < 0.5
+    assert lp.adquirir(HOST, timeout=0) < 0.5
+    assert lp.adquirir(HOST, timeout=0) is None
+
+def test_balde_respeita_parar(monkeypatch):
+    monkeypatch.setattr(lp, "CAPACIDADE_PADRAO", 1.0)
+    monkeypatch.setattr(lp, "TAXA_PADRAO", 0.01)
+    lp.adquirir(HOST, timeout=0)
+    assert lp.adquirir(HOST, timeout=None, parar=lambda: True) is None
+
+def test_ocupar_vaga_respeita_limite_e_timeout():
+    vagas = [lp.ocupar_vaga(HOST, timeout=0) for _ in range(lp.LIMITE_INICIAL)]
+    assert all(v is not None for v in vagas)
+    assert lp.ocupar_vaga(HOST, intervalo=0.05, timeout=0.2) is None
+    lp.liberar_vaga(vagas[0])
+    assert lp.ocupar_vaga(HOST, timeout=0) is not None
+
+def test_vaga_antiga_com_dono_vivo_continua(monkeypatch):
+    id_vaga = lp.ocupar_vaga(HOST, timeout=0)
+    with lp._transacao() as con:
+        con.execute("UPDATE vagas SET desde=? WHERE id=?", (0, id_vaga))
+    assert lp.situacao(HOST)["em_uso"] == 1
+    monkeypatch.setattr(lp, "_pid_vivo", lambda pid: None) # Pid não verificável: vale o TTL
+    assert lp.situacao(HOST)["em_uso"] == 0
+
+def test_vaga_de_processo_morto_e_recuperada(monkeypatch):
+    lp.ocupar_vaga(HOST, timeout=0)
+    monkeypatch.setattr(lp, "_pid_vivo", lambda pid: False)
+    assert lp.situacao(HOST)["em_uso"] == 0
+
+def test_vaga_libera_ao_sair_do_bloco():
+    with lp.vaga(HOST, timeout=0) as id_vaga:
+        assert id_vaga is not None
+        assert lp.situacao(HOST)["em_uso"] == 1
+    assert lp.situacao(HOST)["em_uso"] == 0
+
+def test_aimd_sobe_e_reduz():
+    for _ in range(lp.AMOSTRAS_POR_AJUSTE):
+        limite, ajuste = lp.registrar(HOST, latencia_ms=100)
+    assert (limite, ajuste) == (lp.LIMITE_INICIAL + 1, "aumentado")
+    for _ in range(lp.AMOSTRAS_POR_AJUSTE):
+        limite, ajuste = lp.registrar(HOST, latencia_ms=100, erro=True)
+    assert ajuste == "reduzido" and limite < lp.LIMITE_INICIAL + 1
@@ -0,0 +1,26 @@
+from normalizacao import para_float, texto_canonico, valores_iguais
+
+def test_texto_canonico():
+    assert texto_canonico("  São   Luís ") == "SAO LUIS"
+    assert texto_canonico(None) == ""
+
+def test_para_float():
+    assert para_float("R$ 1.234,50") == 1234.5
+    assert para_float("8,50") == 8.5
+    assert para_float(8) == 8.0
+    assert para_float(float("nan")) is None
+    assert para_float("abc") is None
+
+def test_valores_iguais_nao_aceita_substring():
+    assert valores_iguais("SAO LUIS", "São Luís")
+    assert not valores_iguais("São Luís Gonzaga do Maranhão", "São Luís")
+    assert not valores_iguais("São Luís", "São Luís Gonzaga do Maranhão")
+    assert not valores_iguais("", "")
+
+def test_valores_iguais_com_rotulo_aprendido():
+    assert valores_iguais("Tucunaré (Cichla spp.)", "Tucunare", rotulo="Tucunaré (Cichla spp.)")
+    assert not valores_iguais("Tucunaré (Cichla spp.)", "Tucunare")
+
+def test_valores_iguais_numerico():
+    assert valores_iguais("8,50", 8.5, numerico=True)
+    assert not valores_iguais("8,60", 8.5, numerico=True)
@@ -0,0 +1,49 @@
+import json
+
+import pandas as pd
+
+import planejador
+
+def _clientes():
+    return pd.DataFrame({
+        "CPF": ["111", "222", "333", "444", "555"],
+        "NOME": ["ANA", "BRUNO", "CARLA", "DIEGO", "ELISA"],
+        "STATUS": ["OK", "SENHA INCORRETA", None, None, "Só falta PDF"],
+    })
+
+def test_montar_plano_classifica_por_substring():
+    progresso = {"333": {"STATUS": "ERRO: TIMEOUT"}}
+    plano = planejador.montar_plano(_clientes(), pd.DataFrame({"NOME": ["CARLA"]}), progresso)
+    assert list(plano["CLASSE"]) == [planejador.CLASSE_CONCLUIDO, planejador.CLASSE_PENDENCIA,
+                                     planejador.CLASSE_RETRY, planejador.CLASSE_NOVO, planejador.CLASSE_CONCLUIDO]
+    assert list(plano["PROCESSAR"]) == [False, False, True, True, False]
+    assert list(plano["TEM_DADOS"]) == [False, False, True, False, False]
+
+def test_resumo_e_itens_pendentes():
+    plano = planejador.montar_plano(_clientes(), None, {})
+    resumo = planejador.resumir_plano(plano)
+    assert resumo["a_processar"] == 2 and resumo["sem_dados_pesca"] == 2
+    assert [it["CPF"] for it in planejador.itens_pendentes(plano)] == ["333", "444"]
+
+def test_precisa_gerar_usa_status_exato(tmp_path):
+    (tmp_path / "progresso_final.json").write_text(json.dumps({"333": {"STATUS": "OK"}}), encoding="utf-8")
+    (tmp_path / "antigo.json").write_text(json.dumps({"444": {"STATUS": "PENDENCIA"}}), encoding="utf-8")
+    (tmp_path / "lista.json").write_text("[1, 2]", encoding="utf-8")
+    progresso = planejador.carregar_progresso_pasta(str(tmp_path))
+    assert set(progresso) == {"333", "444"}
+
+    clientes = _clientes()
+    # "SENHA INCORRETA" não é status final para o gerador: BRUNO ainda precisa de dados
+    assert planejador.precisa_gerar(clientes, pd.DataFrame({"NOME": ["ELISA"]}), progresso)
+    assert not planejador.precisa_gerar(clientes, pd.DataFrame({"NOME": ["BRUNO"]}), progresso)
+    assert planejador.precisa_gerar(clientes, None, progresso)
+
+def test_dividir_por_carga_lpt_deterministica():
+    custos = [10, 1, 7, 3, 3, 6]
+    # 10 -> 1ª; 7, 6 -> 2ª (13); 3 -> 1ª (13); 3 -> empate, 1ª (16); 1 -> 2ª (14)
+    assert planejador.dividir_por_carga(custos, 2) == [[0, 3, 4], [1, 2, 5]]
+    assert planejador.dividir_por_carga([5, 5, 5, 5], 2) == [[0, 2], [1, 3]]
+
+def test_dividir_por_carga_mais_instancias_que_itens():
+    assert planejador.dividir_por_carga([5.0], 3) == [[0], [], []]
+    assert planejador.dividir_por_carga([], 0) == [[]]
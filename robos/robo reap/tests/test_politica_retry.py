@@ -0,0 +1,44 @@
+import politica_retry as pr
+
+def test_classificar_falha():
+    assert pr.classificar_falha("Senha incorreta") == pr.FALHA_CLIENTE
+    assert pr.classificar_falha("invalid session id") == pr.FALHA_NAVEGADOR
+    assert pr.classificar_falha("Erro 503 Service Unavailable") == pr.FALHA_PORTAL
+    assert pr.classificar_falha("Erro: Message: ") == pr.FALHA_PORTAL
+    assert pr.classificar_falha("PARADO PELO USUÁRIO") == pr.FALHA_PARADO
+    assert pr.classificar_falha(None) == pr.FALHA_DESCONHECIDA
+
+def test_codigo_http_so_com_contexto():
+    assert pr.classificar_falha("Erro: HTTP 503") == pr.FALHA_PORTAL
+    assert pr.classificar_falha("status code: 502") == pr.FALHA_PORTAL
+    assert pr.classificar_falha("504 Gateway Time-out") == pr.FALHA_PORTAL
+    assert pr.classificar_falha("Erro ao processar 12350312345") == pr.FALHA_DESCONHECIDA
+    stacktrace = "Erro: Message: no such element\nStacktrace:\n#0 0x55d503a2f\n#1 0x504 TIMEOUT"
+    assert pr.classificar_falha(stacktrace) == pr.FALHA_DESCONHECIDA
+
+def test_deve_retentar_por_categoria():
+    politica = pr.PoliticaRetry()
+    assert not politica.deve_retentar(pr.FALHA_CLIENTE, 1)
+    assert politica.deve_retentar(pr.FALHA_PORTAL, 3)
+    assert not politica.deve_retentar(pr.FALHA_PORTAL, 4)
+
+def test_atraso_exponencial_com_jitter_e_teto(monkeypatch):
+    politica = pr.PoliticaRetry(base=5.0, teto=300.0)
+    monkeypatch.setattr(pr.random, "uniform", lambda a, b: 1.0)
+    assert [politica.atraso(n) for n in (1, 2, 3, 4)] == [5.0, 10.0, 20.0, 40.0]
+    assert politica.atraso(20) == 300.0
+    monkeypatch.setattr(pr.random, "uniform", lambda a, b: a)
+    assert politica.atraso(2) == 5.0
+    monkeypatch.setattr(pr.random, "uniform", lambda a, b: b)
+    assert politica.atraso(2) == 15.0
+
+def test_disjuntor_abre_no_limiar_e_fecha_no_sucesso(tmp_path):
+    disjuntor = pr.DisjuntorPortal(pasta=str(tmp_path), limiar=2, janela=60, tempo_aberto=60)
+    assert disjuntor.liberado()
+    disjuntor.registrar_falha()
+    assert disjuntor.liberado()
+    disjuntor.registrar_falha()
+    assert not disjuntor.liberado()
+    assert disjuntor.segundos_para_liberar() > 0
+    disjuntor.registrar_sucesso()
+    assert disjuntor.liberado()
@@ -0,0 +1,48 @@
+import validacao_dados as vd
+
+def _vocabulario():
+    voc = vd.Vocabulario()
+    voc.adicionar("ESPECIE", "Tucunaré")
+    voc.adicionar("MUNICIPIO", "São Luís")
+    voc.adicionar("PETRECHO", "Rede")
+    voc.adicionar("TIPO_LOCAL", "Rio")
+    return voc
+
+def _linha(**alteracoes):
+    linha = {"MES": "abril", "DIAS": "10", "MUNICIPIO": "SAO LUIS", "TIPO_LOCAL": "Rio", "NOME_LOCAL": " Rio  Mearim ",
+             "PETRECHO": "Rede", "ESPECIE": "Tucunare", "QUANTIDADE": "50,0", "VALOR": "R$ 8,5"}
+    linha.update(alteracoes)
+    return linha
+
+def test_normalizar_mes():
+    assert vd.normalizar_mes(3) == "Março"
+    assert vd.normalizar_mes("marco") == "Março"
+    assert vd.normalizar_mes("03 - MARÇO") == "Março"
+    assert vd.normalizar_mes("13") is None
+
+def test_validar_registros_normaliza():
+    linhas, erros, avisos = vd.validar_registros([_linha()], _vocabulario())
+    assert erros == []
+    linha = linhas[0]
+    assert (linha["MES"], linha["DIAS"], linha["QUANTIDADE"], linha["VALOR"]) == ("Abril", 10, "50", "8,50")
+    assert (linha["MUNICIPIO"], linha["ESPECIE"], linha["NOME_LOCAL"]) == ("São Luís", "Tucunaré", "Rio Mearim")
+    assert avisos == []
+
+def test_correcao_por_semelhanca_gera_aviso():
+    linhas, erros, avisos = vd.validar_registros([_linha(ESPECIE="Tucunre")], _vocabulario())
+    assert erros == [] and linhas[0]["ESPECIE"] == "Tucunaré"
+    assert any("corrigido para 'Tucunaré'" in a for a in avisos)
+
+def test_validar_registros_rejeita_invalidos():
+    _, erros, _ = vd.validar_registros([_linha(DIAS="40"), _linha(MES="xyz"), _linha(VALOR="")], _vocabulario())
+    assert len(erros) == 3
+    assert vd.resumir_erros(erros, limite=1).endswith("(+2)")
+
+def test_defeso_nao_exige_campos():
+    linhas, erros, _ = vd.validar_registros([{"MES": "Janeiro"}], _vocabulario())
+    assert erros == [] and linhas[0]["MES"] == "Janeiro"
+
+def test_fora_do_vocabulario_so_avisa():
+    linhas, erros, avisos = vd.validar_registros([_linha(ESPECIE="Pirarucu")], _vocabulario())
+    assert erros == [] and linhas[0]["ESPECIE"] == "Pirarucu"
+    assert any("fora do vocabulário" in a for a in avisos)
@@ -0,0 +1,87 @@
+import os
+import json
+
+# ==============================================================================
+# BLOQUEIO DE RECURSOS (CDP Network.setBlockedURLs)
+# ==============================================================================
+# Corta o que a automação não usa (imagens, fontes, analytics, widgets de
+# terceiros) para reduzir bytes e tempo até a página ficar pronta.
+# Cada robô usa um perfil; o perfil escolhe grupos de padrões e pode acrescentar
+# ("bloquear") ou liberar ("permitir") padrões específicos.
+#
+# Override opcional: ADV_BLOQUEIO_RECURSOS=<arquivo.json> com
+#   {"pesqbrasil": {"grupos": [...], "bloquear": [...], "permitir": [...]}, ...}
+#
+# Obs: o CDP não tem exceção por domínio, então "permitir" remove o padrão da
+# lista de bloqueio (ex: liberar "*.svg" se algum ícone for necessário).
+
+GRUPOS = {
+    "imagens": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.bmp", "*.ico"],
+    "fontes": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+                  "*hotjar.com*", "*clarity.ms*", "*connect.facebook.net*"],
+    "terceiros": ["*barra.sistema.gov.br*", "*vlibras.gov.br*"],
+}
+
+PERFIS = {
+    # Login gov.br tem captcha com imagens: antes do login só cai o que não aparece na tela
+    "reap_login": {"grupos": ["analytics", "terceiros"]},
+    "reap": {"grupos": ["imagens", "fontes", "analytics", "terceiros"]},
+    "pesqbrasil": {"grupos": ["imagens", "fontes", "analytics", "terceiros"]},
+}
+
+def _config_externa():
+    caminho = os.environ.get("ADV_BLOQUEIO_RECURSOS")
+    if not caminho or not os.path.exists(caminho): return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[WARN] Configuração de bloqueio inválida ({caminho}): {e}")
+        return {}
+
+def montar_padroes(perfil):
+    """Lista final de padrões de URL bloqueados para o perfil."""
+    cfg = dict(PERFIS.get(perfil, {}))
+    cfg.update(_config_externa().get(perfil, {}))
+    padroes = []
+    for grupo in cfg.get("grupos", []):
+        padroes.extend(GRUPOS.get(grupo, []))
+    padroes.extend(cfg.get("bloquear", []))
+    permitidos = set(cfg.get("permitir", []))
+    return [p for p in dict.fromkeys(padroes) if p not in permitidos]
+
+def aplicar(driver, perfil):
+    """Ativa o bloqueio do perfil no navegador. Retorna os padrões aplicados ([] se falhar)."""
+    padroes = montar_padroes(perfil)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+        # Mais espaço no buffer de Resource Timing: o portal é SPA e acumula recursos na mesma página
+        driver.execute_script("performance.setResourceTimingBufferSize(5000);")
+        return padroes
+    except Exception as e:
+        print(f"[WARN] Não foi possível aplicar o bloqueio de recursos ({perfil}): {e}")
+        return []
+
+def medir_pagina(driver):
+    """
+    Métricas da página atual via Performance API: bytes transferidos (documento +
+    recursos), quantidade de recursos e tempo até a página ficar pronta (ms).
+    Recursos de outra origem sem Timing-Allow-Origin contam 0 bytes (limite da API).
+    """
+    try:
+        return driver.execute_script("""
+            const nav = performance.getEntriesByType('navigation')[0] || {};
+            const recursos = performance.getEntriesByType('resource');
+            let bytes = nav.transferSize || 0;
+            for (const r of recursos) bytes += r.transferSize || 0;
+            return {
+                bytes: bytes,
+                recursos: recursos.length,
+                pronto_ms: Math.round(nav.domContentLoadedEventEnd || 0),
+                carga_ms: Math.round(nav.loadEventEnd || 0)
+            };
+        """)
+    except Exception:
+        return {}
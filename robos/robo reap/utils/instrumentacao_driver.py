@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# ==============================================================================
+# INSTRUMENTAÇÃO DO WEBDRIVER (OPT-IN)
+# ==============================================================================
+# Conta cada comando WebDriver (ida e volta HTTP ao chromedriver, inclusive os de
+# WebElement e CDP) com a função nossa que o originou, a duração e o tamanho do
+# payload. No fim de cada cliente sai um resumo por função e um arquivo .folded
+# (formato do flamegraph.pl / speedscope: "pilha;de;funções peso").
+#
+# Liga com ADV_INSTRUMENTAR=1 (ou --instrumentar nos robôs). Intercepta
+# driver.execute na instância, então funciona com o uc.Chrome sem trocar o tipo
+# do objeto (isinstance/atributos continuam iguais).
+
+PASTA_SAIDA = os.path.join("erros_robo", "instrumentacao")
+
+# Frames destes pacotes não são "quem chamou": sobe até o primeiro código nosso
+_IGNORAR = (os.sep + "selenium" + os.sep, os.sep + "undetected_chromedriver" + os.sep, __file__)
+_PROFUNDIDADE_PILHA = 8
+
+# Baldes do histograma de latência (ms): <1, <2, <4, ... , >=2048
+_BALDES_MS = [2 ** i for i in range(12)]
+
+def ativado():
+    return os.environ.get("ADV_INSTRUMENTAR", "").strip().lower() in ("1", "true", "sim")
+
+def _balde(ms):
+    for i, limite in enumerate(_BALDES_MS):
+        if ms < limite: return i
+    return len(_BALDES_MS)
+
+def _percentil(histograma, fracao):
+    """Limite superior (ms) do balde que contém o percentil."""
+    total = sum(histograma)
+    if not total: return 0
+    alvo, acumulado = total * fracao, 0
+    for i, n in enumerate(histograma):
+        acumulado += n
+        if acumulado >= alvo:
+            return _BALDES_MS[i] if i < len(_BALDES_MS) else _BALDES_MS[-1] * 2
+    return _BALDES_MS[-1] * 2
+
+def _tamanho(obj):
+    if obj is None: return 0
+    if isinstance(obj, str): return len(obj)
+    try: return len(json.dumps(obj, default=str))
+    except Exception: return 0
+
+def _pilha():
+    """Funções nossas na pilha, da mais externa para a que chamou o comando."""
+    funcoes = []
+    frame = sys._getframe(2)
+    while frame is not None and len(funcoes) < _PROFUNDIDADE_PILHA:
+        arquivo = frame.f_code.co_filename
+        if not any(trecho in arquivo for trecho in _IGNORAR) and "threading.py" not in arquivo:
+            funcoes.append(frame.f_code.co_name)
+        frame = frame.f_back
+    return list(reversed(funcoes)) or ["?"]
+
+class Instrumentacao:
+    def __init__(self, nome=""):
+        self.nome = nome
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.inicio = time.time()
+            self.por_funcao = {} # função -> {"n", "ms", "bytes", "hist", "comandos": {cmd: n}}
+            self.pilhas = {} # "a;b;c" -> ms
+            self.total_n = 0
+            self.total_ms = 0.0
+
+    def registrar(self, comando, ms, tamanho, pilha):
+        funcao = pilha[-1]
+        with self._lock:
+            est = self.por_funcao.setdefault(funcao, {"n": 0, "ms": 0.0, "bytes": 0, "hist": [0] * (len(_BALDES_MS) + 1), "comandos": {}})
+            est["n"] += 1
+            est["ms"] += ms
+            est["bytes"] += tamanho
+            est["hist"][_balde(ms)] += 1
+            est["comandos"][comando] = est["comandos"].get(comando, 0) + 1
+            chave = ";".join(pilha + [comando])
+            self.pilhas[chave] = self.pilhas.get(chave, 0.0) + ms
+            self.total_n += 1
+            self.total_ms += ms
+
+    def resumo(self):
+        with self._lock:
+            funcoes = []
+            for funcao, est in sorted(self.por_funcao.items(), key=lambda kv: -kv[1]["ms"]):
+                funcoes.append({
+                    "funcao": funcao, "comandos": est["n"], "ms": round(est["ms"], 1), "bytes": est["bytes"],
+                    "p50_ms": _percentil(est["hist"], 0.5), "p95_ms": _percentil(est["hist"], 0.95),
+                    "por_comando": dict(sorted(est["comandos"].items(), key=lambda kv: -kv[1])),
+                })
+            return {"nome": self.nome, "duracao_s": round(time.time() - self.inicio, 1),
+                    "comandos": self.total_n, "ms": round(self.total_ms, 1), "funcoes": funcoes}
+
+    def fechar_cliente(self, rotulo, prefixo="", top=12):
+        """Imprime o resumo por função, grava .json + .folded e zera os contadores."""
+        res = self.resumo()
+        print(f"{prefixo}[WEBDRIVER] {rotulo}: {res['comandos']} comandos, {res['ms'] / 1000:.1f}s em WebDriver "
+              f"de {res['duracao_s']:.0f}s.")
+        for f in res["funcoes"][:top]:
+            print(f"{prefixo}[WEBDRIVER]   {f['funcao'][:38]:<38} {f['comandos']:>6} cmd {f['ms'] / 1000:>7.2f}s "
+                  f"p50<{f['p50_ms']}ms p95<{f['p95_ms']}ms {f['bytes'] / 1024:>7.0f} KB")
+        try:
+            os.makedirs(PASTA_SAIDA, exist_ok=True)
+            base = os.path.join(PASTA_SAIDA, f"{rotulo}_{int(time.time())}")
+            with open(base + ".json", "w", encoding="utf-8") as arq:
+                json.dump(res, arq, indent=2, ensure_ascii=False)
+            with self._lock:
+                linhas = [f"{pilha} {max(1, int(ms))}" for pilha, ms in self.pilhas.items()]
+            with open(base + ".folded", "w", encoding="utf-8") as arq:
+                arq.write("\n".join(linhas) + "\n")
+        except Exception as e:
+            print(f"{prefixo}[WARN] Falha ao gravar a instrumentação: {e}")
+        self.reiniciar()
+        return res
+
+def instrumentar(driver, nome="", forcar=False):
+    """
+    Liga a instrumentação no driver (idempotente). Sem ADV_INSTRUMENTAR (e sem forcar)
+    não faz nada e retorna None. Retorna o objeto Instrumentacao (também em driver.instrumentacao).
+    """
+    if getattr(driver, "instrumentacao", None) is not None: return driver.instrumentacao
+    if not (forcar or ativado()): return None
+    inst = Instrumentacao(nome)
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        inicio = time.perf_counter()
+        resposta = None
+        try:
+            resposta = original(driver_command, params)
+            return resposta
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            valor = resposta.get("value") if isinstance(resposta, dict) else None
+            inst.registrar(driver_command, ms, _tamanho(params) + _tamanho(valor), _pilha())
+
+    driver.execute = execute
+    driver.instrumentacao = inst
+    return inst
+
+def fechar_cliente(driver, rotulo, prefixo=""):
+    """Resumo do cliente se o driver estiver instrumentado (no-op caso contrário)."""
+    inst = getattr(driver, "instrumentacao", None)
+    if inst is not None: return inst.fechar_cliente(rotulo, prefixo)
+    return None
@@ -0,0 +1,199 @@
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ==============================================================================
+# LIMITADOR DE ACESSO AOS PORTAIS (ENTRE PROCESSOS)
+# ==============================================================================
+# Várias instâncias do REAP e lotes da consulta pesqbrasil batem no mesmo portal.
+# Este módulo coordena todos os processos da máquina através de um SQLite:
+#
+#   - Balde de fichas por host: cada navegação consome uma ficha; o balde
+#     recarrega `taxa` fichas/s até `capacidade` (rajada).
+#   - Vagas de concorrência por host: quantos clientes/consultas ao mesmo tempo.
+#     O limite é ajustado no estilo AIMD: sobe +1 enquanto a latência até a página
+#     ficar pronta e a taxa de erros estão saudáveis, cai pela metade quando pioram.
+#     Vagas de processos que morreram são recuperadas pelo pid; só quando o pid não
+#     pode ser verificado (Windows sem psutil) vale o tempo máximo VAGA_TTL_S.
+#
+# Banco: ADV_LIMITADOR_DB ou <temp>/adv_limitador_portal.db (comum a todos os robôs).
+# Parâmetros por host: ADV_LIMITADOR_TAXA, ADV_LIMITADOR_CAPACIDADE,
+# ADV_LIMITADOR_MIN, ADV_LIMITADOR_MAX (valem para hosts ainda não criados no banco).
+
+HOST_PESQBRASIL = "pesqbrasil-pescadorprofissional.mpa.gov.br"
+
+CAMINHO_DB = os.environ.get("ADV_LIMITADOR_DB") or os.path.join(tempfile.gettempdir(), "adv_limitador_portal.db")
+
+TAXA_PADRAO = float(os.environ.get("ADV_LIMITADOR_TAXA", 1.0)) # fichas/s
+CAPACIDADE_PADRAO = float(os.environ.get("ADV_LIMITADOR_CAPACIDADE", 3))
+LIMITE_MIN = int(os.environ.get("ADV_LIMITADOR_MIN", 1))
+LIMITE_MAX = int(os.environ.get("ADV_LIMITADOR_MAX", 8))
+LIMITE_INICIAL = 2
+
+# AIMD: avalia a cada AMOSTRAS_POR_AJUSTE resultados
+AMOSTRAS_POR_AJUSTE = 5
+ALFA_EWMA = 0.3
+FATOR_LATENCIA = 1.8 # Latência acima de 1.8x a melhor já vista = portal sofrendo
+LIMIAR_ERROS = 0.2
+VAGA_TTL_S = 30 * 60 # Sem como verificar o pid do dono, vaga mais velha que isso é descartada
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS baldes (
+    host TEXT PRIMARY KEY, fichas REAL, atualizado REAL, taxa REAL, capacidade REAL);
+CREATE TABLE IF NOT EXISTS controle (
+    host TEXT PRIMARY KEY, limite REAL, latencia_ewma REAL, latencia_base REAL,
+    erros_ewma REAL, amostras INTEGER, ajustado_em REAL);
+CREATE TABLE IF NOT EXISTS vagas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, host TEXT, pid INTEGER, desde REAL);
+"""
+
+_local = threading.local()
+
+def _conexao():
+    """Uma conexão por thread (sqlite3 não compartilha conexões entre threads)."""
+    con = getattr(_local, "con", None)
+    if con is None:
+        con = sqlite3.connect(CAMINHO_DB, timeout=30, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(_ESQUEMA)
+        _local.con = con
+    return con
+
+@contextmanager
+def _transacao():
+    con = _conexao()
+    con.execute("BEGIN IMMEDIATE") # Trava de escrita: leitura + atualização atômicas entre processos
+    try:
+        yield con
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+def _pid_vivo(pid):
+    """True/False, ou None se não dá para saber (Windows sem psutil)."""
+    if psutil is not None: return psutil.pid_exists(pid)
+    if os.name == "nt": return None
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+# --- Balde de fichas ---
+def adquirir(host=HOST_PESQBRASIL, timeout=300, parar=None):
+    """
+    Espera uma ficha do host (bloqueia). Retorna os segundos esperados, ou None se
+    estourou o timeout ou `parar()` pediu para sair.
+    """
+    inicio = time.time()
+    while True:
+        with _transacao() as con:
+            agora = time.time()
+            linha = con.execute("SELECT fichas, atualizado, taxa, capacidade FROM baldes WHERE host=?", (host,)).fetchone()
+            if linha is None:
+                linha = (CAPACIDADE_PADRAO, agora, TAXA_PADRAO, CAPACIDADE_PADRAO)
+                con.execute("INSERT INTO baldes VALUES (?, ?, ?, ?, ?)", (host,) + linha)
+            fichas, atualizado, taxa, capacidade = linha
+            fichas = min(capacidade, fichas + (agora - atualizado) * taxa)
+            if fichas >= 1:
+                con.execute("UPDATE baldes SET fichas=?, atualizado=? WHERE host=?", (fichas - 1, agora, host))
+                return time.time() - inicio
+            con.execute("UPDATE baldes SET fichas=?, atualizado=? WHERE host=?", (fichas, agora, host))
+            espera = (1 - fichas) / taxa if taxa > 0 else 1.0
+        if (timeout is not None and time.time() - inicio > timeout) or (parar and parar()):
+            return None
+        time.sleep(min(max(espera, 0.05), 1.0))
+
+# --- Vagas de concorrência (AIMD) ---
+def _estado(con, host):
+    linha = con.execute("SELECT limite, latencia_ewma, latencia_base, erros_ewma, amostras FROM controle WHERE host=?",
+                        (host,)).fetchone()
+    if linha is None:
+        linha = (float(LIMITE_INICIAL), None, None, 0.0, 0)
+        con.execute("INSERT INTO controle VALUES (?, ?, ?, ?, ?, ?, ?)", (host,) + linha + (time.time(),))
+    return linha
+
+def _vagas_em_uso(con, host):
+    agora = time.time()
+    for id_vaga, pid, desde in con.execute("SELECT id, pid, desde FROM vagas WHERE host=?", (host,)).fetchall():
+        vivo = _pid_vivo(pid) # Dono vivo mantém a vaga pelo tempo que precisar (preenchimento longo)
+        if vivo is False or (vivo is None and agora - desde > VAGA_TTL_S):
+            con.execute("DELETE FROM vagas WHERE id=?", (id_vaga,))
+    return con.execute("SELECT COUNT(*) FROM vagas WHERE host=?", (host,)).fetchone()[0]
+
+def ocupar_vaga(host=HOST_PESQBRASIL, parar=None, intervalo=2, timeout=None):
+    """
+    Espera uma vaga dentro do limite atual do host. Retorna o id da vaga, ou None
+    se estourou o timeout ou `parar()` pediu para sair.
+    """
+    inicio = time.time()
+    while True:
+        with _transacao() as con:
+            limite = _estado(con, host)[0]
+            if _vagas_em_uso(con, host) < max(LIMITE_MIN, int(limite)):
+                cur = con.execute("INSERT INTO vagas (host, pid, desde) VALUES (?, ?, ?)", (host, os.getpid(), time.time()))
+                return cur.lastrowid
+        if (timeout is not None and time.time() - inicio > timeout) or (parar and parar()):
+            return None
+        time.sleep(intervalo)
+
+def liberar_vaga(id_vaga):
+    if id_vaga is None: return
+    with _transacao() as con:
+        con.execute("DELETE FROM vagas WHERE id=?", (id_vaga,))
+
+@contextmanager
+def vaga(host=HOST_PESQBRASIL, parar=None, timeout=None):
+    """Segura uma vaga no bloco; o id é None se não conseguiu (parado ou timeout)."""
+    id_vaga = ocupar_vaga(host, parar, timeout=timeout)
+    try:
+        yield id_vaga
+    finally:
+        liberar_vaga(id_vaga)
+
+def registrar(host=HOST_PESQBRASIL, latencia_ms=None, erro=False):
+    """
+    Resultado de um acesso (latência até a página ficar pronta e se o portal falhou).
+    A cada AMOSTRAS_POR_AJUSTE amostras aplica o AIMD. Retorna (limite, ajuste ou None).
+    """
+    with _transacao() as con:
+        limite, lat, base, erros, amostras = _estado(con, host)
+        if latencia_ms:
+            lat = latencia_ms if lat is None else ALFA_EWMA * latencia_ms + (1 - ALFA_EWMA) * lat
+            base = lat if base is None else min(base, lat)
+        erros = ALFA_EWMA * (1.0 if erro else 0.0) + (1 - ALFA_EWMA) * erros
+        amostras += 1
+        ajuste = None
+        if amostras >= AMOSTRAS_POR_AJUSTE:
+            amostras = 0
+            piorou = erros > LIMIAR_ERROS or (lat is not None and base and lat > FATOR_LATENCIA * base)
+            if piorou and limite > LIMITE_MIN:
+                limite, ajuste = max(LIMITE_MIN, limite / 2), "reduzido"
+            elif not piorou and limite < LIMITE_MAX:
+                limite, ajuste = min(LIMITE_MAX, limite + 1), "aumentado"
+            if base and lat: base = base + 0.05 * (lat - base) # Base acompanha mudanças duradouras do portal
+        con.execute("UPDATE controle SET limite=?, latencia_ewma=?, latencia_base=?, erros_ewma=?, amostras=?, ajustado_em=? "
+                    "WHERE host=?", (limite, lat, base, erros, amostras, time.time(), host))
+    if ajuste:
+        print(f"[LIMITADOR] {host}: concorrência {ajuste} para {int(limite)} "
+              f"(latência {lat or 0:.0f} ms, base {base or 0:.0f} ms, erros {erros:.0%}).")
+    return int(limite), ajuste
+
+def situacao(host=HOST_PESQBRASIL):
+    """Foto do estado compartilhado (para /stats e logs)."""
+    with _transacao() as con:
+        limite, lat, base, erros, _ = _estado(con, host)
+        em_uso = _vagas_em_uso(con, host)
+        balde = con.execute("SELECT fichas, taxa FROM baldes WHERE host=?", (host,)).fetchone()
+    return {"host": host, "limite": int(limite), "em_uso": em_uso,
+            "latencia_ms": round(lat) if lat else None, "latencia_base_ms": round(base) if base else None,
+            "erros": round(erros, 3), "fichas": round(balde[0], 2) if balde else None, "taxa": balde[1] if balde else None}
@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+# ==============================================================================
+# PERFILADOR DO LADO PYTHON (OPT-IN)
+# ==============================================================================
+# Mede onde o processo gasta tempo fora do navegador (filtros do pandas, leitura
+# e escrita de Excel, regravação de JSON, regex de extração...). Envolve o laço
+# principal dos robôs e, ao sair (inclusive por erro/Ctrl+C), grava em
+# erros_robo/perfis/<rotulo>_<data_hora>.*:
+#   - .txt  : top-N funções (próprio e acumulado)
+#   - .folded (amostragem) / .html (pyinstrument) / .prof (cprofile)
+#
+# Liga com ADV_PROFILE=<modo> (ou --profile [modo] nos robôs):
+#   amostragem   (padrão de "1") thread que lê sys._current_frames() a cada
+#                ADV_PROFILE_INTERVALO s (0.01). Vê todas as threads (--sessoes N)
+#                e custa ~1% de CPU: dá para deixar ligado o lote inteiro.
+#   pyinstrument se instalado; amostragem também, mas só da thread que chamou.
+#   cprofile     determinístico (conta cada chamada); só a thread que chamou e
+#                com sobrecarga bem maior: para investigações curtas.
+# Os tempos são de relógio (wall): espera por I/O e sleeps aparecem como tempo
+# da função que esperou.
+
+PASTA_SAIDA = os.path.join("erros_robo", "perfis")
+MODOS = ("amostragem", "pyinstrument", "cprofile")
+INTERVALO_PADRAO = 0.01
+_PROFUNDIDADE_MAX = 96
+
+def modo_configurado():
+    """Modo pedido em ADV_PROFILE, ou None se desligado."""
+    valor = os.environ.get("ADV_PROFILE", "").strip().lower()
+    if valor in ("", "0", "false", "nao", "não"): return None
+    if valor in ("1", "true", "sim"): return "amostragem"
+    if valor not in MODOS:
+        print(f"[WARN] ADV_PROFILE='{valor}' desconhecido; usando amostragem ({', '.join(MODOS)}).")
+        return "amostragem"
+    return valor
+
+def _rotulo_frame(code):
+    # ';' separa frames no formato .folded
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+class Amostrador:
+    """Perfilador por amostragem de todas as threads do processo."""
+    def __init__(self, intervalo=INTERVALO_PADRAO):
+        self.intervalo = intervalo
+        self.pilhas = {} # tupla de rótulos (externo -> interno) -> amostras
+        self.amostras = 0
+        self._rotulos = {} # code object -> rótulo (evita formatar string a cada amostra)
+        self._parar = threading.Event()
+        self._thread = None
+        self.inicio = self.fim = None
+
+    def _rotulo(self, code):
+        rotulo = self._rotulos.get(code)
+        if rotulo is None:
+            rotulo = self._rotulos[code] = _rotulo_frame(code)
+        return rotulo
+
+    def _amostrar(self):
+        proprio = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == proprio: continue
+            pilha = []
+            while frame is not None and len(pilha) < _PROFUNDIDADE_MAX:
+                pilha.append(self._rotulo(frame.f_code))
+                frame = frame.f_back
+            chave = tuple(reversed(pilha))
+            self.pilhas[chave] = self.pilhas.get(chave, 0) + 1
+            self.amostras += 1
+
+    def _laco(self):
+        while not self._parar.wait(self.intervalo):
+            try: self._amostrar()
+            except Exception: pass # Thread terminando no meio da leitura: ignora a amostra
+
+    def iniciar(self):
+        self.inicio = time.time()
+        self._thread = threading.Thread(target=self._laco, name="perfilador", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread: self._thread.join(timeout=2)
+        self.fim = time.time()
+
+    def relatorio(self, top=40):
+        proprio, acumulado = {}, {}
+        for pilha, n in self.pilhas.items():
+            proprio[pilha[-1]] = proprio.get(pilha[-1], 0) + n
+            for rotulo in set(pilha): # Recursão conta uma vez por amostra
+                acumulado[rotulo] = acumulado.get(rotulo, 0) + n
+        total = max(1, self.amostras)
+        linhas = [f"Amostragem a cada {self.intervalo * 1000:.0f} ms por {self.fim - self.inicio:.0f}s: "
+                  f"{self.amostras} amostras (todas as threads, tempo de relógio).", ""]
+        for titulo, tabela in (("PRÓPRIO (a função estava no topo da pilha)", proprio),
+                               ("ACUMULADO (a função estava na pilha)", acumulado)):
+            linhas.append(f"--- {titulo} ---")
+            linhas.append(f"{'amostras':>9} {'%':>6} {'~s':>8}  função")
+            for rotulo, n in sorted(tabela.items(), key=lambda kv: -kv[1])[:top]:
+                linhas.append(f"{n:>9} {100 * n / total:>5.1f}% {n * self.intervalo:>8.1f}  {rotulo}")
+            linhas.append("")
+        return "\n".join(linhas)
+
+    def gravar(self, base, top=40):
+        with open(base + ".folded", "w", encoding="utf-8") as arq:
+            for pilha, n in self.pilhas.items():
+                arq.write(f"{';'.join(pilha)} {n}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as arq:
+            arq.write(self.relatorio(top))
+        return [base + ".txt", base + ".folded"]
+
+class _Pyinstrument:
+    def __init__(self, intervalo=INTERVALO_PADRAO):
+        from pyinstrument import Profiler
+        self.perfil = Profiler(interval=intervalo)
+
+    def iniciar(self): self.perfil.start()
+    def parar(self): self.perfil.stop()
+
+    def gravar(self, base, top=40):
+        with open(base + ".txt", "w", encoding="utf-8") as arq:
+            arq.write(self.perfil.output_text(unicode=True, show_all=False))
+        with open(base + ".html", "w", encoding="utf-8") as arq:
+            arq.write(self.perfil.output_html())
+        return [base + ".txt", base + ".html"]
+
+class _CProfile:
+    def __init__(self, intervalo=None):
+        import cProfile
+        self.perfil = cProfile.Profile()
+
+    def iniciar(self): self.perfil.enable()
+    def parar(self): self.perfil.disable()
+
+    def gravar(self, base, top=40):
+        import pstats
+        self.perfil.dump_stats(base + ".prof")
+        with open(base + ".txt", "w", encoding="utf-8") as arq:
+            est = pstats.Stats(self.perfil, stream=arq).strip_dirs()
+            est.sort_stats("tottime").print_stats(top)
+            est.sort_stats("cumulative").print_stats(top)
+        return [base + ".txt", base + ".prof"]
+
+def _criar(modo, intervalo):
+    if modo == "pyinstrument":
+        try: return _Pyinstrument(intervalo)
+        except ImportError:
+            print("[WARN] pyinstrument não instalado; usando o amostrador embutido.")
+    elif modo == "cprofile":
+        return _CProfile()
+    return Amostrador(intervalo)
+
+@contextmanager
+def perfilar(rotulo, prefixo="", top=40, pasta=PASTA_SAIDA):
+    """
+    Perfila o bloco se ADV_PROFILE estiver ligado (senão não faz nada).
+    Os arquivos são gravados ao sair do bloco, mesmo com exceção.
+    """
+    modo = modo_configurado()
+    if modo is None:
+        yield None
+        return
+    intervalo = float(os.environ.get("ADV_PROFILE_INTERVALO", INTERVALO_PADRAO))
+    perfil = _criar(modo, intervalo)
+    print(f"{prefixo}[PROFILE] Perfilando '{rotulo}' ({type(perfil).__name__.strip('_').lower()}).")
+    perfil.iniciar()
+    try:
+        yield perfil
+    finally:
+        perfil.parar()
+        try:
+            os.makedirs(pasta, exist_ok=True)
+            base = os.path.join(pasta, f"{rotulo}_{time.strftime('%Y%m%d_%H%M%S')}")
+            arquivos = perfil.gravar(base, top)
+            print(f"{prefixo}[PROFILE] Perfil salvo em {', '.join(arquivos)}")
+        except Exception as e:
+            print(f"{prefixo}[WARN] Falha ao gravar o perfil: {e}")
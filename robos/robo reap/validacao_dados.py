@@ -0,0 +1,187 @@
+import os
+import json
+import difflib
+from datetime import datetime
+
+import pandas as pd
+
+from normalizacao import texto_canonico, para_float
+
+# ==============================================================================
+# VALIDAÇÃO E NORMALIZAÇÃO DOS DADOS DE PESCA (ANTES DO NAVEGADOR)
+# ==============================================================================
+# Confere de uma vez os dados mensais de todos os clientes da fatia e corrige o
+# que dá para corrigir antes de gastar login/navegador com eles:
+#   - MES: "marco", "MARÇO", 3 -> "Março"
+#   - DIAS/QUANTIDADE/VALOR: "R$ 8,50", 8.5, "10" -> formato que o portal aceita
+#   - ESPECIE/MUNICIPIO/PETRECHO/TIPO_LOCAL: grafia do vocabulário conhecido
+#     (config_peixes.xlsx, config_localidades.xlsx e o cache de opções do portal),
+#     com correção por semelhança ("Tucunare" -> "Tucunaré", "Curimata" -> "Curimatã")
+#
+# Erros (mês inválido, número ilegível, dias fora de 1..31, campo obrigatório
+# vazio) rejeitam o cliente. Valor fora do vocabulário sem nenhum parecido só
+# gera aviso: os arquivos de configuração não listam todas as opções do portal.
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+MESES_DEFESO = {"Janeiro", "Fevereiro", "Março", "Dezembro"}
+
+# Coluna -> campo do cache de opções (cache_opcoes.CacheOpcoes)
+CAMPOS_VOCABULARIO = {"ESPECIE": "especie", "MUNICIPIO": "municipio", "PETRECHO": "petrecho", "TIPO_LOCAL": "tipo_local"}
+CAMPOS_OBRIGATORIOS = ["DIAS", "MUNICIPIO", "TIPO_LOCAL", "NOME_LOCAL", "PETRECHO", "ESPECIE", "QUANTIDADE", "VALOR"]
+SEMELHANCA_MINIMA = 0.85
+
+RELATORIO_ARQUIVO = os.path.join("temp_results", "validacao_rejeitados.json")
+
+_MESES_CANONICOS = {texto_canonico(m): m for m in MESES}
+
+def normalizar_mes(valor):
+    """Nome do mês como o portal mostra, ou None."""
+    num = para_float(valor)
+    if num is not None and num.is_integer() and 1 <= num <= 12:
+        return MESES[int(num) - 1]
+    chave = texto_canonico(valor)
+    if chave in _MESES_CANONICOS: return _MESES_CANONICOS[chave]
+    for canonico, mes in _MESES_CANONICOS.items(): # "03 - Março", "MARÇO/2025"
+        if canonico in chave: return mes
+    return None
+
+def formatar_numero(valor):
+    """50.0 -> '50'; 8.5 -> '8,5' (mesma saída do tratar_numero do robô)."""
+    return str(int(valor)) if float(valor).is_integer() else str(valor).replace(".", ",")
+
+def formatar_moeda(valor):
+    return f"{valor:.2f}".replace(".", ",")
+
+class Vocabulario:
+    """Grafias conhecidas por coluna, indexadas pelo texto canônico."""
+    def __init__(self):
+        self.termos = {coluna: {} for coluna in CAMPOS_VOCABULARIO}
+
+    def adicionar(self, coluna, valor):
+        if valor is None or (isinstance(valor, float) and pd.isna(valor)): return
+        texto = " ".join(str(valor).split())
+        if texto: self.termos[coluna].setdefault(texto_canonico(texto), texto)
+
+    @classmethod
+    def carregar(cls, pasta, cache_opcoes=None):
+        """Monta o vocabulário a partir das planilhas de configuração e do cache de opções."""
+        voc = cls()
+        try:
+            for especie in pd.read_excel(os.path.join(pasta, "config_peixes.xlsx"))["ESPECIE"].dropna():
+                voc.adicionar("ESPECIE", especie)
+        except Exception: pass
+        try:
+            df_loc = pd.read_excel(os.path.join(pasta, "config_localidades.xlsx"))
+            for cidade in df_loc["CIDADE"].dropna(): voc.adicionar("MUNICIPIO", cidade)
+            for tipo in df_loc["TIPO_LOCAL"].dropna(): voc.adicionar("TIPO_LOCAL", tipo)
+            for petrechos in df_loc["PETRECHOS"].dropna():
+                for p in str(petrechos).split(","): voc.adicionar("PETRECHO", p)
+        except Exception: pass
+        if cache_opcoes is not None:
+            # Valores que já acharam opção no portal são grafias válidas
+            for coluna, campo in CAMPOS_VOCABULARIO.items():
+                for opcao in cache_opcoes.opcoes(campo).values():
+                    voc.adicionar(coluna, opcao.get("rotulo"))
+        return voc
+
+    def resolver(self, coluna, valor):
+        """(grafia conhecida, exato?) ou (None, False) se não houver nada parecido."""
+        termos = self.termos.get(coluna) or {}
+        chave = texto_canonico(valor)
+        if chave in termos: return termos[chave], True
+        parecidos = difflib.get_close_matches(chave, list(termos), n=1, cutoff=SEMELHANCA_MINIMA)
+        if parecidos: return termos[parecidos[0]], False
+        return None, False
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, float) and pd.isna(valor)) or str(valor).strip() == ""
+
+def validar_registros(registros, vocabulario):
+    """
+    Valida e normaliza as linhas mensais de um cliente.
+    Retorna (linhas normalizadas, erros, avisos); com erros o cliente deve ser rejeitado.
+    """
+    normalizados, erros, avisos = [], [], []
+    for i, reg in enumerate(registros, 1):
+        linha = dict(reg)
+        mes = normalizar_mes(reg.get("MES"))
+        if mes is None:
+            erros.append(f"linha {i}: mês inválido '{reg.get('MES')}'")
+            continue
+        linha["MES"] = mes
+        ref = f"{mes} (linha {i})"
+
+        faltando = [c for c in CAMPOS_OBRIGATORIOS if _vazio(reg.get(c))]
+        if mes in MESES_DEFESO:
+            # Defeso só marca "não houve pesca": o resto da linha não vai para o portal
+            normalizados.append(linha)
+            continue
+        if faltando:
+            erros.append(f"{ref}: campo(s) vazio(s) {', '.join(faltando)}")
+            continue
+
+        dias = para_float(reg.get("DIAS"))
+        if dias is None or not dias.is_integer() or not 1 <= dias <= 31:
+            erros.append(f"{ref}: DIAS inválido '{reg.get('DIAS')}'")
+        else:
+            linha["DIAS"] = int(dias)
+
+        qtd = para_float(reg.get("QUANTIDADE"))
+        if qtd is None or qtd < 0:
+            erros.append(f"{ref}: QUANTIDADE inválida '{reg.get('QUANTIDADE')}'")
+        else:
+            linha["QUANTIDADE"] = formatar_numero(qtd)
+
+        valor = para_float(reg.get("VALOR"))
+        if valor is None or valor < 0:
+            erros.append(f"{ref}: VALOR inválido '{reg.get('VALOR')}'")
+        else:
+            linha["VALOR"] = formatar_moeda(valor)
+
+        for coluna in CAMPOS_VOCABULARIO:
+            original = " ".join(str(reg.get(coluna)).split())
+            grafia, exato = vocabulario.resolver(coluna, original)
+            if grafia is None:
+                if vocabulario.termos.get(coluna):
+                    avisos.append(f"{ref}: {coluna} '{original}' fora do vocabulário conhecido")
+                linha[coluna] = original
+            else:
+                if not exato: avisos.append(f"{ref}: {coluna} '{original}' corrigido para '{grafia}'")
+                linha[coluna] = grafia
+        linha["NOME_LOCAL"] = " ".join(str(reg.get("NOME_LOCAL")).split())
+        normalizados.append(linha)
+    return normalizados, erros, avisos
+
+def resumir_erros(erros, limite=3):
+    """Motivo curto para planilha/resultado."""
+    texto = "; ".join(erros[:limite])
+    if len(erros) > limite: texto += f" (+{len(erros) - limite})"
+    return f"DADOS INVÁLIDOS: {texto}"
+
+def salvar_relatorio(rejeitados, avisos, instancia=1, caminho=RELATORIO_ARQUIVO):
+    """
+    Grava o relatório da validação em lote: rejeitados (cpf, nome, erros) e avisos
+    (correções aplicadas e valores fora do vocabulário), por instância.
+    """
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    dados = {}
+    if os.path.exists(caminho):
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except Exception:
+            dados = {}
+    dados[str(instancia)] = {
+        "GERADO_EM": datetime.now().isoformat(),
+        "REJEITADOS": rejeitados,
+        "AVISOS": avisos,
+    }
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, caminho)
+    except Exception as e:
+        print(f"[WARN] Falha ao salvar o relatório de validação: {e}")
+    return caminho
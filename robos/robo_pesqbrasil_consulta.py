@@ -1,4 +1,5 @@
-import re, os, time, threading, json, sys, winreg, requests
+import re, os, time, threading, json, sys, queue, winreg, requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 # Forçar UTF-8 no Windows para evitar erro de 'charmap' ao imprimir caracteres especiais
 if sys.platform.startswith('win'):
     try:
@@ -14,6 +15,13 @@ from selenium.webdriver.common.keys import Keys
 from tkinter import messagebox, Tk, Button, Toplevel, Label
 import undetected_chromedriver as uc
 
+# Módulos compartilhados com o robô REAP (robo reap/utils)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "robo reap"))
+from utils import bloqueio_recursos
+from utils import limitador_portal
+from utils import instrumentacao_driver
+from utils import perfilador
+
 # ==============================================================================
 # CONFIGURAÇÃO GLOBAL
 # ==============================================================================
@@ -291,74 +299,219 @@ def extrair_dados_pescador(driver, cpf_limpo):
 
     return resultado
 
-def consultar_unico_cpf(cpf_limpo, headless=True):
-    """
-    Versão simplificada para ser chamada via CLI/Bot, retornando JSON.
-    """
+URL_CONSULTA = "https://pesqbrasil-pescadorprofissional.mpa.gov.br/consulta"
+LOCK_NAVEGADOR = threading.Lock() # uc.Chrome corrige o chromedriver em disco: uma criação por vez
+
+# Áreas de resultado/erro (mesmos alvos da espera antiga). Antes do clique as que já
+# estão na tela são marcadas com data-adv-antigo (guardando o texto); a consulta termina
+# quando aparece um elemento sem a marca, ou um marcado que o portal reescreveu.
+# Texto igual ao do CPF anterior não engana a espera: o que conta é o elemento novo.
+JS_AREAS_RESULTADO = """
+const areas = (tipo) => tipo === 'E'
+    ? Array.from(document.querySelectorAll("div[class*='br-message'][class*='danger']"))
+    : Array.from(document.querySelectorAll("td.municipio, .br-card, .result-card"))
+        .concat(Array.from(document.querySelectorAll("h2")).filter(e => e.textContent.includes('Resultado da consulta')));
+"""
+
+JS_MARCAR_RESULTADO_ANTIGO = JS_AREAS_RESULTADO + """
+areas('E').concat(areas('R')).forEach(e => e.setAttribute('data-adv-antigo', e.innerText));
+"""
+
+# {"tipo": "erro", "texto": ...} / {"tipo": "resultado"} / null enquanto não houver elemento novo
+JS_RESULTADO_NOVO = JS_AREAS_RESULTADO + """
+const novo = e => e.innerText.trim() !== '' &&
+    (!e.hasAttribute('data-adv-antigo') || e.getAttribute('data-adv-antigo') !== e.innerText);
+const erro = areas('E').find(novo);
+if (erro) return {tipo: 'erro', texto: erro.innerText.trim()};
+return areas('R').some(novo) ? {tipo: 'resultado'} : null;
+"""
+
+def abrir_navegador(headless=True, bloquear_recursos=True, nome="pesqbrasil"):
+    """Chrome pronto para consultar (instrumentado e com o bloqueio de recursos, se pedido)."""
     options = uc.ChromeOptions()
     if headless:
         options.add_argument("--headless=new") 
     options.add_argument("--start-maximized")
     options.add_argument("--disable-blink-features=AutomationControlled")
-    
-    driver = None
-    try:
-        versao_chrome = obter_versao_chrome()
+
+    versao_chrome = obter_versao_chrome()
+    with LOCK_NAVEGADOR: # Vários navegadores do daemon (re)abrindo ao mesmo tempo
         if versao_chrome:
             driver = uc.Chrome(options=options, version_main=versao_chrome)
         else:
             driver = uc.Chrome(options=options)
-        
-        driver.get("https://pesqbrasil-pescadorprofissional.mpa.gov.br/consulta")
-        
-        # Preenche CPF
+    instrumentacao_driver.instrumentar(driver, nome=nome)
+    if bloquear_recursos:
+        bloqueio_recursos.aplicar(driver, "pesqbrasil")
+    return driver
+
+def consultar_no_navegador(driver, cpf_limpo, limitar=True, bloquear_recursos=True, carregar=True):
+    """
+    Uma consulta num navegador já aberto. Com carregar=False a SPA já está carregada
+    (SessaoConsulta): o CPF do formulário é trocado sem recarregar a página e o fim da
+    consulta é detectado pelo elemento de resultado/erro novo (os antigos são marcados antes do clique).
+    Retorna (resultado, erro_portal); erro_portal indica falha do portal/navegador,
+    não "CPF sem RGP".
+    """
+    metricas = {}
+    erro_portal = False
+    if limitar and limitador_portal.adquirir() is None:
+        return {"success": False, "error": "Limitador do portal: sem ficha para navegar a tempo"}, erro_portal
+    try:
+        inicio = time.time()
+        campo_cpf = None
+        if not carregar:
+            try:
+                campo_cpf = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.NAME, "cpf")))
+            except Exception:
+                print("🔄 Formulário não está disponível na aba; recarregando a consulta.")
+                carregar = True
+        if carregar:
+            driver.get(URL_CONSULTA)
+            metricas = bloqueio_recursos.medir_pagina(driver)
+            campo_cpf = WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.NAME, "cpf")))
+        metricas["bloqueio"] = bloquear_recursos
+        metricas["recarregou"] = carregar
+
+        # Preenche CPF (limpa o da consulta anterior, se a aba foi reaproveitada)
         print(f"⌨️ Preenchendo CPF: {cpf_limpo}")
-        campo_cpf = WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.NAME, "cpf")))
         campo_cpf.click()
+        if not carregar:
+            campo_cpf.send_keys(Keys.CONTROL, "a")
+            campo_cpf.send_keys(Keys.DELETE)
+            if campo_cpf.get_attribute("value"):
+                driver.execute_script(
+                    "arguments[0].value = ''; arguments[0].dispatchEvent(new Event('input', {bubbles: true}));", campo_cpf)
         campo_cpf.send_keys(cpf_limpo)
         time.sleep(0.5)
         
+        # Marca o resultado/erro da consulta anterior (aba reaproveitada) para não confundir com o novo
+        driver.execute_script(JS_MARCAR_RESULTADO_ANTIGO)
+
         # Clica em Consultar
         print("🖱️ Clicando em Consultar...")
         btn_consultar = driver.find_element(By.XPATH, "//button[contains(., 'Consultar')]")
         driver.execute_script("arguments[0].click();", btn_consultar)
         
         # Espera INTELIGENTE pelo resultado ou erro
-        # Monitora o aparecimento de um card de resultado OU mensagem de erro
-        # Espera INTELIGENTE pelo resultado ou erro
-        # Monitora: Mensagem de erro, Título de resultado, OU a tabela com dados (td.municipio)
+        # Monitora: Mensagem de erro, Título de resultado, card OU a tabela com dados (td.municipio).
+        # Com a aba reaproveitada o resultado anterior ainda está na tela: vale só elemento NOVO.
         try:
-            WebDriverWait(driver, 60).until(
-                lambda d: d.find_elements(By.XPATH, "//div[contains(@class, 'br-message') and contains(@class, 'danger')]") or 
-                          d.find_elements(By.XPATH, "//h2[contains(text(), 'Resultado da consulta')]") or
-                          d.find_elements(By.CSS_SELECTOR, "td.municipio") or
-                          d.find_elements(By.CLASS_NAME, "br-card")
+            novo = WebDriverWait(driver, 60, poll_frequency=0.25).until(
+                lambda d: d.execute_script(JS_RESULTADO_NOVO)
             )
         except:
+            erro_portal = True
             timestamp = int(time.time())
             driver.save_screenshot(f"erro_timeout_{timestamp}.png")
-            return {"success": False, "error": f"Tempo limite excedido (60s). Screenshot salvo em erro_timeout_{timestamp}.png"}
+            return {"success": False, "error": f"Tempo limite excedido (60s). Screenshot salvo em erro_timeout_{timestamp}.png", "metricas": metricas}, erro_portal
         
-        # Checa erro primeiro
-        erros = driver.find_elements(By.XPATH, "//div[contains(@class, 'br-message') and contains(@class, 'danger')]")
-        if erros:
-            print(f"❌ Erro na tela: {erros[0].text}")
-            return {"success": False, "error": erros[0].text.strip()}
+        # Checa erro primeiro (só o desta consulta; um erro antigo marcado não conta)
+        if novo.get("tipo") == "erro":
+            print(f"❌ Erro na tela: {novo['texto']}")
+            return {"success": False, "error": novo["texto"], "metricas": metricas}, erro_portal
         
         # Se não tem erro, extrai dados
         dados = extrair_dados_pescador(driver, cpf_limpo)
-        return {"success": True, "data": dados}
+        metricas["total_bytes"] = bloqueio_recursos.medir_pagina(driver).get("bytes", 0)
+        metricas["total_ms"] = int((time.time() - inicio) * 1000)
+        return {"success": True, "data": dados, "metricas": metricas}, erro_portal
+
+    except Exception as e:
+        erro_portal = True
+        return {"success": False, "error": str(e)}, erro_portal
+    finally:
+        if limitar:
+            limitador_portal.registrar(latencia_ms=metricas.get("pronto_ms"), erro=erro_portal)
+
+def consultar_unico_cpf(cpf_limpo, headless=True, bloquear_recursos=True, limitar=True):
+    """
+    Versão simplificada para ser chamada via CLI/Bot, retornando JSON.
+    Com bloquear_recursos, imagens/fontes/analytics da SPA de consulta não são baixados;
+    o resultado traz "metricas" (bytes e tempo até a página ficar pronta) para comparação.
+    Com limitar, respeita o limitador do portal compartilhado com o REAP (vaga + ficha)
+    e devolve a latência/erro para o ajuste de concorrência.
+    """
+    driver = None
+    id_vaga = limitador_portal.ocupar_vaga(timeout=300) if limitar else None
+    if limitar and id_vaga is None:
+        return {"success": False, "error": "Limitador do portal: sem vaga de concorrência a tempo"}
+    try:
+        driver = abrir_navegador(headless, bloquear_recursos)
+        resultado, _ = consultar_no_navegador(driver, cpf_limpo, limitar, bloquear_recursos)
+        return resultado
         
     except Exception as e:
         return {"success": False, "error": str(e)}
     finally:
         if driver:
+            instrumentacao_driver.fechar_cliente(driver, cpf_limpo)
             try: 
                 driver.quit()
             except OSError: 
                 pass # Ignora erro de processo zumbi no Windows
             except Exception:
                 pass
+        if limitar:
+            limitador_portal.liberar_vaga(id_vaga)
+
+class SessaoConsulta:
+    """
+    Um Chrome com a SPA de consulta carregada, reaproveitado entre CPFs: cada consulta
+    só troca o CPF do formulário e custa o tempo de resposta do portal.
+    Usada pelo lote da planilha e por cada navegador do daemon.
+    """
+    def __init__(self, num=1, headless=True, bloquear_recursos=True):
+        self.num = num
+        self.headless = headless
+        self.bloquear_recursos = bloquear_recursos
+        self.driver = None
+        self.usos = 0
+        self.criado_em = 0
+        self.estacionado = False # SPA carregada na /consulta
+        self.ultimo_cpf = None
+
+    def fechar(self):
+        if self.driver:
+            try: self.driver.quit()
+            except Exception: pass
+        self.driver = None
+        self.estacionado = False
+
+    def abrir(self):
+        self.fechar()
+        self.driver = abrir_navegador(self.headless, self.bloquear_recursos, nome=f"pesqbrasil.N{self.num}")
+        self.usos = 0
+        self.criado_em = time.time()
+
+    def estacionar(self, limitar=True):
+        """Deixa o navegador na /consulta com o campo de CPF pronto para a próxima consulta."""
+        self.estacionado = False
+        if limitar and limitador_portal.adquirir() is None:
+            raise RuntimeError("Limitador do portal: sem ficha para navegar a tempo")
+        self.driver.get(URL_CONSULTA)
+        WebDriverWait(self.driver, 20).until(EC.element_to_be_clickable((By.NAME, "cpf")))
+        self.estacionado = True
+        self.ultimo_cpf = None
+
+    def saudavel(self):
+        try:
+            self.driver.set_script_timeout(10)
+            return self.driver.execute_script("return document.readyState") == "complete"
+        except Exception:
+            return False
+
+    def consultar(self, cpf_limpo, limitar=True):
+        """Consulta reaproveitando a aba. Retorna (resultado, falhou); após falha a aba volta a ser recarregada."""
+        if self.driver is None: self.abrir()
+        # Mesmo CPF duas vezes seguidas: o portal pode manter o mesmo elemento na tela; recarrega
+        reaproveitar = self.estacionado and cpf_limpo != self.ultimo_cpf
+        resultado, falhou = consultar_no_navegador(self.driver, cpf_limpo, limitar, self.bloquear_recursos,
+                                                   carregar=not reaproveitar)
+        self.usos += 1
+        self.ultimo_cpf = cpf_limpo
+        self.estacionado = not falhou
+        return resultado, falhou
 
 def processar_consulta(caminho_planilha, root_tk):
     """
@@ -389,6 +542,8 @@ def processar_consulta(caminho_planilha, root_tk):
     
     # Janela de Stop
     stop_win = FloatingStopWindow(root_tk)
+    # Um navegador para o lote inteiro: a aba de consulta é reaproveitada entre CPFs
+    sessao = SessaoConsulta(headless=True)
     
     for index, row in df.iterrows():
         if ROBO_PARADO:
@@ -404,7 +559,13 @@ def processar_consulta(caminho_planilha, root_tk):
             continue
 
         log_debug(f"🔍 Consultando ({index+1}/{total}): {cpf_limpo}")
-        res = consultar_unico_cpf(cpf_limpo, headless=True)
+        with limitador_portal.vaga():
+            try:
+                res, falhou = sessao.consultar(cpf_limpo)
+            except Exception as e:
+                res, falhou = {"success": False, "error": str(e)}, True
+        instrumentacao_driver.fechar_cliente(sessao.driver, cpf_limpo)
+        if falhou: sessao.fechar() # Navegador novo na próxima consulta
         
         if res.get("success"):
             dados = res["data"]
@@ -425,9 +586,8 @@ def processar_consulta(caminho_planilha, root_tk):
             log_debug(f"❌ Falha: {err}")
             resultados.append({"CPF": cpf_limpo, "STATUS": f"ERRO: {err}", "DETALHES": err})
             enviar_para_erp(cpf_limpo, f"ERRO: {err}", res)
-
-        # Pequena pausa entre consultas para evitar bloqueios
-        time.sleep(1)
+        # Sem pausa fixa: o ritmo vem do limitador do portal (fichas + vagas, entre processos)
+    sessao.fechar()
 
     # Salva Resultado
     if resultados:
@@ -444,6 +604,201 @@ def processar_consulta(caminho_planilha, root_tk):
     stop_win.fechar()
     root_tk.quit()
 
+# ==============================================================================
+# MODO DAEMON (NAVEGADORES AQUECIDOS PARA O ERP)
+# ==============================================================================
+# `--daemon` mantém N navegadores abertos e estacionados na /consulta e atende
+# consultas por HTTP em 127.0.0.1 (o services/rgpAutomation.cjs tenta aqui antes
+# de abrir um processo por CPF):
+#   POST /consulta {"cpf": "..."} -> mesmo JSON do modo --cpf (+ "ms" e "navegador")
+#   GET  /health                  -> navegadores prontos/ocupados, consultas, reciclagens
+#   POST /stop                    -> fecha os navegadores e encerra
+# Cada navegador é reciclado após N consultas, ao passar da idade máxima, se falhar
+# ou se a checagem de saúde (a cada 60s, só nos ociosos) não obtiver resposta.
+
+PORTA_DAEMON = 8766
+
+class PoolConsulta:
+    def __init__(self, tamanho=1, headless=True, bloquear_recursos=True, limitar=True,
+                 reciclar_apos=50, idade_max_s=2 * 3600):
+        self.limitar = limitar
+        self.reciclar_apos = reciclar_apos
+        self.idade_max_s = idade_max_s
+        self.navegadores = [SessaoConsulta(i + 1, headless, bloquear_recursos) for i in range(max(1, tamanho))]
+        self._livres = queue.Queue()
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self.ocupados = 0
+        self.consultas = 0
+        self.falhas = 0
+        self.reciclagens = 0
+        self._tempo_total_ms = 0
+
+    def iniciar(self):
+        for nav in self.navegadores:
+            threading.Thread(target=self._preparar, args=(nav,), daemon=True).start()
+        threading.Thread(target=self._vigiar, daemon=True).start()
+
+    def _preparar(self, nav, reciclagem=False):
+        """(Re)abre e estaciona o navegador; só volta para a fila de livres quando estiver pronto."""
+        while not self._parar.is_set():
+            try:
+                if reciclagem or nav.driver is None or not nav.saudavel():
+                    nav.abrir()
+                    if reciclagem:
+                        with self._lock: self.reciclagens += 1
+                nav.estacionar(self.limitar)
+                log_debug(f"[DAEMON] Navegador {nav.num} pronto na /consulta.")
+                self._livres.put(nav)
+                return
+            except Exception as e:
+                log_debug(f"[DAEMON] Falha ao preparar o navegador {nav.num}: {e}. Nova tentativa em 10s.")
+                reciclagem = True
+                self._parar.wait(10)
+
+    def _devolver(self, nav, falhou):
+        precisa_reciclar = (falhou or nav.usos >= self.reciclar_apos
+                            or time.time() - nav.criado_em > self.idade_max_s)
+        if not precisa_reciclar:
+            self._livres.put(nav) # A aba continua na /consulta: a próxima só troca o CPF
+            return
+        log_debug(f"[DAEMON] Reciclando navegador {nav.num} ({'falha' if falhou else f'{nav.usos} consultas'}).")
+        self._preparar(nav, reciclagem=True)
+
+    def _vigiar(self):
+        """Checagem de saúde dos navegadores ociosos."""
+        while not self._parar.wait(60):
+            for _ in range(self._livres.qsize()):
+                try: nav = self._livres.get_nowait()
+                except queue.Empty: break
+                if nav.saudavel():
+                    self._livres.put(nav)
+                else:
+                    log_debug(f"[DAEMON] Navegador {nav.num} não respondeu à checagem de saúde.")
+                    threading.Thread(target=self._preparar, args=(nav, True), daemon=True).start()
+
+    def consultar(self, cpf_limpo, espera=120):
+        """
+        Consulta num navegador livre. Retorna None se a vaga do limitador ou um
+        navegador livre não saírem em `espera` s (o chamador cai no processo por CPF).
+        A vaga vem antes do navegador: ninguém segura um Chrome esperando o portal.
+        """
+        limite = time.time() + espera
+        id_vaga = None
+        if self.limitar:
+            id_vaga = limitador_portal.ocupar_vaga(parar=self._parar.is_set, timeout=espera)
+            if id_vaga is None: return None
+        try: nav = self._livres.get(timeout=max(0.1, limite - time.time()))
+        except queue.Empty:
+            limitador_portal.liberar_vaga(id_vaga)
+            return None
+        with self._lock: self.ocupados += 1
+        inicio = time.time()
+        try:
+            resultado, falhou = nav.consultar(cpf_limpo, self.limitar)
+        except Exception as e:
+            resultado, falhou = {"success": False, "error": str(e)}, True
+        finally:
+            limitador_portal.liberar_vaga(id_vaga)
+            instrumentacao_driver.fechar_cliente(nav.driver, cpf_limpo)
+        ms = int((time.time() - inicio) * 1000)
+        with self._lock:
+            self.ocupados -= 1
+            self.consultas += 1
+            self._tempo_total_ms += ms
+            if falhou: self.falhas += 1
+        # Reciclagem (se precisar) em segundo plano: a resposta sai já
+        threading.Thread(target=self._devolver, args=(nav, falhou), daemon=True).start()
+        resultado["ms"] = ms
+        resultado["navegador"] = nav.num
+        return resultado
+
+    def situacao(self):
+        with self._lock:
+            return {
+                "ok": not self._parar.is_set(),
+                "navegadores": len(self.navegadores),
+                "prontos": self._livres.qsize(),
+                "ocupados": self.ocupados,
+                "consultas": self.consultas,
+                "falhas": self.falhas,
+                "reciclagens": self.reciclagens,
+                "media_ms": round(self._tempo_total_ms / self.consultas) if self.consultas else None,
+                "usos": {nav.num: nav.usos for nav in self.navegadores},
+            }
+
+    def encerrar(self):
+        self._parar.set()
+        for nav in self.navegadores: nav.fechar()
+
+def _criar_handler_daemon(pool, ao_parar):
+    class DaemonHandler(BaseHTTPRequestHandler):
+        def _responder(self, codigo, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/health":
+                situacao = pool.situacao()
+                return self._responder(200 if situacao["ok"] else 503, situacao)
+            self._responder(404, {"erro": "rota inexistente"})
+
+        def do_POST(self):
+            rota = self.path.rstrip("/")
+            try:
+                if rota == "/consulta":
+                    tamanho = int(self.headers.get("Content-Length") or 0)
+                    corpo = json.loads(self.rfile.read(tamanho).decode("utf-8")) if tamanho else {}
+                    cpf_limpo = re.sub(r'\D', '', str(corpo.get("cpf", "")))
+                    if len(cpf_limpo) != 11:
+                        return self._responder(400, {"success": False, "error": "CPF inválido"})
+                    resultado = pool.consultar(cpf_limpo)
+                    if resultado is None:
+                        return self._responder(503, {"success": False, "error": "Nenhum navegador livre"})
+                    status_text = "OK" if resultado.get("success") else f"ERRO: {resultado.get('error')}"
+                    enviar_para_erp(cpf_limpo, status_text, resultado)
+                    return self._responder(200, resultado)
+                if rota == "/stop":
+                    self._responder(200, {"ok": True})
+                    threading.Thread(target=ao_parar, daemon=True).start()
+                    return
+            except Exception as e:
+                return self._responder(400, {"success": False, "error": str(e)})
+            self._responder(404, {"erro": "rota inexistente"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return DaemonHandler
+
+def executar_daemon(porta=PORTA_DAEMON, navegadores=1, headless=True, bloquear_recursos=True, limitar=True,
+                    reciclar_apos=50):
+    pool = PoolConsulta(navegadores, headless, bloquear_recursos, limitar, reciclar_apos)
+    servidor = None
+
+    def parar():
+        pool.encerrar()
+        if servidor: servidor.shutdown()
+
+    try:
+        servidor = ThreadingHTTPServer(("127.0.0.1", porta), _criar_handler_daemon(pool, parar))
+    except OSError as e:
+        print(f"❌ Porta {porta} indisponível ({e}). Já existe um daemon rodando?")
+        return
+    pool.iniciar()
+    log_debug(f"[DAEMON] Consultas em http://127.0.0.1:{porta}/consulta ({navegadores} navegador(es)).")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.encerrar()
+        log_debug("[DAEMON] Encerrado.")
+
 if __name__ == "__main__":
     import sys
     
@@ -452,12 +807,31 @@ if __name__ == "__main__":
         import argparse
         parser = argparse.ArgumentParser(description="Consulta RGP CLI")
         parser.add_argument("--cpf", type=str, help="CPF para consulta")
+        parser.add_argument("--daemon", action="store_true", help="Fica no ar com navegadores aquecidos atendendo POST /consulta em 127.0.0.1")
+        parser.add_argument("--porta", type=int, default=PORTA_DAEMON, help="Porta do daemon")
+        parser.add_argument("--navegadores", type=int, default=1, help="Navegadores do daemon (consultas simultâneas)")
+        parser.add_argument("--reciclar_apos", type=int, default=50, help="Daemon: recicla cada navegador após N consultas")
         parser.add_argument("--headless", action="store_true", help="Rodar sem abrir o navegador", default=False)
+        parser.add_argument("--sem_bloqueio", action="store_true", help="Carrega imagens/fontes/analytics (para comparar as métricas)")
+        parser.add_argument("--instrumentar", action="store_true", help="Resumo dos comandos WebDriver por função (erros_robo/instrumentacao)")
+        parser.add_argument("--profile", nargs="?", const="amostragem", choices=perfilador.MODOS, default=None,
+                            help="Perfila o lado Python da consulta (erros_robo/perfis)")
+        parser.add_argument("--sem_limitador", action="store_true", help="Ignora o limitador de acesso ao portal compartilhado com o REAP")
         args = parser.parse_args()
+        if args.instrumentar: os.environ["ADV_INSTRUMENTAR"] = "1"
+        if args.profile: os.environ["ADV_PROFILE"] = args.profile
         
+        if args.daemon:
+            with perfilador.perfilar("pesqbrasil_daemon"):
+                executar_daemon(args.porta, args.navegadores, headless=args.headless, bloquear_recursos=not args.sem_bloqueio,
+                                limitar=not args.sem_limitador, reciclar_apos=args.reciclar_apos)
+            sys.exit(0)
+
         if args.cpf:
             cpf_limpo = re.sub(r'\D', '', args.cpf)
-            resultado = consultar_unico_cpf(cpf_limpo, headless=args.headless)
+            with perfilador.perfilar(f"pesqbrasil_{cpf_limpo}"):
+                resultado = consultar_unico_cpf(cpf_limpo, headless=args.headless, bloquear_recursos=not args.sem_bloqueio,
+                                                limitar=not args.sem_limitador)
             
             # Webhook Integration
             status_text = "OK" if resultado.get("success") else f"ERRO: {resultado.get('error')}"
@@ -476,5 +850,9 @@ if __name__ == "__main__":
     # Seleciona o arquivo
     caminho = filedialog.askopenfilename(title="Selecione a planilha", filetypes=[("Excel files", "*.xlsx")])
     if caminho:
-        threading.Thread(target=processar_consulta, args=(caminho, root), daemon=True).start()
+        def _processar_perfilado():
+            # ADV_PROFILE no ambiente perfila o lote da planilha inteiro
+            with perfilador.perfilar("pesqbrasil_lote"):
+                processar_consulta(caminho, root)
+        threading.Thread(target=_processar_perfilado, daemon=True).start()
         root.mainloop()
@@ -16,8 +16,10 @@ const supabase = createClient(SUPABASE_URL, SUPABASE_KEY);
  * @param {boolean} headless Modo oculto
  * @param {function} onLog Callback de logs
  * @param {Array} fishingData Dados de pesca mensais (opcional)
+ * @param {function} onPid Callback com o PID do processo (opcional)
+ * @param {function} onProgress Callback de progresso por etapa: ({ cpf, step, state, ... }) (opcional)
  */
-async function runReapProcess(clientId, cpf, senha, headless = false, onLog = null, fishingData = null, onPid = null) {
+async function runReapProcess(clientId, cpf, senha, headless = false, onLog = null, fishingData = null, onPid = null, onProgress = null) {
     // Busca nome real do cliente para o assistente
     const { data: clientObj } = await supabase.from('clients').select('nome_completo, rgp_localidade').eq('id', clientId).single();
     const nomeReal = clientObj?.nome_completo || 'Pescador';
@@ -32,25 +34,24 @@ async function runReapProcess(clientId, cpf, senha, headless = false, onLog = nu
             scriptPath = scriptPath.replace('app.asar', 'app.asar.unpacked');
         }
 
-        // Prepara JSON da Task com fishing_data
-        const taskObj = {
-            clients: [
-                {
-                    id: clientId,
-                    nome_completo: nomeReal,
-                    cpf_cnpj: cpf,
-                    senha_gov: senha,
-                    municipio: municipio,
-                    fishing_data: fishingData || [] // Dados de pesca vindos do frontend
-                }
-            ]
-        };
+        // Cliente da tarefa com fishing_data (enviado via stdin em NDJSON, um cliente por linha)
+        // Evita o limite de tamanho da linha de comando do --json_task
+        const taskClients = [
+            {
+                id: clientId,
+                nome_completo: nomeReal,
+                cpf_cnpj: cpf,
+                senha_gov: senha,
+                municipio: municipio,
+                fishing_data: fishingData || [] // Dados de pesca vindos do frontend
+            }
+        ];
 
-        const jsonTask = Buffer.from(JSON.stringify(taskObj)).toString('base64');
         const downloadDir = path.join(process.cwd(), 'downloads');
         if (!fs.existsSync(downloadDir)) fs.mkdirSync(downloadDir, { recursive: true });
 
-        const args = [scriptPath, '--json_task', jsonTask, '--download_dir', downloadDir];
+        // fd 3 = canal dedicado de resultados/progresso (NDJSON), separado dos logs do stdout
+        const args = [scriptPath, '--task_stream', '-', '--download_dir', downloadDir, '--result_fd', '3'];
 
         // REAP geralmente requer interação (assistente), então visível é melhor.
         // Mas respeitamos o parâmetro.
@@ -58,7 +59,15 @@ async function runReapProcess(clientId, cpf, senha, headless = false, onLog = nu
         console.log(`🤖 [REAP] Iniciando processo para CPF ${cpf}...`);
         if (onLog) onLog(`🚀 Iniciando robô de REAP para CPF ${cpf}...`);
 
-        const botProcess = spawn(pythonPath, args, { cwd: path.dirname(scriptPath) });
+        const botProcess = spawn(pythonPath, args, {
+            cwd: path.dirname(scriptPath),
+            stdio: ['pipe', 'pipe', 'pipe', 'pipe']
+        });
+
+        // Envia os clientes e fecha o stdin (EOF = fim da fila para o robô)
+        botProcess.stdin.on('error', (err) => console.error("Erro ao enviar tarefa ao robô:", err.message));
+        taskClients.forEach(c => botProcess.stdin.write(JSON.stringify(c) + '\n'));
+        botProcess.stdin.end();
 
         if (onPid && botProcess.pid) {
             onPid(botProcess.pid);
@@ -68,6 +77,38 @@ async function runReapProcess(clientId, cpf, senha, headless = false, onLog = nu
         let stdoutData = '';
         let stderrData = '';
         let finalResult = null;
+
+        // Canal de resultados: um evento JSON por linha
+        let channelBuffer = '';
+        const resultChannel = botProcess.stdio[3];
+        if (resultChannel) {
+            // Decodifica no stream: um caractere multibyte partido entre dois chunks não vira lixo
+            resultChannel.setEncoding('utf8');
+            resultChannel.on('data', (data) => {
+                channelBuffer += data;
+                let frames = channelBuffer.split('\n');
+                channelBuffer = frames.pop(); // Mantém o frame incompleto no buffer
+
+                frames.forEach(frame => {
+                    if (!frame.trim()) return;
+                    try {
+                        const event = JSON.parse(frame);
+                        if (event.type === 'result') {
+                            finalResult = event.data;
+                            if (onLog) onLog(`🤖 Dados estruturados recebidos do robô.`);
+                            console.log("📊 [REAP] JSON Capturado:", finalResult);
+                        } else if (event.type === 'progress') {
+                            if (onProgress) onProgress(event);
+                            if (onLog) onLog(`⏱️ ${event.step}${event.mes ? ` (${event.mes})` : ''}: ${event.state}`);
+                        }
+                    } catch (e) {
+                        console.error("Erro ao parsear evento do canal de resultados:", e);
+                    }
+                });
+            });
+            resultChannel.on('error', (err) => console.error("Erro no canal de resultados:", err.message));
+        }
+
         let stdoutBuffer = '';
         botProcess.stdout.on('data', (data) => {
             const chunk = data.toString();
@@ -77,6 +118,7 @@ async function runReapProcess(clientId, cpf, senha, headless = false, onLog = nu
             stdoutBuffer = lines.pop(); // Mantém a última linha incompleta no buffer
 
             lines.forEach(line => {
+                // Compatibilidade: robôs antigos ainda reportam via stdout
                 if (line.includes('RESULT_START')) {
                     try {
                         const jsonStr = line.match(/RESULT_START(\{.*\})RESULT_END/);
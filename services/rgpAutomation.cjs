@@ -1,5 +1,6 @@
 const { spawn } = require('child_process');
 const path = require('path');
+const http = require('http');
 const { createClient } = require('@supabase/supabase-js');
 
 // Configuração Supabase (Importado do .env via caller ou hardcoded se necessário)
@@ -7,6 +8,200 @@ const SUPABASE_URL = process.env.VITE_SUPABASE_URL;
 const SUPABASE_KEY = process.env.VITE_SUPABASE_ANON_KEY;
 const supabase = createClient(SUPABASE_URL, SUPABASE_KEY);
 
+// Daemon de consulta (robo_pesqbrasil_consulta.py --daemon): navegadores já abertos e
+// estacionados na /consulta. RGP_DAEMON=0 desliga; RGP_DAEMON_PORT muda a porta.
+const RGP_DAEMON_ATIVO = process.env.RGP_DAEMON !== '0';
+const RGP_DAEMON_PORT = parseInt(process.env.RGP_DAEMON_PORT || '8766', 10);
+const RGP_DAEMON_TIMEOUT_MS = 150000;
+const RGP_DAEMON_REINICIO_MS = 60000; // Daemon que não responde depois disso é iniciado de novo
+let daemonIniciadoEm = 0; // 0 = não há daemon iniciado por este processo (ou ele já saiu)
+
+function caminhoScript() {
+    let scriptPath = path.join(__dirname, '..', 'robos', 'robo_pesqbrasil_consulta.py');
+    // Handle Electron asar unpacking
+    if (scriptPath.includes('app.asar') && !scriptPath.includes('app.asar.unpacked')) {
+        scriptPath = scriptPath.replace('app.asar', 'app.asar.unpacked');
+    }
+    return scriptPath;
+}
+
+/**
+ * Sobe o daemon em segundo plano. A consulta atual segue pelo caminho antigo; as
+ * próximas já encontram os navegadores aquecidos. Se o daemon sair (ou continuar
+ * recusando conexão depois de RGP_DAEMON_REINICIO_MS), a próxima recusa o inicia de novo.
+ */
+function iniciarDaemon(onLog) {
+    if (daemonIniciadoEm && Date.now() - daemonIniciadoEm < RGP_DAEMON_REINICIO_MS) return;
+    daemonIniciadoEm = Date.now();
+    try {
+        const proc = spawn('python', [caminhoScript(), '--daemon', '--headless', '--porta', String(RGP_DAEMON_PORT)], {
+            detached: true,
+            stdio: 'ignore'
+        });
+        proc.on('error', (err) => {
+            daemonIniciadoEm = 0;
+            console.warn(`⚠️ [RGP] Daemon não iniciou: ${err.message}`);
+        });
+        proc.on('exit', (code) => {
+            daemonIniciadoEm = 0;
+            console.warn(`⚠️ [RGP] Daemon de consulta saiu (código ${code}).`);
+        });
+        proc.unref();
+        console.log(`🔥 [RGP] Iniciando daemon de consulta na porta ${RGP_DAEMON_PORT}...`);
+        if (onLog) onLog('🔥 Aquecendo navegadores de consulta para as próximas buscas...');
+    } catch (err) {
+        daemonIniciadoEm = 0;
+        console.warn(`⚠️ [RGP] Daemon não iniciou: ${err.message}`);
+    }
+}
+
+/**
+ * Consulta pelo daemon. Resolve com o JSON do robô, ou null se o daemon não estiver
+ * disponível, não responder a tempo ou responder algo ilegível (aí quem chama usa o
+ * processo avulso; nunca grava "Não Encontrado" por falha do daemon).
+ */
+function consultarViaDaemon(cpf, onLog) {
+    return new Promise((resolve) => {
+        const corpo = JSON.stringify({ cpf });
+        const req = http.request({
+            host: '127.0.0.1',
+            port: RGP_DAEMON_PORT,
+            path: '/consulta',
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(corpo) }
+        }, (res) => {
+            let dados = '';
+            res.setEncoding('utf8');
+            res.on('data', (chunk) => { dados += chunk; });
+            res.on('end', () => {
+                // 503 = sem navegador livre/vaga; 400 = erro do daemon ao ler o pedido
+                if (res.statusCode !== 200) {
+                    console.warn(`⚠️ [RGP] Daemon respondeu ${res.statusCode}; usando o processo avulso.`);
+                    return resolve(null);
+                }
+                try {
+                    resolve(JSON.parse(dados));
+                } catch (err) {
+                    console.warn(`⚠️ [RGP] Resposta inválida do daemon: ${dados.substring(0, 200)}`);
+                    resolve(null);
+                }
+            });
+        });
+        req.setTimeout(RGP_DAEMON_TIMEOUT_MS, () => {
+            console.warn(`⚠️ [RGP] Daemon não respondeu em ${RGP_DAEMON_TIMEOUT_MS / 1000}s; usando o processo avulso.`);
+            req.destroy();
+            resolve(null);
+        });
+        req.on('error', (err) => {
+            if (err.code === 'ECONNREFUSED') iniciarDaemon(onLog);
+            resolve(null);
+        });
+        req.end(corpo);
+    });
+}
+
+/**
+ * Aplica o resultado de uma consulta (JSON do robô ou do daemon) no Supabase
+ * @returns {Promise<{success: boolean, data?: object, error?: string}>}
+ */
+async function aplicarResultado(clientId, result, onLog) {
+    console.log("📊 JSON Parseado:", result);
+
+    if (result.success && result.data) {
+        const { data: d } = result;
+        if (onLog) onLog(`✅ MUNICÍPIO IDENTIFICADO: ${d.MUNICIPIO}`);
+        if (onLog) onLog(`✅ DATA 1º RGP: ${d.DATA_PRIMEIRO_RGP}`);
+        if (onLog) onLog(`💾 Salvando dados no banco...`);
+
+        const updateData = {
+            rgp_localidade: d.MUNICIPIO,
+            rgp_status: d.SITUACAO_RGP,
+            rgp_numero: d.NUMERO_RGP,
+            rgp_local_exercicio: d.LOCAL_DE_EXERCICIO,
+            rgp_data_primeiro: d.DATA_PRIMEIRO_RGP
+            // updated_at: new Date().toISOString() // Removido pois estava causando erro de schema
+        };
+
+        if (onLog) onLog(`💾 Tentando salvar: ${JSON.stringify(updateData)}`);
+        console.log(`[RGP DEBUG] Update Payload for ${clientId}:`, updateData);
+
+        // Check if values are valid
+        if (d.MUNICIPIO === "Não encontrado" && d.DATA_PRIMEIRO_RGP === "Não encontrado") {
+            const warn = "⚠️ ALERTA: Dados cruciais não foram extraídos. Verifique o HTML.";
+            console.warn(warn);
+            if (onLog) onLog(warn);
+        }
+
+        if (onLog) onLog(`💾 Tentando salvar: ${JSON.stringify(updateData)}`);
+        console.log(`[RGP DEBUG] Update Payload for ${clientId}:`, updateData);
+
+        // --- UPDATE COM RETRY DEFENSIVO ---
+        const { data: savedData, error: dbError } = await supabase
+            .from('clients')
+            .update(updateData)
+            .eq('id', clientId)
+            .select();
+
+        if (dbError) {
+            console.warn("⚠️ [RGP] Erro no update primário:", dbError.message);
+            // Se falhar por colunas inexistentes, tenta salvar um subset (menos agressivo)
+            if (dbError.message.includes('column') || dbError.message.includes('rgp_')) {
+                if (onLog) onLog("⚠️ Algumas colunas RGP não foram encontradas no banco. Tentando salvamento básico...");
+
+                // Tenta apenas rgp_status e rgp_numero que são os mais básicos
+                const basicUpdate = {
+                    rgp_status: updateData.rgp_status,
+                    rgp_numero: updateData.rgp_numero
+                };
+
+                const { data: retryData, error: retryError } = await supabase
+                    .from('clients')
+                    .update(basicUpdate)
+                    .eq('id', clientId)
+                    .select();
+
+                if (retryError) throw retryError;
+                if (onLog) onLog(`✅ Salvamento básico concluído.`);
+                return ({ success: true, data: d });
+            }
+
+            throw dbError;
+        }
+
+        console.log(`[RGP DB SUCCESS] Saved row:`, savedData);
+
+        if (!savedData || savedData.length === 0) {
+            // Verifica se o cliente existe
+            const { count } = await supabase.from('clients').select('id', { count: 'exact', head: true }).eq('id', clientId);
+            const warning = count === 0
+                ? `❌ ERRO: Cliente ID ${clientId} não existe no banco!`
+                : `⚠️ AVISO: Update rodou mas não retornou dados (RLS ou sem mudanças).`;
+
+            console.warn(`[RGP DB WARNING]`, warning);
+            if (onLog) onLog(warning);
+        } else {
+            if (onLog) onLog(`✅ Dados salvos com sucesso no banco!`);
+        }
+
+        if (onLog) onLog(`✨ Consulta finalizada com sucesso!`);
+        return ({ success: true, data: d });
+    } else {
+        const logErr = result.error || "Erro desconhecido no robô.";
+        if (onLog) onLog(`❌ Falha na consulta: ${logErr}`);
+
+        // ATUALIZAÇÃO DE FALHA NO BANCO
+        // Fundamental para o frontend parar de carregar
+        await supabase.from('clients').update({
+            rgp_status: 'Não Encontrado',
+            rgp_numero: 'Inexistente', // Limpa ou marca como inexistente
+            rgp_localidade: null,
+            rgp_data_primeiro: null
+        }).eq('id', clientId);
+
+        return ({ success: false, error: logErr });
+    }
+}
+
 /**
  * Executa o robô Python para um CPF específico e atualiza o Supabase
  * @param {string} clientId ID do cliente no banco
@@ -15,14 +210,23 @@ const supabase = createClient(SUPABASE_URL, SUPABASE_KEY);
  * @param {function} onLog Callback para receber logs em tempo real (opcional)
  */
 async function runRgpConsultation(clientId, cpf, headless = true, onLog = null) {
+    // Consulta oculta: tenta primeiro o daemon (sem custo de Python/Chrome/página por CPF)
+    if (headless && RGP_DAEMON_ATIVO) {
+        const viaDaemon = await consultarViaDaemon(cpf, onLog);
+        if (viaDaemon) {
+            console.log(`⚡ [RGP] Consulta de ${cpf} respondida pelo daemon.`);
+            try {
+                return await aplicarResultado(clientId, viaDaemon, onLog);
+            } catch (err) {
+                if (onLog) onLog(`❌ Erro ao processar retorno: ${err.message}`);
+                return { success: false, error: err.message };
+            }
+        }
+    }
+
     return new Promise((resolve, reject) => {
         const pythonPath = 'python'; // Assumindo que python está no PATH
-        let scriptPath = path.join(__dirname, '..', 'robos', 'robo_pesqbrasil_consulta.py');
-
-        // Handle Electron asar unpacking
-        if (scriptPath.includes('app.asar') && !scriptPath.includes('app.asar.unpacked')) {
-            scriptPath = scriptPath.replace('app.asar', 'app.asar.unpacked');
-        }
+        const scriptPath = caminhoScript();
         const headlessFlag = headless ? '--headless' : '';
 
         // Usar spawn para streaming de logs
@@ -78,101 +282,7 @@ async function runRgpConsultation(clientId, cpf, headless = true, onLog = null)
                 const jsonMatch = jsonMatches[jsonMatches.length - 1]; // Pega o último JSON encontrado
 
                 const result = JSON.parse(jsonMatch);
-                console.log("📊 JSON Parseado:", result);
-
-                if (result.success && result.data) {
-                    const { data: d } = result;
-                    if (onLog) onLog(`✅ MUNICÍPIO IDENTIFICADO: ${d.MUNICIPIO}`);
-                    if (onLog) onLog(`✅ DATA 1º RGP: ${d.DATA_PRIMEIRO_RGP}`);
-                    if (onLog) onLog(`💾 Salvando dados no banco...`);
-
-                    const updateData = {
-                        rgp_localidade: d.MUNICIPIO,
-                        rgp_status: d.SITUACAO_RGP,
-                        rgp_numero: d.NUMERO_RGP,
-                        rgp_local_exercicio: d.LOCAL_DE_EXERCICIO,
-                        rgp_data_primeiro: d.DATA_PRIMEIRO_RGP
-                        // updated_at: new Date().toISOString() // Removido pois estava causando erro de schema
-                    };
-
-                    if (onLog) onLog(`💾 Tentando salvar: ${JSON.stringify(updateData)}`);
-                    console.log(`[RGP DEBUG] Update Payload for ${clientId}:`, updateData);
-
-                    // Check if values are valid
-                    if (d.MUNICIPIO === "Não encontrado" && d.DATA_PRIMEIRO_RGP === "Não encontrado") {
-                        const warn = "⚠️ ALERTA: Dados cruciais não foram extraídos. Verifique o HTML.";
-                        console.warn(warn);
-                        if (onLog) onLog(warn);
-                    }
-
-                    if (onLog) onLog(`💾 Tentando salvar: ${JSON.stringify(updateData)}`);
-                    console.log(`[RGP DEBUG] Update Payload for ${clientId}:`, updateData);
-
-                    // --- UPDATE COM RETRY DEFENSIVO ---
-                    const { data: savedData, error: dbError } = await supabase
-                        .from('clients')
-                        .update(updateData)
-                        .eq('id', clientId)
-                        .select();
-
-                    if (dbError) {
-                        console.warn("⚠️ [RGP] Erro no update primário:", dbError.message);
-                        // Se falhar por colunas inexistentes, tenta salvar um subset (menos agressivo)
-                        if (dbError.message.includes('column') || dbError.message.includes('rgp_')) {
-                            if (onLog) onLog("⚠️ Algumas colunas RGP não foram encontradas no banco. Tentando salvamento básico...");
-
-                            // Tenta apenas rgp_status e rgp_numero que são os mais básicos
-                            const basicUpdate = {
-                                rgp_status: updateData.rgp_status,
-                                rgp_numero: updateData.rgp_numero
-                            };
-
-                            const { data: retryData, error: retryError } = await supabase
-                                .from('clients')
-                                .update(basicUpdate)
-                                .eq('id', clientId)
-                                .select();
-
-                            if (retryError) throw retryError;
-                            if (onLog) onLog(`✅ Salvamento básico concluído.`);
-                            return resolve({ success: true, data: d });
-                        }
-
-                        throw dbError;
-                    }
-
-                    console.log(`[RGP DB SUCCESS] Saved row:`, savedData);
-
-                    if (!savedData || savedData.length === 0) {
-                        // Verifica se o cliente existe
-                        const { count } = await supabase.from('clients').select('id', { count: 'exact', head: true }).eq('id', clientId);
-                        const warning = count === 0
-                            ? `❌ ERRO: Cliente ID ${clientId} não existe no banco!`
-                            : `⚠️ AVISO: Update rodou mas não retornou dados (RLS ou sem mudanças).`;
-
-                        console.warn(`[RGP DB WARNING]`, warning);
-                        if (onLog) onLog(warning);
-                    } else {
-                        if (onLog) onLog(`✅ Dados salvos com sucesso no banco!`);
-                    }
-
-                    if (onLog) onLog(`✨ Consulta finalizada com sucesso!`);
-                    return resolve({ success: true, data: d });
-                } else {
-                    const logErr = result.error || "Erro desconhecido no robô.";
-                    if (onLog) onLog(`❌ Falha na consulta: ${logErr}`);
-
-                    // ATUALIZAÇÃO DE FALHA NO BANCO
-                    // Fundamental para o frontend parar de carregar
-                    await supabase.from('clients').update({
-                        rgp_status: 'Não Encontrado',
-                        rgp_numero: 'Inexistente', // Limpa ou marca como inexistente
-                        rgp_localidade: null,
-                        rgp_data_primeiro: null
-                    }).eq('id', clientId);
-
-                    return resolve({ success: false, error: logErr });
-                }
+                return resolve(await aplicarResultado(clientId, result, onLog));
             } catch (err) {
                 if (onLog) onLog(`❌ Erro ao processar retorno: ${err.message}`);
                 return resolve({ success: false, error: err.message });